@@ -1,5 +1,5 @@
 from pydantic import BaseModel, RootModel
-from typing import List, Optional, Dict, Union
+from typing import List, Optional, Dict, Union, Any
 
 # Pydantic Modelle
 class FileInfo(BaseModel):
@@ -9,6 +9,7 @@ class FileInfo(BaseModel):
     size_bytes: Optional[float] = None
     modified_at: Optional[str] = None # Changed from created_at to modified_at for consistency with FileScanner
     content: Optional[str] = None # Optional, da nicht immer im Index gespeichert
+    content_pending: Optional[bool] = None # True, solange Hash und Inhalt noch extrahiert werden
 
 class FileUpdate(BaseModel):
     path: str
@@ -35,11 +36,13 @@ class FileContentResult(BaseModel):
 class SearchRequest(BaseModel):
     query_input: str
     file_path: Optional[str] = None  # Nur setzen, wenn nur in einer Datei gesucht werden soll
+    mode: Optional[str] = None # 'substring' (Standard), 'word' oder 'regex'
 
 # Das SearchResult Modell für die API-Antwort
 class SearchResult(BaseModel):
     message: str
     data: Union[List[FileSearchResult], FileContentResult] # data kann Liste oder einzelnes Ergebnis sein
+    content_pending: Optional[int] = None # Dateien im Index, deren Inhalt noch nicht indiziert ist
 
 # Model for a duplicate group in the response
 class DuplicateGroup(BaseModel):
@@ -59,11 +62,50 @@ class SearchDuplicatesRequest(BaseModel):
     sort_order: str = 'desc' # 'asc', 'desc'
     length_range_filter: Optional[str] = None
 
+class ScanRequest(BaseModel):
+    base_dirs: Optional[List[str]] = None # Nur diese Basisverzeichnisse scannen (Standard: alle)
+
 class FileScanResponse(BaseModel):
     message: str
+    resumed: Optional[bool] = None # True, wenn ein unterbrochener Scan fortgesetzt wurde
+    job_id: Optional[str] = None # Scans laufen als Hintergrund-Job, siehe /scan_jobs/{job_id}
     config: Optional[Dict] = None
     duplicates: Optional[List[Dict[str, str]]] = None
 
+class ScanProgress(BaseModel):
+    resumable: bool # Gibt es einen laufenden/unterbrochenen Scan?
+    scan_dirs: Optional[List[str]] = None
+    actualize: Optional[bool] = None
+    started_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    walk_complete: Optional[bool] = None
+    total_files: Optional[int] = None
+    done_files: Optional[int] = None
+    remaining_files: Optional[int] = None # None, solange der Durchlauf noch nicht fertig ist
+    completed_dirs: Optional[int] = None
+
+class ScanJobInfo(BaseModel):
+    job_id: str
+    kind: str # "scan" oder "actualize"
+    base_dirs: Optional[List[str]] = None
+    status: str # queued, running, completed, failed, cancelled
+    message: Optional[str] = None
+    error: Optional[str] = None
+    created_at: str
+    finished_at: Optional[str] = None
+    progress: Dict[str, Any] # Phase, Zähler, Durchsatz, ETA und Zeiten je Dateiendung
+
+class QuarantineEntry(BaseModel):
+    path: str
+    quarantined: bool # True: Inhalt wird nicht mehr extrahiert
+    strikes: int # Zahl der abgebrochenen Extraktionen
+    size_bytes: Optional[int] = None
+    modified_at: Optional[str] = None
+    last_timeout: Optional[str] = None
+
+class QuarantineReleaseRequest(BaseModel):
+    path: Optional[str] = None # ohne Pfad werden alle Dateien freigegeben
+
 class ScannerConfig(BaseModel):
     base_dirs: Optional[List[str]] = None
     extensions: Optional[List[str]] = None
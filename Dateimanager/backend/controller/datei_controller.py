@@ -4,6 +4,8 @@ from backend.core.datei_manager import DateiManager
 from backend.core.pdf_to_ocr import PDFOCRProcessor
 from backend.core.account_manager import AccountManager
 from backend.core.event_manager import EventManager, Event
+from backend.core.worker_pool import WorkerPool
+from backend.core.scan_jobs import ScanJobManager, ScanStats
 import datetime
 
 class DateiController:
@@ -13,7 +15,12 @@ class DateiController:
                   search_limit: int = 100, snippet_limit: int = 0, snippet_window: int = 40, proximity_window: int = 20,
                dupe_file: str = "data/dupes.json",
                 length_range_step: int = 10, min_category_length: int = 2, snippet_length: int = 5,
-                snippet_step: int = 2, signature_size: int = 100, similarity_threshold: float = 0.7
+                snippet_step: int = 2, signature_size: int = 100, similarity_threshold: float = 0.7,
+                content_cache_mb: int = 64, walker_threads: Optional[int] = None,
+                watch_files: bool = True, watch_debounce_ms: int = 1500, worker_processes: Optional[int] = None,
+                hash_algorithm: Optional[str] = None, pdf_backend: Optional[str] = None,
+                extraction_timeout: Optional[float] = 120, worker_max_tasks: Optional[int] = 200, worker_max_rss_mb: Optional[int] = 1024,
+                pdf_initial_pages: Optional[int] = None
                 ):
         """Die Initialisierungsfunktion für den DateiController. Dieser erhällt Funktionswrapper für alle wichtigen Klassen
 
@@ -40,6 +47,17 @@ class DateiController:
             snippet_step (int): Abstand zwischen dem Start jedes Shingles bei der Duplikatsuche.
             signature_size (int): Anzahl der Top-Hash-Werte für die Signatur (M) bei der Duplikatsuche.
             similarity_threshold (float): Mindestübereinstimmungswert für die Ähnlichkeitsgruppierung bei der Duplikatsuche (0.0 bis 1.0).
+            content_cache_mb (int) | FileScanner: Speicherbudget (MB) des LRU-Caches für Dateiinhalte aus dem Indexspeicher. Defaults to 64.
+            walker_threads (Optional[int]) | FileScanner, DateiManager: Threads für den parallelen Verzeichnis-Durchlauf. Defaults to None (automatisch).
+            watch_files (bool) | FileScanner: Basisverzeichnisse beobachten und Änderungen sofort in den Index übernehmen. Defaults to True.
+            watch_debounce_ms (int) | FileScanner: Ruhezeit (ms), nach der gesammelte Dateiänderungen angewendet werden. Defaults to 1500.
+            worker_processes (Optional[int]) | WorkerPool: Prozesse des geteilten Pools für Extraktion, Signaturen und OCR. Defaults to None (Kerne - 1).
+            hash_algorithm (Optional[str]) | FileScanner: Algorithmus für Datei-Hashes ('xxh3', 'blake3', 'md5', ...). Defaults to None (schnellster installierter).
+            pdf_backend (Optional[str]) | FileScanner: Textextraktion für PDFs ('pypdfium2', 'pdfminer', 'pypdf2'). Defaults to None (pypdfium2, falls installiert).
+            extraction_timeout (Optional[float]) | FileScanner: Zeitlimit (s) je Datei; danach wird sie aufgegeben, bei Wiederholung in Quarantäne gestellt. Defaults to 120.
+            worker_max_tasks (Optional[int]) | WorkerPool: Aufgaben je Prozess, nach denen die Worker ersetzt werden. Defaults to 200.
+            worker_max_rss_mb (Optional[int]) | WorkerPool: Speicherbelegung (MB) eines Workers, ab der die Worker ersetzt werden. Defaults to 1024.
+            pdf_initial_pages (Optional[int]) | FileScanner: Längere PDFs beim Scan nur bis zu dieser Seite indizieren, den Rest im Hintergrund bzw. bei der Suche in der Datei. Defaults to None (alle Seiten sofort).
             events_file (str, optional) | EventManager: Wo die Ereignisse lokal gespeichert werden. Defaults to "data/events.json".
             structure_file (str, optional) | DateiManager: Wo die Datei-Struktur lokal gespeichert wird. Defaults to "data/structure.json".
             data_file (str, optional) | AccountManager: Wo die Nutzer Lokal abgespeichert werdne.
@@ -52,8 +70,10 @@ class DateiController:
             on_event_triggered=self.on_event_triggered,
             events_file=events_file
         )  # Wenn kein EventManager übergeben wird, wird ein neuer erstellt
-        self.datei_manager = DateiManager(structure_file=structure_file)
-        self.pdf_ocr_processor = PDFOCRProcessor(tools_dir=tools_dir, ocr_settings={})
+        self.worker_pool = WorkerPool(max_workers=worker_processes, max_tasks_per_worker=worker_max_tasks,
+                                      max_worker_rss_mb=worker_max_rss_mb) # einmal gestartet, von Scanner, Dedupe und OCR geteilt
+        self.datei_manager = DateiManager(structure_file=structure_file, walker_threads=walker_threads)
+        self.pdf_ocr_processor = PDFOCRProcessor(tools_dir=tools_dir, ocr_settings={}, worker_pool=self.worker_pool)
         self.account_manager = AccountManager(data_file=data_file, auto_login_time=auto_login_time)
         self.data_file, self.index_file, self.structure_file, self.events_file, self.dupe_file = data_file, index_file, structure_file, events_file, dupe_file
         
@@ -81,43 +101,91 @@ class DateiController:
             snippet_step=snippet_step,
             signature_size=signature_size,
             similarity_threshold=similarity_threshold,
+            content_cache_mb=content_cache_mb,
+            walker_threads=walker_threads,
+            worker_pool=self.worker_pool,
+            hash_algorithm=hash_algorithm,
+            pdf_backend=pdf_backend,
+            extraction_timeout=extraction_timeout,
+            pdf_initial_pages=pdf_initial_pages,
         )
+        self.scan_jobs = ScanJobManager(runner=self._run_scan_job) # Scans laufen als Hintergrund-Jobs mit Fortschritt
         self.file_scanner.search_limit = search_limit
         self.file_scanner.snippet_limit = snippet_limit
         
-        self.load_index()
+        # Der Index wird nicht hier, sondern einmalig im Hintergrund geladen (siehe load_index_async)
+        self.watch_files, self.watch_debounce_ms = watch_files, watch_debounce_ms
+        self.file_scanner.start_compactor()
         self.load_duplicates()
 
     # -- Scanner --
     def load_index(self):
-        return self.file_scanner.load_index()
+        with self.scan_jobs.exclusive(): return self.file_scanner.load_index()
+
+    def load_index_async(self):
+        self.file_scanner.load_index_async()
+
+    def get_health(self):
+        ready = self.file_scanner.index_ready.is_set()
+        return {"status": "ok" if ready else "loading", "index_ready": ready, "index_entries": len(self.file_scanner.index)}
 
     def save_index(self):
         return self.file_scanner.save_index()
 
-    def scan_files(self):
-        result = self.file_scanner.scan_files()
-        self.save_index()
-        return result
+    def start_watcher(self):
+        if self.watch_files: self.file_scanner.start_watching(debounce_ms=self.watch_debounce_ms)
 
-    def actualize_index(self):
-        result = self.file_scanner.actualize_index()
-        self.save_index()
-        return result
+    def close_index(self):
+        self.scan_jobs.cancel_all()
+        try: return self.file_scanner.close()
+        finally: self.worker_pool.shutdown()
+
+    def scan_files(self, base_dirs: Optional[List[str]] = None):
+        return self.file_scanner.scan_files(base_dirs=base_dirs)
+
+    def actualize_index(self, base_dirs: Optional[List[str]] = None):
+        return self.file_scanner.actualize_index(base_dirs=base_dirs)
+
+    def get_scan_progress(self):
+        return self.file_scanner.scan_progress()
+
+    def _run_scan_job(self, kind: str, base_dirs: Optional[List[str]], stats: ScanStats):
+        if kind == "actualize": return self.file_scanner.actualize_index(base_dirs=base_dirs, stats=stats)
+        return self.file_scanner.scan_files(base_dirs=base_dirs, stats=stats)
+
+    def start_scan_job(self, kind: str = "scan", base_dirs: Optional[List[str]] = None):
+        return self.scan_jobs.start(kind, base_dirs)
+
+    def get_scan_job(self, job_id: str):
+        return self.scan_jobs.get(job_id)
+
+    def list_scan_jobs(self):
+        return self.scan_jobs.list()
+
+    def cancel_scan_job(self, job_id: str) -> bool:
+        return self.scan_jobs.cancel(job_id)
+
+    def get_extraction_quarantine(self):
+        return self.file_scanner.extraction_quarantine()
+
+    def release_extraction_quarantine(self, path: Optional[str] = None):
+        return self.file_scanner.release_quarantine(path)
     
     def delete_index(self):
-        return self.file_scanner.delete_index()
+        with self.scan_jobs.exclusive(): return self.file_scanner.delete_index()
     
     # -- Suche --
-    def search_files(self, query: str):
-        return self.file_scanner.search(query)
+    def search_files(self, query: str, mode: Optional[str] = None):
+        return self.file_scanner.search(query, mode=mode)
 
     def search_file(self, path: str, query: str):
         return self.file_scanner.search_in_file(path, query)
 
     # -- Dateimanagement --
     def get_file_info(self, file_path: str):
-        return self.file_scanner.index.get(file_path)
+        entry = self.file_scanner.index.get(file_path)
+        if entry is None: return None
+        return {**entry.to_dict(), "content": self.file_scanner.get_content(entry, "content")}
 
     def update_file(self, update: Dict[str, str]):
         results = self.file_scanner.update_file(update)
@@ -130,14 +198,13 @@ class DateiController:
         return self.datei_manager.open_in_explorer(file_path)
 
     def write(self, file_path: str, content: str):
-        self.file_scanner.index[file_path]["content"] = content
+        self.file_scanner.update_content(file_path, content)
         return self.datei_manager.write_content(file_path, content)
 
     def delete_file(self, file_path: str):
         success = self.datei_manager.delete_file(file_path)
         if success:
             self.file_scanner.remove_from_index(file_path)
-            self.save_index()
             return {"message": f"Datei '{file_path}' gelöscht."}
         else:
             return {"message": f"Fehler beim Löschen der Datei."}
@@ -189,7 +256,7 @@ class DateiController:
     def on_event_triggered(self, event: str) -> None:
         """Handles the execution of a triggered event."""
         if event == 'scanner':
-            self.actualize_index()
+            self.start_scan_job("actualize")
         if event == 'file-structure':
             self.rescan_file_structure()
         if event == 'convert-index-ocr':
@@ -350,6 +417,7 @@ class DateiController:
                 self.file_scanner.content_match_score = settings.match_score.content
         if settings.scanner_cpu_cores is not None:
             self.file_scanner.num_processes = settings.scanner_cpu_cores if settings.scanner_cpu_cores > 0 else None # Assuming num_processes controls workers
+            self.worker_pool.resize(settings.scanner_cpu_cores if settings.scanner_cpu_cores > 0 else None)
         if settings.usable_extensions is not None:
             # Ensure extensions are stored as a set in FileScanner
             self.file_scanner.extensions = set(settings.usable_extensions) if settings.usable_extensions else None
@@ -458,14 +526,18 @@ class DateiController:
 
     # --- Database Settings ---
     def backup_database(self, database_name: str):
+        if database_name == 'index.json':
+            return self.file_scanner.export_index()
         return self.read_json_file(self.get_database_path_by_name(database_name))
     
     def reload_database(self, database_name: str):
         if database_name == 'index.json':
-            self.file_scanner.load_index()
+            self.load_index()
         elif database_name == 'structure.json':
             self.datei_manager.get_file_structure()
 
     def overwrite_database(self, database_name: str, content: str):
-        self.save_json_file(self.get_database_path_by_name(database_name), content)
+        if database_name == 'index.json':
+            with self.scan_jobs.exclusive(): return self.file_scanner.import_index(content)
+        return self.save_json_file(self.get_database_path_by_name(database_name), content)
         
\ No newline at end of file
@@ -9,6 +9,7 @@ from docx import Document
 from PyPDF2 import PdfWriter # Beachte: PyPDF2 kann keine PDF *aus Text* erstellen, nur leere oder aus anderen PDFs
 from typing import Optional, Dict, List
 import platform # platform hinzufügen für OS-spezifische Logik
+from backend.core.parallel_walker import ParallelWalker
 
 # --- Hilfsfunktionen für plattformunabhängiges Öffnen ---
 
@@ -73,11 +74,12 @@ def reveal_in_file_manager(path: str):
 # --- DateiManager Klasse ---
 
 class DateiManager:
-    def __init__(self, structure_file="data/structure.json", ignored_dirs: Optional[List[str]] = None):
+    def __init__(self, structure_file="data/structure.json", ignored_dirs: Optional[List[str]] = None, walker_threads: Optional[int] = None):
         # Systemordner - erweitert für Cross-Platform (Beispiele)
         self.system_folders = self._get_platform_system_folders()
         self.structure_file = structure_file
         self.ignored_dirs = set(ignored_dirs) if ignored_dirs else set()
+        self.walker_threads = walker_threads # Threads für den parallelen Verzeichnis-Durchlauf (None = automatisch)
 
         os.makedirs(os.path.dirname(self.structure_file), exist_ok=True)
         self.cached_structure = self._load_structure()
@@ -306,40 +308,28 @@ class DateiManager:
         return self.cached_structure
 
     def _get_directory_structure(self, path: str, depth=0, max_depth=5): # Tiefenbegrenzung hinzugefügt
-        """Rekursive Hilfsfunktion zum Scannen der Verzeichnisstruktur."""
-        # Verhindere zu tiefe Rekursion
-        if depth > max_depth:
-            logging.warning(f"Maximale Rekursionstiefe ({max_depth}) erreicht bei Pfad: {path}")
-            return []
-
-        dir_structure = []
-        try:
-            with os.scandir(path) as entries:
-                for entry in entries:
-                    if entry.is_dir(follow_symlinks=False):
-                        if entry.name.startswith('.') or entry.name in self.system_folders or entry.name in self.ignored_dirs:
-                            continue  # Überspringe den Ordner
-
-                        try:
-                            children = self._get_directory_structure(entry.path, depth + 1, max_depth)
-                            dir_structure.append({
-                                "name": entry.name,
-                                "path": os.path.normpath(entry.path),
-                                "children": children
-                            })
-                        except PermissionError:
-                             logging.warning(f"Keine Berechtigung für Ordner: {entry.path}")
-                        except Exception as e_inner:
-                             logging.error(f"Fehler beim Verarbeiten des Unterordners '{entry.path}': {e_inner}")
-
-        except PermissionError:
-            logging.warning(f"Keine Berechtigung für Ordner: {path}")
-        except FileNotFoundError:
-             logging.warning(f"Ordner nicht gefunden während Scan (evtl. gelöscht?): {path}")
-        except Exception as e:
-            logging.error(f"Allgemeiner Fehler beim Auslesen der Ordnerstruktur für '{path}': {e}")
-
-        return dir_structure
+        """Liest die Ordnerstruktur unter `path` (parallel über den gemeinsamen Walker) als verschachtelte Liste."""
+        walker = ParallelWalker(
+            self.walker_threads, max_depth=max(0, max_depth - depth), include_files=False,
+            skip_dir=lambda name: name.startswith('.') or name in self.system_folders or name in self.ignored_dirs,
+        )
+        root_structure = []
+        children_of = {path: root_structure} # Pfad eines gelisteten Ordners -> Liste seiner Kinder
+        for listing in walker.walk([path]):
+            dir_structure = children_of.pop(listing.path, [])
+            if isinstance(listing.error, PermissionError):
+                logging.warning(f"Keine Berechtigung für Ordner: {listing.path}")
+            elif isinstance(listing.error, FileNotFoundError):
+                logging.warning(f"Ordner nicht gefunden während Scan (evtl. gelöscht?): {listing.path}")
+            elif listing.error is not None:
+                logging.error(f"Allgemeiner Fehler beim Auslesen der Ordnerstruktur für '{listing.path}': {listing.error}")
+            if listing.dirs and not walker.descends(listing):
+                logging.warning(f"Maximale Rekursionstiefe ({max_depth}) erreicht bei Pfad: {listing.path}")
+            for name, child_path in listing.dirs:
+                node = {"name": name, "path": os.path.normpath(child_path), "children": []}
+                dir_structure.append(node)
+                children_of[child_path] = node["children"]
+        return root_structure
 
     def rescan_file_structure(self, path: str = None):
         """Erzwingt einen Neuscan der Ordnerstruktur und speichert das Ergebnis."""
@@ -0,0 +1,79 @@
+import os
+import json
+import logging
+import datetime
+import threading
+from typing import List, Dict, Optional, Any
+
+class ExtractionQuarantine:
+    """
+    Dateien, deren Extraktion wiederholt das Zeitlimit überschritten hat, als JSON-Datei neben dem Index.
+    Ab `max_strikes` Zeitüberschreitungen wird ihr Inhalt nicht mehr extrahiert (sie bleiben per Name auffindbar);
+    ändert sich die Datei (Größe oder mtime), bekommt sie eine neue Chance.
+    """
+
+    def __init__(self, file_path: str, max_strikes: int = 2):
+        self.file_path = file_path
+        self.max_strikes = max(1, max_strikes)
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None # wird erst bei Bedarf geladen
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            try:
+                with open(self.file_path, "r", encoding="utf-8") as f: self._entries = json.load(f)
+            except FileNotFoundError: self._entries = {}
+            except (OSError, ValueError) as e:
+                logging.warning(f"Extraktions-Quarantäne {self.file_path} unlesbar, wird ignoriert: {e}")
+                self._entries = {}
+        return self._entries
+
+    def save(self):
+        tmp_file = self.file_path + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f: json.dump(self.entries, f)
+            os.replace(tmp_file, self.file_path)
+        except OSError as e: logging.error(f"Extraktions-Quarantäne konnte nicht gespeichert werden: {e}")
+
+    def _current(self, path: str, size_bytes: Optional[int], modified_at: Optional[str]) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(path)
+        if entry is None or (entry.get("size_bytes"), entry.get("modified_at")) == (size_bytes, modified_at): return entry
+        return None # Datei hat sich geändert, alte Zeitüberschreitungen zählen nicht mehr
+
+    def strike(self, path: str, size_bytes: Optional[int], modified_at: Optional[str]) -> bool:
+        """Vermerkt eine Zeitüberschreitung; True, wenn die Datei damit in Quarantäne ist."""
+        with self._lock:
+            entry = self._current(path, size_bytes, modified_at) or {"strikes": 0}
+            entry.update(size_bytes=size_bytes, modified_at=modified_at, strikes=entry["strikes"] + 1,
+                         last_timeout=datetime.datetime.now().isoformat())
+            self.entries[path] = entry
+            self.save()
+        if entry["strikes"] >= self.max_strikes:
+            logging.warning(f"Extraktion von {path} {entry['strikes']}x abgebrochen, Datei kommt in Quarantäne.")
+            return True
+        return False
+
+    def is_quarantined(self, path: str, size_bytes: Optional[int], modified_at: Optional[str]) -> bool:
+        if not self.entries: return False
+        entry = self._current(path, size_bytes, modified_at)
+        return entry is not None and entry["strikes"] >= self.max_strikes
+
+    def forget(self, path: str):
+        """Nach erfolgreicher Extraktion: bisherige Zeitüberschreitungen verfallen."""
+        if not self.entries or path not in self.entries: return
+        with self._lock:
+            self.entries.pop(path, None)
+            self.save()
+
+    def release(self, path: Optional[str] = None) -> int:
+        """Gibt eine bzw. (ohne Pfad) alle Dateien frei; der nächste Scan extrahiert sie wieder."""
+        with self._lock:
+            if path is None: count, self._entries = len(self.entries), {}
+            else: count = 1 if self.entries.pop(path, None) is not None else 0
+            self.save()
+        return count
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [{"path": path, "quarantined": entry["strikes"] >= self.max_strikes, **entry}
+                for path, entry in sorted(self.entries.items())]
@@ -0,0 +1,60 @@
+import os
+import hashlib
+import logging
+from typing import Callable, Dict, Optional
+
+try: import xxhash # xxh3: um ein Vielfaches schneller als MD5, nicht kryptografisch (hier nicht nötig)
+except ImportError: xxhash = None
+try: import blake3
+except ImportError: blake3 = None
+
+HASH_BUFFER_SIZE = 1024 * 1024 # Lesepuffer für volle Hashes
+QUICK_HASH_SAMPLE = 64 * 1024 # Bytes vom Anfang und vom Ende für den Schnell-Hash
+
+def _available_algorithms() -> Dict[str, Callable]:
+    algorithms = {"md5": hashlib.md5, "sha1": hashlib.sha1, "blake2b": hashlib.blake2b}
+    if xxhash is not None: algorithms.update({"xxh3": xxhash.xxh3_128, "xxh64": xxhash.xxh64})
+    if blake3 is not None: algorithms["blake3"] = blake3.blake3
+    return algorithms
+
+HASH_ALGORITHMS = _available_algorithms()
+
+def default_hash_algorithm() -> str:
+    """xxh3, sonst BLAKE3, sonst MD5 (wie ältere Indizes)."""
+    return next((name for name in ("xxh3", "blake3") if name in HASH_ALGORITHMS), "md5")
+
+def resolve_hash_algorithm(name: Optional[str]) -> str:
+    """Prüft einen konfigurierten Algorithmus; None/'auto' oder nicht installierte Algorithmen ergeben den Standard."""
+    if not name or name.lower() == "auto": return default_hash_algorithm()
+    if name.lower() in HASH_ALGORITHMS: return name.lower()
+    fallback = default_hash_algorithm()
+    logging.warning(f"Hash-Algorithmus '{name}' nicht verfügbar, verwende {fallback}.")
+    return fallback
+
+def compute_file_hash(file_path: str, algorithm: str = "md5", buffer_size: int = HASH_BUFFER_SIZE) -> str:
+    """Hash über den ganzen Dateiinhalt; liest ungepuffert in einen wiederverwendeten Puffer."""
+    hasher = HASH_ALGORITHMS[algorithm]()
+    buffer = bytearray(buffer_size)
+    view = memoryview(buffer)
+    with open(file_path, "rb", buffering=0) as f:
+        while True:
+            n = f.readinto(buffer)
+            if not n: break
+            hasher.update(view[:n])
+    return hasher.hexdigest()
+
+def compute_quick_hash(file_path: str, size: Optional[int] = None, algorithm: str = "md5",
+                       sample: int = QUICK_HASH_SAMPLE) -> str:
+    """
+    Günstiger Hash über Größe, Anfang und Ende der Datei (Dateien bis 2 * `sample` Bytes gehen ganz ein).
+    Verschiedene Schnell-Hashes heißen sicher verschiedener Inhalt, gleiche nur möglicherweise gleicher.
+    """
+    hasher = HASH_ALGORITHMS[algorithm]()
+    with open(file_path, "rb") as f:
+        if size is None: size = os.fstat(f.fileno()).st_size
+        hasher.update(f"{size}:".encode())
+        hasher.update(f.read(sample))
+        if size > sample:
+            f.seek(max(sample, size - sample))
+            hasher.update(f.read(sample))
+    return hasher.hexdigest()
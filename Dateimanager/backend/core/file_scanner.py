@@ -1,20 +1,34 @@
 import os
+import codecs
 import datetime
+import itertools
 import hashlib
 import logging
 import json
+import pickle
 import chardet # For text file encoding detection
-import PyPDF2 # For PDF processing
 import docx # For DOCX processing
 import zlib # For consistent hashing (adler32)
-from typing import List, Dict, Optional, Any, Tuple 
-from collections import defaultdict
-import concurrent.futures
+from typing import List, Dict, Optional, Any, Tuple, Iterator, Iterable
+from collections import defaultdict, OrderedDict
+from contextlib import contextmanager
 import threading # Keep for _RANDOM_COEFFICIENTS_LOCK and specific main-thread locks if any
 import time
 import re
 import random
 import sys 
+import stat
+from backend.core.search_index import InvertedIndex, TrigramIndex, regex_required_literals, trigrams
+from backend.core.index_store import ShardedIndexStore, CONTENT_FIELDS, path_is_under, lookup_extraction
+from backend.core.index_entries import EntryTable
+from backend.core.parallel_walker import ParallelWalker, file_stat_info
+from backend.core.file_watcher import FileWatcher, CHANGE_ADDED
+from backend.core.worker_pool import WorkerPool, ExtractionTimeout, run_with_deadline, report_units
+from backend.core.scan_checkpoint import ScanCheckpoint
+from backend.core.extraction_quarantine import ExtractionQuarantine
+from backend.core.scan_jobs import ScanStats
+from backend.core.file_hashing import compute_file_hash, compute_quick_hash, resolve_hash_algorithm
+from backend.core.pdf_extraction import extract_pdf_pages, extract_pdf_text, join_pdf_pages, resolve_pdf_backend
 
 # Logging setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -86,49 +100,122 @@ def clean_content_static(content: str) -> str:
     cleaned = re.sub(r'\s+', '', cleaned) 
     return cleaned.lower() 
 
-def _compute_hash_static(file_path: str) -> str:
+MAX_RETAINED_CHARS = 32 * 1024 * 1024 # Obergrenze für den je Datei behaltenen Text; Hash und Längen gelten trotzdem für alles
+
+def retained_chars(max_content_size_let: Optional[int]) -> int:
+    return MAX_RETAINED_CHARS if max_content_size_let is None else min(max_content_size_let, MAX_RETAINED_CHARS)
+
+def digest_content(chunks: Iterable[str], retain_chars: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Verarbeitet extrahierten Text in einem Durchlauf, Stück für Stück: MD5 und bereinigte Länge über den ganzen Text,
+    behalten werden nur die ersten `retain_chars` Zeichen (Text und bereinigter Text). Ohne Kürzung entsprechen die
+    Werte denen des vollen Textes; gekürzte Texte bekommen die Grenze im content_hash, damit ihr Blob eindeutig bleibt.
+    """
     hasher = hashlib.md5()
-    try:
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
+    kept, cleaned_kept = [], []
+    room, total, cleaned_length = retain_chars, 0, 0
+    for chunk in chunks:
+        if not chunk: continue
+        hasher.update(chunk.encode('utf-8', 'ignore'))
+        total += len(chunk)
+        cleaned = clean_content_static(chunk) # zeichenweise, stückweise also wie am Stück (bis auf ein griech. Schluss-Sigma an Stückgrenzen)
+        cleaned_length += len(cleaned)
+        if room is None or len(chunk) <= room:
+            kept.append(chunk); cleaned_kept.append(cleaned)
+            if room is not None: room -= len(chunk)
+        elif room > 0:
+            kept.append(chunk[:room]); cleaned_kept.append(clean_content_static(chunk[:room]))
+            room = 0
+    digest = {"content_full": "".join(kept), "content_hash": hasher.hexdigest(),
+              "cleaned_content": "".join(cleaned_kept), "cleaned_content_length": cleaned_length}
+    if room is not None and total > retain_chars:
+        digest["content_hash"] += f":{retain_chars}"
+        digest["content_truncated"] = True
+    return digest
+
+def _compute_hash_static(file_path: str, algorithm: str = "md5") -> str:
+    try: return compute_file_hash(file_path, algorithm)
     except FileNotFoundError: logging.warning(f"Hash: Datei nicht gefunden {file_path}")
     except Exception as e: logging.error(f"Hash-Fehler für {file_path}: {e}")
     return ""
 
-def _read_text_file_static(file_path: str) -> str:
+def _compute_quick_hash_static(file_path: str, size: Optional[int] = None, algorithm: str = "md5") -> str:
+    try: return compute_quick_hash(file_path, size, algorithm)
+    except FileNotFoundError: logging.warning(f"Schnell-Hash: Datei nicht gefunden {file_path}")
+    except Exception as e: logging.error(f"Schnell-Hash-Fehler für {file_path}: {e}")
+    return ""
+
+ENCODING_SAMPLE_BYTES = 64 * 1024 # Stichprobe für die Kodierungserkennung
+TEXT_READ_CHUNK = 1024 * 1024
+_BOM_ENCODINGS = ((codecs.BOM_UTF32_LE, "utf-32"), (codecs.BOM_UTF32_BE, "utf-32"), (codecs.BOM_UTF8, "utf-8-sig"),
+                  (codecs.BOM_UTF16_LE, "utf-16"), (codecs.BOM_UTF16_BE, "utf-16")) # UTF-32 vor UTF-16 (gleicher Anfang)
+_ENCODING_HINTS: "OrderedDict[Tuple[str, str], str]" = OrderedDict() # je Worker: (Ordner, Endung) -> zuletzt erkannte Kodierung
+_ENCODING_HINTS_MAX = 1024
+
+def _decodes_as(sample: bytes, encoding: str, final: bool) -> bool:
+    try: codecs.getincrementaldecoder(encoding)("strict").decode(sample, final); return True
+    except (UnicodeDecodeError, LookupError): return False
+
+def detect_encoding(sample: bytes, final: bool = True, hint_key: Optional[Tuple[str, str]] = None) -> str:
+    """
+    Kodierung anhand einer Stichprobe: BOM, dann striktes UTF-8, dann die zuletzt für denselben Ordner und dieselbe
+    Endung erkannte Kodierung (sofern die Stichprobe damit fehlerfrei dekodiert), erst dann chardet.
+    `final=False`, wenn die Stichprobe mitten in der Datei endet (abgeschnittene Mehrbytezeichen sind dann erlaubt).
+    """
+    for bom, encoding in _BOM_ENCODINGS:
+        if sample.startswith(bom): return encoding
+    if _decodes_as(sample, "utf-8", final): return "utf-8"
+    hint = _ENCODING_HINTS.get(hint_key) if hint_key else None
+    if hint and _decodes_as(sample, hint, final):
+        _ENCODING_HINTS.move_to_end(hint_key)
+        return hint
+    detection = chardet.detect(sample)
+    encoding = detection["encoding"] if detection and detection["confidence"] and detection["confidence"] > 0.5 else None
+    # UTF-8 passt nachweislich nicht; ohne sichere Erkennung ist cp1252 (Windows, Westeuropa) die wahrscheinlichste Altkodierung
+    try: encoding = codecs.lookup(encoding).name if encoding else "cp1252"
+    except LookupError: encoding = "cp1252"
+    if hint_key:
+        _ENCODING_HINTS[hint_key] = encoding
+        _ENCODING_HINTS.move_to_end(hint_key)
+        if len(_ENCODING_HINTS) > _ENCODING_HINTS_MAX: _ENCODING_HINTS.popitem(last=False)
+    return encoding
+
+def _iter_text_file_static(file_path: str) -> Iterator[str]:
+    """Dekodiert eine Textdatei stückweise (TEXT_READ_CHUNK); nie Rohdaten und Text der ganzen Datei gleichzeitig im Speicher."""
     try:
         with open(file_path, "rb") as f:
-            raw_data = f.read()
-            if not raw_data: return ""
-            detection = chardet.detect(raw_data)
-            encoding = detection["encoding"] if detection and detection["confidence"] and detection["confidence"] > 0.5 else 'utf-8'
-            return raw_data.decode(encoding or 'utf-8', errors="replace") 
+            sample = f.read(ENCODING_SAMPLE_BYTES)
+            if not sample: return
+            hint_key = (os.path.dirname(file_path), os.path.splitext(file_path)[1].lower())
+            encoding = detect_encoding(sample, final=len(sample) < ENCODING_SAMPLE_BYTES, hint_key=hint_key)
+            # War die Stichprobe UTF-8, wird strikt weiterdekodiert, denn hinten kann die Datei anders kodiert sein
+            strict = encoding == "utf-8"
+            decoder = codecs.getincrementaldecoder(encoding)("strict" if strict else "replace")
+            for chunk in itertools.chain([sample], iter(lambda: f.read(TEXT_READ_CHUNK), b"")):
+                if not strict: yield decoder.decode(chunk); continue
+                data = decoder.getstate()[0] + chunk
+                try: text = decoder.decode(chunk)
+                except UnicodeDecodeError as e: # z.B. reines ASCII am Anfang, cp1252-Umlaute erst weiter hinten
+                    yield data[:e.start].decode("utf-8", "replace")
+                    tail_sample = data[max(0, e.start - 1024):e.start + ENCODING_SAMPLE_BYTES] # etwas Kontext vor dem Fehler
+                    encoding = detect_encoding(tail_sample, final=False, hint_key=hint_key)
+                    decoder, strict = codecs.getincrementaldecoder(encoding)("replace"), False
+                    text = decoder.decode(data[e.start:])
+                yield text
+            yield decoder.decode(b"", True)
     except FileNotFoundError: logging.warning(f"Textlesefehler: {file_path} nicht gefunden.")
     except Exception as e: logging.error(f"Textlesefehler für {file_path}: {e}")
-    return ""
 
-def _read_pdf_static(file_path: str) -> str:
-    try:
-        with open(file_path, "rb") as f:
-            reader = PyPDF2.PdfReader(f, strict=False) 
-            if reader.is_encrypted:
-                try:
-                    # In PyPDF2 v3+, decrypt returns an Enum member EncryptionType
-                    decrypt_result = reader.decrypt('')
-                    if decrypt_result != PyPDF2.generic.EncryptionType.DECRYPTED_BY_EMPTY_PASSWORD and \
-                       decrypt_result != PyPDF2.generic.EncryptionType.DECRYPTED_BY_USER_PASSWORD : # Check against known success types
-                        # Fallback for older PyPDF2 versions or other non-enum success values
-                        if not (isinstance(decrypt_result, int) and decrypt_result in [1, 2]): # Older success int codes
-                             logging.warning(f"PDF {file_path} verschlüsselt, Entschlüsselung fehlgeschlagen oder Status unklar: {decrypt_result}")
-                             return ""
-                except Exception as decrypt_err: 
-                    logging.warning(f"PDF {file_path} Entschlüsselung fehlgeschlagen (evtl. Crypto fehlt oder falsches PW): {decrypt_err}")
-                    return ""
-            return "\n".join([p.extract_text() for p in reader.pages if p.extract_text()]).strip()
-    except Exception as e: logging.error(f"PDF-Lesefehler für {file_path}: {e}")
-    return ""
+def _read_text_file_static(file_path: str) -> str:
+    return "".join(_iter_text_file_static(file_path))
+
+def _read_pdf_static(file_path: str, pdf_backend: str = "pypdf2") -> str:
+    return extract_pdf_text(file_path, pdf_backend)
+
+PDF_PAGES_PER_TASK = 50 # Seiten pro Worker-Aufgabe; längere PDFs werden seitenweise auf den Pool verteilt
+
+def _pdf_pages_task(file_path: str, pdf_backend: str, start: int, end: int, timeout: Optional[float] = None) -> List[str]:
+    return run_with_deadline(extract_pdf_pages, (file_path, pdf_backend, start, end), timeout)[1]
 
 def _read_docx_static(file_path: str) -> str:
     try:
@@ -137,12 +224,27 @@ def _read_docx_static(file_path: str) -> str:
     except Exception as e: logging.error(f"DOCX-Lesefehler für {file_path}: {e}")
     return ""
 
-def _extract_content_static(file_path: str, convert_pdf_flag: bool, processor_available: bool) -> Optional[str]:
+EXTRACTOR_VERSION = 3 # erhöhen, wenn sich die Textextraktion ändert; ältere Einträge im Extraktions-Cache gelten dann nicht mehr
+
+def extraction_cache_key(file_path: str, file_hash: str, hash_algorithm: str, pdf_backend: str = "pypdf2",
+                         retain_chars: int = MAX_RETAINED_CHARS) -> str:
+    """
+    Schlüssel im Extraktions-Cache: gleiche Bytes mit gleicher Endung ergeben mit derselben Extraktorversion denselben Text.
+    Die Grenze für behaltenen Text gehört dazu, sonst blieben nach einer Änderung von max_content_size_let alte Kürzungen stehen.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    if ext == ".pdf": ext = f"{ext}/{pdf_backend}" # PDF-Backends liefern unterschiedlichen Text
+    return f"{ext}:{hash_algorithm}:{file_hash}:v{EXTRACTOR_VERSION}:r{retain_chars}"
+
+TEXT_EXTENSIONS = {".txt", ".md", ".csv", ".json", ".xml", ".py", ".html", ".css", ".js", ".log"}
+PARSED_EXTENSIONS = {".pdf", ".docx"} # nur Parser können hängen; Textdateien werden begrenzt gelesen und bekommen kein Zeitlimit
+
+def _extract_content_static(file_path: str, convert_pdf_flag: bool, processor_available: bool, pdf_backend: str = "pypdf2") -> Optional[str]:
     ext = os.path.splitext(file_path)[-1].lower()
-    if ext in {".txt", ".md", ".csv", ".json", ".xml", ".py", ".html", ".css", ".js", ".log"}: 
+    if ext in TEXT_EXTENSIONS:
         return _read_text_file_static(file_path)
     elif ext == ".pdf":
-        return _read_pdf_static(file_path)
+        return _read_pdf_static(file_path, pdf_backend)
     elif ext == ".docx":
         return _read_docx_static(file_path)
     logging.debug(f"Kein spezieller Extraktor für {ext} ({file_path}), versuche als Text.")
@@ -156,41 +258,112 @@ def _process_file_task(
     max_content_size_let_val: Optional[int],
     convert_pdf_flag: bool,
     processor_available_flag: bool,
+    hash_algorithm: str = "md5",
+    extraction_cache_db: Optional[str] = None,
+    pdf_backend: str = "pypdf2",
+    extraction_timeout: Optional[float] = None,
+    stat_info: Optional[tuple] = None,
 ) -> Optional[Tuple[str, Dict[str, Any]]]:
     try:
-        if not os.path.exists(file_path):
-            logging.warning(f"Prozess-Worker: Datei {file_path} nicht mehr vorhanden.")
-            return None
-
-        size_bytes = os.path.getsize(file_path)
-        mtime = os.path.getmtime(file_path)
+        if stat_info is None: # ohne Ergebnis aus dem Walker selbst statten
+            try: stat_info = file_stat_info(os.stat(file_path))
+            except FileNotFoundError:
+                logging.warning(f"Prozess-Worker: Datei {file_path} nicht mehr vorhanden.")
+                return None
+        size_bytes, mtime, device, inode = stat_info
         mtime_iso = datetime.datetime.fromtimestamp(mtime).isoformat()
         
         file_data: Dict[str, Any] = {
             "type": "file", "name": filename, "path": file_path,
             "size_bytes": size_bytes, "modified_at": mtime_iso,
-            "file_hash": None, "content": None, "content_full": None, 
+            "device": device, "inode": inode,
+            "file_hash": None, "quick_hash": None, "content_full": None,
             "content_hash": None, "cleaned_content": None, 
             "cleaned_content_length": 0,
         }
-        file_data["file_hash"] = _compute_hash_static(file_path)
+        file_data["file_hash"] = _compute_hash_static(file_path, hash_algorithm)
+        if not file_data["file_hash"] and not os.path.exists(file_path):
+            logging.warning(f"Prozess-Worker: Datei {file_path} nicht mehr vorhanden.")
+            return None
+        file_data["quick_hash"] = _compute_quick_hash_static(file_path, size_bytes, hash_algorithm) or None
 
         if index_content_flag and (not max_size_kb_val or size_bytes < max_size_kb_val * 1024):
-            extracted_content = _extract_content_static(file_path, convert_pdf_flag, processor_available_flag)
-            if extracted_content is not None:
-                file_data["content_full"] = extracted_content
-                file_data["content_hash"] = hashlib.md5(extracted_content.encode('utf-8', 'ignore')).hexdigest()
-                cleaned_str = clean_content_static(extracted_content)
-                file_data["cleaned_content"] = cleaned_str
-                file_data["cleaned_content_length"] = len(cleaned_str)
-                file_data["content"] = extracted_content[:max_content_size_let_val] if max_content_size_let_val is not None else extracted_content
+            # Gleiche Bytes wurden schon einmal extrahiert (Kopie oder nur berührte Datei): Text liegt bereits im Blob-Speicher
+            cached = lookup_extraction(extraction_cache_db, extraction_cache_key(file_path, file_data["file_hash"], hash_algorithm, pdf_backend, retained_chars(max_content_size_let_val))) \
+                if extraction_cache_db and file_data["file_hash"] else None
+            if cached is not None:
+                file_data["content_hash"], file_data["cleaned_content_length"] = cached
+                return file_path, file_data
+            ext = os.path.splitext(file_path)[1].lower()
+            timeout = extraction_timeout if ext in PARSED_EXTENSIONS else None
+            try:
+                if ext == ".pdf":
+                    # Nur die ersten Seiten hier; bei längeren PDFs verteilt der Hauptprozess den Rest auf den Pool
+                    try: page_count, page_texts = run_with_deadline(extract_pdf_pages, (file_path, pdf_backend, 0, PDF_PAGES_PER_TASK), timeout)
+                    except ExtractionTimeout: raise
+                    except Exception as e:
+                        logging.error(f"PDF-Lesefehler für {file_path} ({pdf_backend}): {e}")
+                        page_count, page_texts = 0, []
+                    if page_count > PDF_PAGES_PER_TASK:
+                        file_data["pdf_split"] = (page_count, page_texts)
+                        return file_path, file_data
+                    chunks = [join_pdf_pages(page_texts)]
+                elif ext in PARSED_EXTENSIONS: chunks = [run_with_deadline(
+                    _extract_content_static, (file_path, convert_pdf_flag, processor_available_flag, pdf_backend), timeout)]
+                else: chunks = _iter_text_file_static(file_path) # gestreamt: auch riesige Logs nur stückweise im Speicher
+            except ExtractionTimeout as e:
+                # Aufgegeben: nur Metadaten, der nächste Scan versucht es erneut (bis die Datei in Quarantäne kommt)
+                logging.warning(f"Prozess-Worker: Extraktion von {file_path} abgebrochen: {e}")
+                file_data["extraction_timeout"] = True
+                file_data["content_pending"] = True
+                return file_path, file_data
+            # Text nur bis max_content_size_let (höchstens MAX_RETAINED_CHARS) behalten, Hash und Längen über alles
+            file_data.update(digest_content(chunks, retained_chars(max_content_size_let_val)))
         
         return file_path, file_data
     except Exception as e:
         logging.error(f"Prozess-Worker Fehler für {file_path}: {e}", exc_info=True)
         return None
 
+SCAN_BATCH_SIZE = 256 # Dateien pro Worker-Aufgabe
+_TASK_CACHE_DB = 8 # Position von extraction_cache_db in den Argumenten von _process_file_task
+WALK_BATCH_LISTINGS = 256 # Verzeichnisse pro Schreibtransaktion beim Durchlauf
+SCAN_PENDING_TASKS = 20000 # so viele Aufgaben darf der Durchlauf der Extraktion vorauslaufen (per Name schon suchbar)
+MOVE_CANDIDATES_MAX = 50000 # neue Pfade, die actualize bis zum Ende des Durchlaufs für die Verschiebungserkennung zurückhält
+
+def _process_file_batch(tasks: List[tuple]) -> Tuple[List[Tuple[str, Dict[str, Any]]], Dict[str, List[float]], List[tuple]]:
+    """
+    Verarbeitet mehrere Dateien in einem Worker-Aufruf (spart Pickling und Round-Trips pro Datei).
+    Liefert die Ergebnisse, die Verarbeitungszeit je Dateiendung ([Anzahl, Sekunden]) und die nicht verarbeiteten
+    Aufgaben: nach einer Zeitüberschreitung hängt hier noch ein Thread, der Rest gehört in einen frischen Prozess.
+    """
+    results, timings = [], {}
+    for i, task in enumerate(tasks):
+        started = time.perf_counter()
+        result = _process_file_task(*task)
+        timing = timings.setdefault(os.path.splitext(task[0])[1].lower() or "(ohne)", [0, 0.0])
+        timing[0] += 1; timing[1] += time.perf_counter() - started
+        if result: results.append(result)
+        if result and result[1].get("extraction_timeout"):
+            report_units(i + 1)
+            return results, timings, tasks[i + 1:]
+    report_units(len(tasks))
+    return results, timings, []
+
 # --- Helper functions used by FileScanner methods ---
+SEARCH_MODES = ("substring", "word", "regex") # der erste ist der Standard (Teilstring wie vor dem invertierten Index)
+SNAPSHOT_VERSION = 3 # erhöhen, wenn sich die Struktur der gepickelten Index-Objekte ändert
+SNAPSHOT_IDLE_SECONDS = 60 # Warmstart-Snapshot erst, wenn der Index so lange nicht beschrieben wurde
+SNAPSHOT_MIN_INTERVAL = 15 * 60 # und höchstens so oft (Sekunden); beim Beenden immer
+
+def _hash_file_batch(items: List[Tuple[str, Optional[int]]], algorithm: str) -> List[Tuple[str, str, str]]:
+    """(Pfad, file_hash, quick_hash) für (Pfad, Größe)-Paare, ohne Inhalte zu extrahieren."""
+    return [(path, _compute_hash_static(path, algorithm), _compute_quick_hash_static(path, size, algorithm)) for path, size in items]
+
+def _signature_task(cleaned: str, k: int, step: int, sig_size: int, coeffs: List[tuple[int, int]], prime: int, _key: str) -> List[int]:
+    # Schlüssel (content_hash) wird nur mitgeschickt, damit map_unordered das Ergebnis zuordnen kann
+    return generate_simple_shingle_signature(cleaned, k, step, sig_size, coeffs, prime)
+
 def compare_signatures(sig1: List[int], sig2: List[int]) -> float:
     if not sig1 or not sig2 or len(sig1) != len(sig2) or not sig1: return 0.0 # Added check for empty sig1
     return sum(1 for i in range(len(sig1)) if sig1[i] == sig2[i]) / len(sig1)
@@ -217,8 +390,13 @@ class FileScanner:
                  snippet_limit: int = 0, snippet_window: int = 40, proximity_window: int = 20, 
                  max_age_days: int = 1000, old_files_limit: int = 0, sort_by: str = 'age', sort_order: str = 'normal',
                  length_range_step: int = 10, min_category_length: int = 2, snippet_length: int = 5,      
-                 ignored_dirs: Optional[List[str]] = None, snippet_step: int = 2, signature_size: int = 100, ):
+                 ignored_dirs: Optional[List[str]] = None, snippet_step: int = 2, signature_size: int = 100,
+                 index_db_file: Optional[str] = None, content_cache_mb: int = 64, walker_threads: Optional[int] = None,
+                 worker_pool: Optional[WorkerPool] = None, hash_algorithm: Optional[str] = None,
+                 pdf_backend: Optional[str] = None, extraction_timeout: Optional[float] = 120,
+                 pdf_initial_pages: Optional[int] = None, ):
         
+        self.store = None
         self.base_dirs = base_dirs
         self.extensions = set(ext.lower() for ext in extensions) if extensions else None
         self.index_content = index_content
@@ -226,9 +404,33 @@ class FileScanner:
         self.processor = processor 
         self.index_file = index_file
         self.dupe_file = dupe_file
+        self.index_db_file = index_db_file or os.path.splitext(index_file)[0] + ".sqlite3"
+        self.hash_algorithm = resolve_hash_algorithm(hash_algorithm) # für file_hash und quick_hash
+        self.store = ShardedIndexStore(self.index_db_file, self.base_dirs, cache_bytes=content_cache_mb * 1024 * 1024,
+                                       hash_algorithm=self.hash_algorithm)
+        self.store.on_idle = self._snapshot_if_idle
+        self.snapshot_file = os.path.splitext(self.index_db_file)[0] + ".snapshot"
+        self._snapshot_generation = None # Generation des zuletzt geschriebenen bzw. geladenen Snapshots
+        self._snapshot_saved_at = 0.0
+        self.scan_checkpoint = ScanCheckpoint(os.path.splitext(self.index_db_file)[0] + ".scan-checkpoint.json")
+        self.quarantine = ExtractionQuarantine(os.path.splitext(self.index_db_file)[0] + ".quarantine.json")
+        self.index_ready = threading.Event()
+        self._index_load_started = False # erst ab dem ersten load_index ist index_ready aussagekräftig
+        self.watcher: Optional[FileWatcher] = None # Dateibeobachtung, siehe start_watching()
+        self._watch_options: Dict[str, Any] = {}
         self.max_size_kb = max_size_kb
         self.max_content_size_let = max_content_size_let
         self.ignored_dirs = set(ignored_dirs) if ignored_dirs else set()
+        self.walker_threads = walker_threads # None = automatisch (I/O-gebunden, daher mehr Threads als Kerne)
+        self.pdf_backend = resolve_pdf_backend(pdf_backend) # pypdfium2, pdfminer oder pypdf2
+        self.extraction_timeout = extraction_timeout # Sekunden je Datei bzw. PDF-Seitenblock (None = unbegrenzt)
+        self.pdf_initial_pages = pdf_initial_pages # längere PDFs: nur so viele Seiten beim Scan, der Rest im Hintergrund
+        self._pdf_backfill: Optional[threading.Thread] = None
+        self._pdf_backfill_stop = threading.Event()
+        self._pdf_locks: Dict[str, threading.Lock] = {}
+        self._pdf_locks_guard = threading.Lock()
+        self._scans_active = 0 # laufende Scans und Watcher-Läufe; solange einer läuft, bleibt die Blob-Bereinigung aus
+        self._scan_guard = threading.Lock()
         
         if num_processes is not None:
             self.num_processes = num_processes
@@ -236,6 +438,9 @@ class FileScanner:
             try: cpu_c = os.cpu_count(); self.num_processes = cpu_c if cpu_c else 1
             except NotImplementedError: self.num_processes = 1
         if self.num_processes <= 0: self.num_processes = 1
+        # Langlebiger Prozesspool (vom Controller geteilt); ohne Vorgabe ein eigener
+        self._owns_pool = worker_pool is None
+        self.worker_pool = worker_pool or WorkerPool(self._worker_count())
 
         self.filename_exact_match_score = filename_exact_match_score
         self.filename_partial_match_score = filename_partial_match_score
@@ -256,7 +461,10 @@ class FileScanner:
         self.snippet_step = max(1, snippet_step)
         self.signature_size = max(1, signature_size)
         
-        self.index = defaultdict(dict)
+        self.index = EntryTable()
+        self.search_index = InvertedIndex(self.index) # Dokument-IDs = Zeilen der EntryTable
+        self.name_grams = TrigramIndex(self.index)
+        self.content_grams = TrigramIndex(self.index)
         self.duplicate_groups: Dict[str, Any] = {}
         self._current_scan_seen_paths = set()
 
@@ -265,6 +473,17 @@ class FileScanner:
 
         logging.info(f"FileScanner init. num_processes: {self.num_processes}, Dedupe Thresh: {self.similarity_threshold}, SigSize: {self.signature_size}")
 
+    @property
+    def base_dirs(self) -> List[str]:
+        return self._base_dirs
+
+    @base_dirs.setter
+    def base_dirs(self, value: List[str]):
+        # Der Speicher verteilt die Einträge anhand der Basisverzeichnisse auf seine Shards
+        self._base_dirs = list(value or [])
+        if self.store is not None: self.store.base_dirs = self._base_dirs
+        if getattr(self, "watcher", None) is not None and self.watcher.running: self.start_watching(**self._watch_options)
+
     def _highlight_text_content(self, text_content: str, queries: List[str]) -> str:
         if not text_content or not queries: return text_content
         text_content_lower = text_content.lower()
@@ -295,75 +514,176 @@ class FileScanner:
         if current_pos < len(text_content): parts.append(text_content[current_pos:])
         return "".join(parts)
 
-    def load_index(self):
-        if os.path.exists(self.index_file):
-            try:
-                with open(self.index_file, "r", encoding="utf-8") as f:
-                    self.index = defaultdict(dict, json.load(f))
-                logging.info(f"Index geladen: {len(self.index)} Einträge aus {self.index_file}.")
-                return {"message": "Index geladen.", "data": dict(self.index)}
-            except Exception as e:
-                logging.error(f"Index Ladefehler {self.index_file}: {e}")
-                self.index = defaultdict(dict)
-                return {"message": f"Index Ladefehler: {e}"}
-        self.index = defaultdict(dict)
-        return {"message": f"Indexdatei {self.index_file} nicht gefunden."}
+    # --- Index-Mutationen (halten Suchindizes und Speicher synchron) ---
+    def _search_indexes(self) -> List[Any]:
+        return [self.search_index, self.name_grams, self.content_grams]
 
-    def scan_files(self, actualize: bool = False) -> Dict[str, any]:
-        logging.info(f"Starte Dateiscan (actualize={actualize}) mit Multiprocessing...")
-        if not actualize and not self.index:
-            self.load_index()
+    def _index_for_search(self, path: str, data: Dict[str, Any], full_text: Optional[str] = None, cleaned: Optional[str] = None):
+        if data.get("type") != "file":
+            self._unindex_for_search(path); return
+        if full_text is None: full_text = self.store.get_blob(data.get("content_hash"))
+        if cleaned is None and full_text is not None: cleaned = clean_content_static(full_text)
+        self.search_index.update_text(path, self._preview_of(full_text))
+        self.name_grams.update(path, (data.get("name") or "").lower())
+        self.content_grams.update(path, cleaned)
 
-        self._current_scan_seen_paths = set() 
-        tasks_for_processing = []
-
-        for base_dir in self.base_dirs:
-            if not os.path.exists(base_dir):
-                logging.warning(f"Basisverzeichnis {base_dir} nicht gefunden.")
-                continue
-            for root, dirs, files_in_dir in os.walk(base_dir, topdown=True): # Renamed 'files' to 'files_in_dir'
-                dirs[:] = [d for d in dirs if d not in self.ignored_dirs and not d.startswith('.')]
-                for folder_name in dirs: 
-                    folder_path = os.path.normpath(os.path.join(root, folder_name))
-                    self.index[folder_path] = {"type": "folder", "name": folder_name, "path": folder_path}
-                    self._current_scan_seen_paths.add(folder_path)
-                
-                for file_name in files_in_dir: # Use the renamed variable
-                    file_path = os.path.join(root, file_name)
-                    file_ext = os.path.splitext(file_name)[1].lower()
-                    if self.extensions and file_ext not in self.extensions:
+    def _unindex_for_search(self, path: str):
+        for idx in self._search_indexes(): idx.remove(path)
+
+    def _search_docs_of(self, path: str) -> Dict[str, Any]:
+        return {"terms": self.search_index.terms_of(path), "name_grams": self.name_grams.grams_of(path),
+                "content_grams": self.content_grams.grams_of(path)}
+
+    def _import_search_docs(self, path: str, docs: Dict[str, Any]):
+        self.search_index.update(path, docs["terms"])
+        self.name_grams.update_packed(path, docs["name_grams"])
+        self.content_grams.update_packed(path, docs["content_grams"])
+
+    def _persist_entry(self, path: str):
+        entry = self.index.get(path)
+        if entry is None: return
+        self.store.upsert(path, entry, self._search_docs_of(path) if entry.get("type") == "file" else None)
+
+    def _put_entry(self, path: str, data: Dict[str, Any]):
+        # Texte verlassen den Eintrag und landen (einmal pro content_hash) im Blob-Speicher
+        texts = {field: data.pop(field, None) for field in CONTENT_FIELDS}
+        full_text = texts["content_full"] if texts["content_full"] is not None else texts["content"]
+        with self.store.batch(): # Blob und Eintrag gemeinsam, sonst könnte die Blob-Bereinigung dazwischenfunken
+            if full_text is not None and data.get("type") == "file":
+                if not data.get("content_hash"):
+                    self._set_text(data, full_text)
+                    full_text = data.pop("content_full"); texts["cleaned_content"] = data.pop("cleaned_content")
+                self.store.put_blob(data["content_hash"], full_text)
+            self.index[path] = data
+            self._index_for_search(path, data, full_text, texts["cleaned_content"])
+            self._persist_entry(path)
+
+    def _move_entry(self, old_path: str, new_path: str, updates: Dict[str, Any]):
+        """Schlüsselt einen bestehenden Eintrag auf einen neuen Pfad um, ohne Inhalt oder Suchdokumente neu aufzubauen."""
+        data = self.index[old_path].to_dict()
+        docs = self._search_docs_of(old_path) if data.get("type") == "file" else None
+        data.update(updates)
+        data["path"], data["name"] = new_path, os.path.basename(new_path)
+        with self.store.batch():
+            self._drop_entry(old_path)
+            self.index[new_path] = data
+            if docs:
+                self._import_search_docs(new_path, docs)
+                self.name_grams.update(new_path, data["name"].lower())
+            self._persist_entry(new_path)
+
+    def _detect_moves(self, tasks: List[tuple], vanished: List[str]) -> List[tuple]:
+        """
+        Erkennt verschobene/umbenannte Dateien unter den neuen Pfaden der Aufgaben: Treffer über
+        (st_dev, st_ino) + Größe + mtime, ersatzweise über file_hash + Größe (Kandidaten mit abweichendem
+        quick_hash scheiden ohne vollen Hash aus), jeweils gegen die verschwundenen Einträge `vanished`. Solche Einträge werden umgeschlüsselt statt neu verarbeitet;
+        zurück kommen nur die noch zu verarbeitenden Aufgaben.
+        """
+        new_tasks = [t for t in tasks if t[0] not in self.index]
+        vanished = [p for p in vanished if p in self.index and self.index[p].get("type") == "file"]
+        if not new_tasks or not vanished: return tasks
+
+        by_inode: Dict[tuple, str] = {}
+        by_size: Dict[Any, List[str]] = defaultdict(list)
+        known: Dict[str, Dict[str, Any]] = {} # Kopien: der Index kann sich während der Hash-Berechnung ändern
+        for p in vanished:
+            e = known[p] = self.index[p].to_dict()
+            if e.get("inode"): by_inode[(e.get("device"), e.get("inode"))] = p
+            by_size[e.get("size_bytes")].append(p)
+
+        # Erst zuordnen (die Hashes kosten I/O und laufen ohne Schreibsperre), dann gemeinsam umschlüsseln
+        matches, claimed = [], set()
+        for task in new_tasks:
+            new_path, stat_info = task[0], task[-1]
+            if stat_info is None: continue
+            size_bytes, mtime, device, inode = stat_info
+            mtime_iso = datetime.datetime.fromtimestamp(mtime).isoformat()
+            old_path = by_inode.get((device, inode)) if inode else None
+            if old_path is not None and (old_path in claimed or known[old_path].get("size_bytes") != size_bytes
+                                         or known[old_path].get("modified_at") != mtime_iso):
+                old_path = None
+            if old_path is None:
+                candidates = [p for p in by_size.get(size_bytes, []) if p not in claimed]
+                if not candidates: continue
+                quick_hash = _compute_quick_hash_static(new_path, size_bytes, self.hash_algorithm)
+                candidates = [p for p in candidates if known[p].get("quick_hash") in (None, quick_hash)]
+                if not candidates: continue
+                file_hash = _compute_hash_static(new_path, self.hash_algorithm)
+                old_path = next((p for p in candidates if file_hash and known[p].get("file_hash") == file_hash), None)
+                if old_path is None: continue
+            claimed.add(old_path)
+            matches.append((old_path, new_path, {"size_bytes": size_bytes, "modified_at": mtime_iso, "device": device, "inode": inode}))
+
+        moved = set()
+        with self.store.batch():
+            for old_path, new_path, updates in matches:
+                if old_path not in self.index or new_path in self.index: continue # inzwischen anderweitig geändert
+                self._move_entry(old_path, new_path, updates)
+                moved.add(new_path)
+                logging.info(f"Actualize: '{old_path}' -> '{new_path}' verschoben, Eintrag übernommen.")
+        return [t for t in tasks if t[0] not in moved]
+
+    def _skip_dir(self, name: str) -> bool:
+        return name in self.ignored_dirs or name.startswith('.')
+
+    def _wants_file(self, file_name: str) -> bool:
+        return not self.extensions or os.path.splitext(file_name)[1].lower() in self.extensions
+
+    def _plan_file_task(self, file_path: str, file_name: str, stat_info: Optional[tuple], actualize: bool) -> Optional[tuple]:
+        """Aufgabe für den Worker, oder None, wenn der bestehende Eintrag (gleiche mtime/Größe) aktuell ist."""
+        entry = self.index.get(file_path) if actualize else None
+        if entry is not None and entry.get("type") == "file" and stat_info is not None:
+            fs_size, fs_mtime, fs_device, fs_inode = stat_info
+            fs_mtime_iso = datetime.datetime.fromtimestamp(fs_mtime).isoformat()
+            if entry.get('modified_at') == fs_mtime_iso and \
+               entry.get('size_bytes') == fs_size and not entry.get('content_pending') and \
+               ('content_hash' in entry or not self.index_content or (self.max_size_kb > 0 and fs_size >= self.max_size_kb * 1024)):
+                # If not indexing content or file too large, mtime/size is enough
+                # If indexing content, ensure it was processed (content_hash exists)
+                if fs_inode and entry.get("inode") is None: # Altbestand ohne Inode nachtragen
+                    entry["device"], entry["inode"] = fs_device, fs_inode
+                    self._persist_entry(file_path)
+                return None
+        index_content = self.index_content
+        if index_content and stat_info is not None and \
+           self.quarantine.is_quarantined(file_path, stat_info[0], datetime.datetime.fromtimestamp(stat_info[1]).isoformat()):
+            index_content = False # wiederholt hängengeblieben: nur Metadaten
+        return (file_path, file_name, index_content, self.max_size_kb,
+                self.max_content_size_let, self.convert_pdf, (self.processor is not None), self.hash_algorithm,
+                self.index_db_file, self.pdf_backend, self.extraction_timeout, stat_info)
+
+    def _put_pending_entries(self, tasks: List[tuple]):
+        """
+        Erste Indexphase: legt für neue oder geänderte Dateien sofort einen Metadaten-Eintrag (Name, Pfad, Größe, mtime)
+        an, damit sie per Name auffindbar sind. Hash und Inhalt trägt die Extraktion nach, bis dahin ist `content_pending` gesetzt.
+        Geänderte Dateien behalten bis dahin ihren bisherigen content_hash: der Blob bleibt so referenziert (die Extraktion
+        findet ihn bei nur berührten Dateien als Cache-Treffer wieder) und der alte Inhalt suchbar.
+        """
+        chunk = SCAN_BATCH_SIZE * 4
+        for start in range(0, len(tasks), chunk):
+            with self.store.batch():
+                for task in tasks[start:start + chunk]:
+                    file_path, file_name, stat_info = task[0], task[1], task[-1]
+                    if stat_info is None: continue
+                    size_bytes, mtime, device, inode = stat_info
+                    mtime_iso = datetime.datetime.fromtimestamp(mtime).isoformat()
+                    entry = self.index.get(file_path)
+                    if entry is not None and entry.get("type") == "file" and not entry.get("content_pending") and \
+                       entry.get("size_bytes") == size_bytes and entry.get("modified_at") == mtime_iso:
+                        continue # unverändert (voller Scan): alter Inhalt bleibt bis zur Neuextraktion suchbar
+                    if entry is not None and entry.get("type") == "file" and entry.get("content_hash"):
+                        data = {k: v for k, v in entry.items() if k not in ("pdf_pages", "pdf_pages_done")}
+                        data.update(size_bytes=size_bytes, modified_at=mtime_iso, device=device, inode=inode,
+                                    file_hash=None, quick_hash=None, content_pending=True)
+                        self.index[file_path] = data # gleiche Zeile: die Suchdokumente des alten Inhalts bleiben gültig
+                        self._persist_entry(file_path)
                         continue
-                    
-                    needs_processing = True
-                    if actualize and file_path in self.index and self.index[file_path].get("type") == "file":
-                        try:
-                            # More robust check based on file_hash if available, or mtime & size
-                            entry = self.index[file_path]
-                            fs_mtime = os.path.getmtime(file_path)
-                            fs_mtime_iso = datetime.datetime.fromtimestamp(fs_mtime).isoformat()
-                            fs_size = os.path.getsize(file_path)
-
-                            if entry.get('modified_at') == fs_mtime_iso and \
-                               entry.get('size_bytes') == fs_size and \
-                               ('content_full' in entry or not self.index_content or (self.max_size_kb > 0 and fs_size >= self.max_size_kb * 1024)):
-                                # If not indexing content or file too large, mtime/size is enough
-                                # If indexing content, ensure it was processed (content_full exists)
-                                needs_processing = False
-                                self._current_scan_seen_paths.add(file_path) 
-                        except FileNotFoundError: # File vanished between os.walk and getmtime/size
-                            needs_processing = False # Don't try to process, will be removed later
-                            if file_path in self.index: del self.index[file_path]
-                        except Exception as e_check: 
-                            logging.debug(f"Fehler bei Vorabprüfung für {file_path}: {e_check}")
-                            pass # Proceed with needs_processing = True
-                    
-                    if needs_processing:
-                        tasks_for_processing.append((
-                            file_path, file_name, self.index_content, self.max_size_kb,
-                            self.max_content_size_let, self.convert_pdf, (self.processor is not None)
-                        ))
-                    if self.scan_delay > 0 and needs_processing: time.sleep(self.scan_delay / 1000.0)
-        
+                    self._put_entry(file_path, {"type": "file", "name": file_name, "path": file_path,
+                                                "size_bytes": size_bytes, "modified_at": mtime_iso, "device": device, "inode": inode,
+                                                "file_hash": None, "content_hash": None, "cleaned_content_length": 0,
+                                                "content_pending": True})
+
+    def _worker_count(self) -> int:
         num_workers: int
         try:
             cpu_c = os.cpu_count()
@@ -372,85 +692,687 @@ class FileScanner:
             elif cpu_c > 1: num_workers = min(max(self.num_processes, 1), cpu_c -1)
             else: num_workers = 1
         except (NotImplementedError, Exception): num_workers = max(1, self.num_processes)
-        if num_workers < 1: num_workers = 1
-        logging.info(f"Scan: Verarbeite {len(tasks_for_processing)} Dateien mit {num_workers} Prozess(en).")
-
-        new_or_updated_index_entries = {}
-        if tasks_for_processing:
-            with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
-                future_to_path = {executor.submit(_process_file_task, *task_args): task_args[0] for task_args in tasks_for_processing}
-                for future in concurrent.futures.as_completed(future_to_path):
-                    original_path = future_to_path[future]
-                    try:
-                        result = future.result()
-                        if result:
-                            returned_path, file_data_dict = result
-                            new_or_updated_index_entries[returned_path] = file_data_dict
-                            self._current_scan_seen_paths.add(returned_path)
-                    except Exception as e:
-                        logging.error(f"Scan-Fehler (Haupt-Thread) für {original_path}: {e}")
-        
-        for path, data in new_or_updated_index_entries.items():
-            self.index[path] = data
+        return max(1, num_workers)
 
-        if actualize:
-            paths_in_index_before_cleanup = list(self.index.keys())
-            for path_in_idx in paths_in_index_before_cleanup:
-                if path_in_idx not in self._current_scan_seen_paths:
-                    if not os.path.exists(path_in_idx): 
-                        if path_in_idx in self.index: del self.index[path_in_idx] # Ensure it's still there
-                        logging.info(f"Actualize: '{path_in_idx}' aus Index entfernt (nicht mehr existent).")
-        
+    def _iter_file_results(self, task_chunks: Iterable[List[tuple]]
+                           ) -> Iterator[Tuple[List[tuple], List[Tuple[str, Dict[str, Any]]], Dict[str, List[float]]]]:
+        """
+        Führt die Extraktions-Aufgaben in Stapeln (höchstens SCAN_BATCH_SIZE Dateien) im Worker-Pool aus und liefert
+        (Stapel, Ergebnisse, Zeiten je Endung), sobald ein Stapel fertig ist. `task_chunks` wird erst weiter abgerufen,
+        wenn im Pool Platz ist (so speist der Scan den laufenden Durchlauf ein); es sind nur wenige Stapel gleichzeitig
+        unterwegs, der Speicherbedarf hängt also nicht von der Gesamtzahl der Dateien ab. Auch einzelne Dateien laufen
+        im Pool, damit eine hängende Extraktion nie den Serverprozess trifft.
+        """
+        workers = self.worker_pool.max_workers
+        def batches(chunks: Iterable[List[tuple]]) -> Iterator[Tuple[List[tuple]]]:
+            for tasks in chunks:
+                size = max(1, min(SCAN_BATCH_SIZE, -(-len(tasks) // workers))) # kleine Mengen trotzdem auf alle Worker verteilen
+                for i in range(0, len(tasks), size): yield (tasks[i:i + size],)
+        while True:
+            retry: List[tuple] = [] # Reste von Stapeln mit Zeitüberschreitung, laufen danach in frischen Prozessen
+            for (batch,), future in self.worker_pool.map_unordered(_process_file_batch, batches(task_chunks), window=workers * 2):
+                try: results, timings, rest = future.result()
+                except Exception as e:
+                    logging.error(f"Scan-Fehler (Haupt-Thread) für Stapel ab {batch[0][0]} ({len(batch)} Dateien): {e}")
+                    results, timings, rest = [], {}, []
+                if rest: batch = batch[:len(batch) - len(rest)]; retry.extend(rest)
+                self._reextract_lost_cache_hits(batch, results, timings)
+                self._finish_split_pdfs(results, timings)
+                yield batch, results, timings
+            if not retry: return
+            task_chunks = [retry]
+
+    def _is_lost_cache_hit(self, data: Dict[str, Any]) -> bool:
+        return data.get("content_full") is None and bool(data.get("content_hash")) and not data.get("pdf_split") \
+            and not self.store.has_blob(data["content_hash"])
+
+    def _reextract_lost_cache_hits(self, batch: List[tuple], results: List[Tuple[str, Dict[str, Any]]], timings: Dict[str, List[float]]):
+        """
+        Cache-Treffer, deren Blob seit der Abfrage im Worker verschwunden ist (Bereinigung dazwischen), werden ohne
+        Extraktions-Cache neu extrahiert; sonst verwiese der Eintrag dauerhaft auf einen fehlenden Text.
+        """
+        lost = {path for path, data in results if self._is_lost_cache_hit(data)}
+        if not lost: return
+        logging.warning(f"{len(lost)} Cache-Treffer ohne Text im Blob-Speicher, extrahiere neu.")
+        retry = [task[:_TASK_CACHE_DB] + (None,) + task[_TASK_CACHE_DB + 1:] for task in batch if task[0] in lost]
+        results[:] = [item for item in results if item[0] not in lost]
+        while retry:
+            try: fresh, fresh_timings, retry = self.worker_pool.submit(_process_file_batch, retry).result()
+            except Exception as e:
+                logging.error(f"Neuextraktion ab {retry[0][0]} fehlgeschlagen: {e}"); return
+            results.extend(fresh)
+            for ext, (count, seconds) in fresh_timings.items():
+                timing = timings.setdefault(ext, [0, 0.0])
+                timing[0] += count; timing[1] += seconds
+
+    def _finish_split_pdfs(self, results: List[Tuple[str, Dict[str, Any]]], timings: Dict[str, List[float]]):
+        """
+        Extrahiert die restlichen Seiten langer PDFs (ab PDF_PAGES_PER_TASK) in Seitenblöcken parallel im Pool,
+        damit ein einzelnes großes Dokument nicht einen Worker minutenlang blockiert. Mit `pdf_initial_pages` nur bis
+        dort; Gesamtzahl und erledigte Seiten stehen dann im Eintrag (pdf_pages, pdf_pages_done), den Rest holt
+        _complete_pdf_pages im Hintergrund bzw. bei search_in_file nach.
+        """
+        for path, data in results:
+            split = data.pop("pdf_split", None)
+            if split is None: continue
+            page_count, page_texts = split
+            started = time.perf_counter()
+            end = page_count
+            if self.pdf_initial_pages and page_count > max(self.pdf_initial_pages, PDF_PAGES_PER_TASK):
+                end = self.pdf_initial_pages
+            ranges = ((path, self.pdf_backend, start, min(start + PDF_PAGES_PER_TASK, end), self.extraction_timeout)
+                      for start in range(PDF_PAGES_PER_TASK, end, PDF_PAGES_PER_TASK))
+            try:
+                for texts in self.worker_pool.map(_pdf_pages_task, ranges, window=self.worker_pool.max_workers):
+                    page_texts.extend(texts)
+            except ExtractionTimeout as e:
+                logging.warning(f"Extraktion von {path} ab Seite {len(page_texts) + 1} von {page_count} abgebrochen: {e}")
+                data["extraction_timeout"] = True
+                data["content_pending"] = True
+            except Exception as e:
+                logging.error(f"PDF-Lesefehler für {path} ab Seite {len(page_texts) + 1} von {page_count}: {e}")
+                data["extraction_incomplete"] = True # Teiltext bleibt suchbar, kommt aber nicht in den Extraktions-Cache
+            data.update(digest_content([join_pdf_pages(page_texts)], retained_chars(self.max_content_size_let)))
+            if end < page_count and not data.get("extraction_incomplete") and not data.get("extraction_timeout"):
+                data.update(pdf_pages=page_count, pdf_pages_done=end)
+                data["extraction_incomplete"] = True # Anfang allein gehört nicht in den Extraktions-Cache
+            timing = timings.setdefault(".pdf", [0, 0.0])
+            timing[1] += time.perf_counter() - started
+
+    def _pdf_lock(self, path: str) -> threading.Lock:
+        with self._pdf_locks_guard: return self._pdf_locks.setdefault(path, threading.Lock())
+
+    def _complete_pdf_pages(self, path: str) -> bool:
+        """
+        Extrahiert die fehlenden Seiten eines nur teilweise indizierten PDFs parallel im Pool und ersetzt den Eintrag
+        durch den vollständigen (Text, Hash, Suchindex, Extraktions-Cache). True, wenn der Eintrag danach vollständig ist.
+        Schlägt das fehl, bleibt der Eintrag unverändert (pdf_pages zeigt weiter, dass Seiten fehlen); Zeitüberschreitungen
+        zählen für die Quarantäne, danach wird das PDF bis zu einer Änderung nicht mehr nachindiziert.
+        """
+        with self._pdf_lock(path):
+            entry = self.index.get(path)
+            if entry is None or not entry.get("pdf_pages"): return entry is not None
+            if self.quarantine.is_quarantined(path, entry.get("size_bytes"), entry.get("modified_at")): return False
+            data = entry.to_dict()
+            page_count, done = data.pop("pdf_pages"), data.pop("pdf_pages_done", 0)
+            truncated = data.pop("content_truncated", False)
+            start = 0 if truncated else done # vom gekürzten Anfang fehlt Text, der Hash braucht aber alles
+            prefix = "" if truncated else (self.get_content(entry) or "")
+            ranges = ((path, self.pdf_backend, s, min(s + PDF_PAGES_PER_TASK, page_count), self.extraction_timeout)
+                      for s in range(start, page_count, PDF_PAGES_PER_TASK))
+            texts: List[str] = []
+            try:
+                for block in self.worker_pool.map(_pdf_pages_task, ranges, window=self.worker_pool.max_workers): texts.extend(block)
+            except Exception as e:
+                logging.error(f"PDF {path}: Seiten ab {start + len(texts) + 1} nicht extrahierbar, bleibt bei {done} von {page_count} Seiten: {e}")
+                if isinstance(e, ExtractionTimeout): self.quarantine.strike(path, data.get("size_bytes"), data.get("modified_at"))
+                return False
+            current = self.index.get(path)
+            if current is None or current.get("file_hash") != data.get("file_hash") or current.get("pdf_pages") != page_count:
+                return False # inzwischen geändert oder entfernt, der Scan kümmert sich
+            rest = join_pdf_pages(texts)
+            data.update(digest_content([prefix, "\n" + rest] if prefix and rest else [prefix or rest],
+                                       retained_chars(self.max_content_size_let)))
+            with self.store.batch():
+                self._put_entry(path, data)
+                if data.get("file_hash") and not data.get("content_truncated"):
+                    self.store.put_extraction(extraction_cache_key(path, data["file_hash"], self.hash_algorithm, self.pdf_backend,
+                                                                   retained_chars(self.max_content_size_let)),
+                                              data["content_hash"], data.get("cleaned_content_length") or 0)
+            self.quarantine.forget(path)
+            logging.info(f"PDF {path}: restliche {page_count - done} von {page_count} Seiten indiziert.")
+            return True
+
+    def _schedule_pdf_backfill(self):
+        """Startet den Hintergrund-Thread für teilweise indizierte PDFs, falls es welche gibt und er nicht schon läuft."""
+        if self._pdf_backfill is not None and self._pdf_backfill.is_alive(): return
+        if not self.index.paths_flagged("pdf_pages"): return
+        self._pdf_backfill_stop.clear()
+        self._pdf_backfill = threading.Thread(target=self._pdf_backfill_loop, name="PdfBackfill", daemon=True)
+        self._pdf_backfill.start()
+
+    def _pdf_backfill_loop(self):
+        failed = set() # in diesem Durchgang nicht wieder versuchen; der nächste Scan bzw. Neustart plant neu
+        while not self._pdf_backfill_stop.is_set():
+            paths = [path for path in self.index.paths_flagged("pdf_pages") if path not in failed]
+            if not paths: return
+            for path in paths:
+                if self._pdf_backfill_stop.is_set(): return
+                try: complete = self._complete_pdf_pages(path)
+                except Exception as e:
+                    logging.error(f"PDF-Nachindizierung für {path} fehlgeschlagen: {e}")
+                    complete = False
+                if not complete: failed.add(path)
+
+    def stop_pdf_backfill(self):
+        self._pdf_backfill_stop.set()
+        if self._pdf_backfill is not None and self._pdf_backfill.is_alive() and self._pdf_backfill is not threading.current_thread():
+            self._pdf_backfill.join(timeout=5)
+        self._pdf_backfill = None
+
+    def _current_hashes(self, path: str, entry: Any) -> Tuple[str, str]:
+        """(file_hash, quick_hash) einer Datei; ist sie laut Größe, mtime und Schnell-Hash unverändert, wird der gespeicherte Hash übernommen."""
+        st = os.stat(path)
+        quick_hash = _compute_quick_hash_static(path, st.st_size, self.hash_algorithm)
+        if entry.get("file_hash") and quick_hash and entry.get("quick_hash") == quick_hash and entry.get("size_bytes") == st.st_size \
+           and entry.get("modified_at") == datetime.datetime.fromtimestamp(st.st_mtime).isoformat():
+            return entry["file_hash"], quick_hash
+        return _compute_hash_static(path, self.hash_algorithm), quick_hash
+
+    def _put_results(self, batch: List[tuple], results: List[Tuple[str, Dict[str, Any]]]) -> Tuple[int, int]:
+        """
+        Übernimmt die Worker-Ergebnisse eines Stapels, merkt frisch extrahierte Texte im Extraktions-Cache vor und
+        entfernt Einträge von Dateien, die ohne Ergebnis blieben, weil sie inzwischen gelöscht sind.
+        Abgebrochene Extraktionen zählen für die Quarantäne. Liefert (Cache-Treffer, Zeitüberschreitungen).
+        """
+        cache_hits, timeouts = 0, 0
+        for path, data in results:
+            if self._is_lost_cache_hit(data): # nur noch denkbar, wenn eine Bereinigung ohne Scan-Sperre lief
+                logging.warning(f"Text zu {path} fehlt im Blob-Speicher, Datei wird beim nächsten Scan neu extrahiert.")
+                data.update(content_hash=None, cleaned_content_length=0, content_pending=True)
+            timed_out = data.pop("extraction_timeout", False)
+            fresh = data.get("content_full") is not None and not data.pop("extraction_incomplete", False) and not timed_out
+            if data.get("content_full") is None and data.get("content_hash"): cache_hits += 1
+            if timed_out:
+                timeouts += 1
+                self.quarantine.strike(path, data.get("size_bytes"), data.get("modified_at"))
+            elif fresh: self.quarantine.forget(path)
+            self._put_entry(path, data)
+            if fresh and data.get("file_hash") and data.get("content_hash"):
+                self.store.put_extraction(extraction_cache_key(path, data["file_hash"], self.hash_algorithm, self.pdf_backend,
+                                                               retained_chars(self.max_content_size_let)),
+                                          data["content_hash"], data.get("cleaned_content_length") or 0)
+        done = {path for path, _ in results}
+        for task in batch:
+            if task[0] not in done and not os.path.exists(task[0]): self._drop_entry(task[0])
+        return cache_hits, timeouts
+
+    def _set_text(self, entry: Dict[str, Any], text: str):
+        entry.pop("content_truncated", None)
+        entry.update(digest_content([text], retained_chars(self.max_content_size_let)))
+
+    def _preview_of(self, full_text: Optional[str]) -> Optional[str]:
+        if full_text is None or self.max_content_size_let is None: return full_text
+        return full_text[:self.max_content_size_let]
+
+    def get_content(self, path_or_entry: Any, field: str = "content_full") -> Optional[str]:
+        """
+        Liefert ein Textfeld eines Eintrags aus dem Blob-Speicher: 'content_full' (Volltext),
+        'content' (auf max_content_size_let gekürzt) oder 'cleaned_content' (bereinigt).
+        """
+        entry = self.index.get(path_or_entry) if isinstance(path_or_entry, str) else path_or_entry
+        if not entry: return None
+        full_text = self.store.get_blob(entry.get("content_hash"))
+        if field == "content_full" or full_text is None: return full_text
+        if field == "content": return self._preview_of(full_text)
+        if field == "cleaned_content": return clean_content_static(full_text)
+        raise KeyError(field)
+
+    def _drop_entry(self, path: str) -> bool:
+        # Speicher immer vor dem Store ändern: ein paralleler Snapshot ist dann höchstens veraltet, nie zu neu
+        self._unindex_for_search(path)
+        removed = self.index.pop(path, None) is not None
+        self.store.delete(path)
+        return removed
+
+    def _reset_in_memory(self):
+        self.index = EntryTable()
+        self.search_index, self.name_grams, self.content_grams = InvertedIndex(self.index), TrigramIndex(self.index), TrigramIndex(self.index)
+
+    def update_content(self, path: str, content: str):
+        entry = self.index.get(path)
+        if entry is None or entry.get("type") != "file": return
+        entry = entry.to_dict()
+        self._set_text(entry, content)
+        self._put_entry(path, entry)
+
+    def load_index(self):
+        self._index_load_started = True
+        self.index_ready.clear()
+        self._reset_in_memory()
+        try:
+            if self.store.count() == 0 and os.path.exists(self.index_file):
+                self.store.import_legacy_json(self.index_file)
+            if self._load_snapshot():
+                logging.info(f"Index geladen: {len(self.index)} Einträge aus Warmstart-Snapshot {self.snapshot_file}.")
+                self._forget_foreign_hashes()
+                return {"message": "Index geladen.", "data": self.index}
+            unindexed = []
+            for path, entry, search_docs in self.store.load_all():
+                self.index[path] = entry
+                if entry.get("type") != "file": continue
+                if search_docs is None: unindexed.append(path)
+                else: self._import_search_docs(path, search_docs)
+            if unindexed:
+                with self.store.batch():
+                    for path in unindexed: self._put_entry(path, self.index[path].to_dict())
+                logging.info(f"Suchindex für {len(unindexed)} Einträge nachträglich aufgebaut.")
+            logging.info(f"Index geladen: {len(self.index)} Einträge aus {self.index_db_file}.")
+            self._forget_foreign_hashes()
+            return {"message": "Index geladen.", "data": self.index}
+        except Exception as e:
+            logging.error(f"Index Ladefehler {self.index_db_file}: {e}")
+            self._reset_in_memory()
+            return {"message": f"Index Ladefehler: {e}"}
+        finally:
+            self.index_ready.set()
+            self._schedule_pdf_backfill() # nach einem Neustart unvollständige PDFs weiter indizieren
+
+    def _forget_foreign_hashes(self):
+        """
+        Verwirft file_hash und quick_hash aller Einträge aus Shards, die mit einem anderen Hash-Algorithmus geschrieben
+        wurden (z.B. MD5 vor dem Wechsel auf xxh3): solche Hashes passen nie zu neu berechneten und würden Verschiebungen
+        verdecken. Der nächste Scan berechnet sie neu (_rehash_entries), ohne Inhalte neu zu extrahieren.
+        """
+        stale = self.store.shards_hashed_otherwise(self.hash_algorithm)
+        if not stale: return
+        cleared = 0
+        with self.store.batch():
+            for path, entry in self.index.items():
+                if entry.get("type") != "file" or self.store.shard_key(path) not in stale: continue
+                if entry.get("file_hash") is None and entry.get("quick_hash") is None: continue
+                entry["file_hash"] = entry["quick_hash"] = None
+                self._persist_entry(path)
+                cleared += 1
+            self.store.set_hash_algorithm(stale, self.hash_algorithm)
+        logging.info(f"Hash-Algorithmus jetzt {self.hash_algorithm}: {cleared} Datei-Hashes verworfen, der nächste Scan berechnet sie neu.")
+
+    def _rehash_entries(self, scan_dirs: List[str]):
+        """Berechnet fehlende Datei-Hashes unveränderter Einträge im Worker-Pool nach; Inhalte bleiben, wie sie sind."""
+        items = [(path, entry.get("size_bytes")) for path, entry in self.index.items()
+                 if entry.get("type") == "file" and entry.get("file_hash") is None and not entry.get("content_pending")
+                 and any(path_is_under(path, b) for b in scan_dirs)]
+        if not items: return
+        batches = ((items[i:i + SCAN_BATCH_SIZE], self.hash_algorithm) for i in range(0, len(items), SCAN_BATCH_SIZE))
+        for (batch, _), future in self.worker_pool.map_unordered(_hash_file_batch, batches):
+            try: hashed = future.result()
+            except Exception as e:
+                logging.error(f"Hash-Fehler für Stapel ab {batch[0][0]} ({len(batch)} Dateien): {e}"); continue
+            with self.store.batch():
+                for path, file_hash, quick_hash in hashed:
+                    entry = self.index.get(path)
+                    if entry is None or entry.get("file_hash") is not None or not file_hash: continue
+                    entry["file_hash"], entry["quick_hash"] = file_hash, quick_hash or None
+                    self._persist_entry(path)
+        logging.info(f"Datei-Hashes für {len(items)} Einträge mit {self.hash_algorithm} neu berechnet.")
+
+    def load_index_async(self):
+        """Lädt den Index im Hintergrund (IndexLoader); Scans und Watcher warten über index_ready darauf."""
+        self._index_load_started = True
+        self.index_ready.clear()
+        threading.Thread(target=self.load_index, name="IndexLoader", daemon=True).start()
+
+    def _snapshot_if_idle(self):
+        """Vom Kompaktierer aufgerufen: Snapshot nur ohne laufenden Scan, nach einer Ruhepause und höchstens alle SNAPSHOT_MIN_INTERVAL."""
+        if self._scans_active or self.store.idle_seconds() < SNAPSHOT_IDLE_SECONDS: return
+        if time.monotonic() - self._snapshot_saved_at < SNAPSHOT_MIN_INTERVAL: return
+        self.save_snapshot()
+
+    def save_snapshot(self) -> bool:
+        """
+        Schreibt den Warmstart-Snapshot (Einträge + Suchindizes, Pickle-Protokoll 5). Er gilt nur, solange
+        die Generation des Indexspeichers unverändert ist; Inhalte stecken nicht darin.
+        Schreiber werden dabei nicht angehalten: ändert sich der Index während des Pickelns, wird der Snapshot verworfen.
+        """
+        if not self.index_ready.is_set(): return False
+        generation = self.store.generation()
+        if generation == self._snapshot_generation and os.path.exists(self.snapshot_file): return True
+        if self.store.in_transaction(): return False
+        tmp_file = self.snapshot_file + ".tmp"
+        try:
+            state = {"version": SNAPSHOT_VERSION, "generation": generation, "index": self.index,
+                     "search_index": self.search_index, "name_grams": self.name_grams, "content_grams": self.content_grams}
+            with open(tmp_file, "wb") as f: pickle.dump(state, f, protocol=5)
+            if self.store.in_transaction() or self.store.generation() != generation:
+                raise RuntimeError("Index wurde während des Snapshots verändert")
+            os.replace(tmp_file, self.snapshot_file)
+        except Exception as e: # RuntimeError auch von pickle, wenn sich ein Dict währenddessen ändert
+            (logging.info if isinstance(e, RuntimeError) else logging.error)(f"Warmstart-Snapshot {self.snapshot_file} verworfen: {e}")
+            if os.path.exists(tmp_file): os.remove(tmp_file)
+            return False
+        self._snapshot_generation, self._snapshot_saved_at = generation, time.monotonic()
+        logging.info(f"Warmstart-Snapshot gespeichert in {self.snapshot_file}.")
+        return True
+
+    def _load_snapshot(self) -> bool:
+        if not os.path.exists(self.snapshot_file): return False
+        try:
+            # Einfaches Pickle: alles wird beim Laden in Python-Objekte kopiert, schneller als der Aufbau aus den Shards
+            with open(self.snapshot_file, "rb") as f: state = pickle.load(f)
+        except Exception as e:
+            logging.warning(f"Warmstart-Snapshot {self.snapshot_file} nicht lesbar: {e}")
+            return False
+        if not isinstance(state, dict) or state.get("version") != SNAPSHOT_VERSION or state.get("generation") != self.store.generation():
+            logging.info(f"Warmstart-Snapshot {self.snapshot_file} veraltet, lade aus {self.index_db_file}.")
+            return False
+        self.index = state["index"]
+        self.search_index, self.name_grams, self.content_grams = state["search_index"], state["name_grams"], state["content_grams"]
+        self._snapshot_generation = state["generation"]
+        return True
+
+    def export_index(self) -> Dict[str, Any]:
+        exported = {}
+        for path, entry in self.index.items():
+            exported[path] = entry.to_dict()
+            if entry.get("content_hash"): exported[path]["content_full"] = self.get_content(entry)
+        return exported
+
+    def import_index(self, data: Dict[str, Any]) -> Dict[str, str]:
+        if not isinstance(data, dict): return {"error": "Ungültiges Indexformat."}
+        with self.store.batch():
+            self.store.clear()
+            self._reset_in_memory()
+            for path, entry in data.items():
+                if isinstance(entry, dict): self._put_entry(path, dict(entry))
+        return {"message": f"Index mit {len(self.index)} Einträgen übernommen."}
+
+    def scan_files(self, actualize: bool = False, base_dirs: Optional[List[str]] = None,
+                   stats: Optional[ScanStats] = None) -> Dict[str, any]:
+        """
+        Scannt alle oder nur die angegebenen Basisverzeichnisse; nur deren Shards werden geschrieben.
+        Neue und geänderte Dateien werden zuerst nur mit Metadaten eingetragen, Hash und Inhalt folgen stapelweise.
+        Der Fortschritt wird laufend gesichert; ein abgebrochener Scan derselben Verzeichnisse wird fortgesetzt.
+        `stats` nimmt Kennzahlen für Scan-Jobs auf; ist dessen cancel_event gesetzt, endet der Scan mit ScanCancelled.
+        """
+        with self._scan_activity(): result = self._scan_files(actualize, base_dirs, stats or ScanStats())
+        self.collect_garbage() # erst danach: bis zum Ende können Einträge und Worker-Ergebnisse noch auf alte Blobs verweisen
+        return result
+
+    def _walk_tasks(self, scan_dirs: List[str], actualize: bool, stats: ScanStats, progress: Dict[str, int]
+                    ) -> Iterator[List[tuple]]:
+        """
+        Durchläuft die Basisverzeichnisse und liefert die Extraktions-Aufgaben blockweise, sobald sie geplant sind.
+        Ordner-Einträge werden in Transaktionen zu je WALK_BATCH_LISTINGS Verzeichnissen geschrieben (der Speicher bleibt
+        zwischendurch für andere Schreiber frei, ein Abbruch verliert höchstens den laufenden Block), geplante Dateien
+        bekommen sofort ihren Metadaten-Eintrag und sind damit schon vor der Extraktion per Name suchbar.
+        Bei actualize hält der Durchlauf neue Pfade (bis MOVE_CANDIDATES_MAX) bis zu seinem Ende zurück, damit
+        verschobene Dateien erkannt werden, bevor sie neu extrahiert würden.
+        """
+        checkpoint = self.scan_checkpoint
+        block = SCAN_BATCH_SIZE * self.worker_pool.max_workers
+        ready: List[tuple] = []
+        deferred: List[tuple] = []
+
+        def release(tasks: List[tuple]):
+            self._put_pending_entries(tasks)
+            stats.planned(len(tasks))
+            progress["planned"] += len(tasks)
+            ready.extend(tasks)
+
+        def listings() -> Iterator[list]:
+            for base_dir in scan_dirs:
+                if not os.path.exists(base_dir):
+                    logging.warning(f"Basisverzeichnis {base_dir} nicht gefunden.")
+                    continue
+                # Ein stat pro Datei (im parallelen scandir-Durchlauf), das Ergebnis geht an Vorabprüfung und Worker
+                walked = ParallelWalker(self.walker_threads, skip_dir=self._skip_dir).walk([base_dir])
+                yield from iter(lambda: list(itertools.islice(walked, WALK_BATCH_LISTINGS)), [])
+
+        for chunk in listings():
+            planned = []
+            with self.store.batch():
+                for listing in chunk:
+                    if stats.cancel_event.is_set(): break # Transaktion erst regulär abschließen, dann abbrechen
+                    stats.walked(1, len(listing.files))
+                    if listing.error is not None:
+                        logging.warning(f"Scan: Verzeichnis {listing.path} nicht lesbar: {listing.error}")
+                    for folder_name, folder_path in listing.dirs + listing.links:
+                        folder_path = os.path.normpath(folder_path)
+                        self._put_entry(folder_path, {"type": "folder", "name": folder_name, "path": folder_path})
+                        self._current_scan_seen_paths.add(folder_path)
+                    if checkpoint.is_dir_complete(listing.path): # im unterbrochenen Lauf schon übernommen
+                        self._current_scan_seen_paths.update(p for n, p, _ in listing.files if self._wants_file(n))
+                        continue
+                    dir_task_count = 0
+                    for file_name, file_path, stat_info in listing.files:
+                        if not self._wants_file(file_name): continue
+                        self._current_scan_seen_paths.add(file_path)
+                        task = self._plan_file_task(file_path, file_name, stat_info, actualize)
+                        if task is None: continue
+                        if actualize and file_path not in self.index and len(deferred) < MOVE_CANDIDATES_MAX: deferred.append(task)
+                        else: planned.append(task)
+                        dir_task_count += 1
+                        if self.scan_delay > 0: time.sleep(self.scan_delay / 1000.0)
+                    checkpoint.add_dir(listing.path, dir_task_count)
+            release(planned)
+            checkpoint.maybe_save() # erst nach dem Commit: erledigte Verzeichnisse stehen dann auch im Index
+            if stats.cancel_event.is_set(): checkpoint.save(); stats.check_cancelled()
+            while len(ready) >= block: # ein Block pro Verzeichnisblock; über SCAN_PENDING_TASKS wartet der Durchlauf auf den Pool
+                yield ready[:block]
+                del ready[:block]
+                if len(ready) < SCAN_PENDING_TASKS: break
+
+        if deferred:
+            vanished = [p for p in self.index.keys() if p not in self._current_scan_seen_paths
+                        and any(path_is_under(p, b) for b in scan_dirs)]
+            remaining = self._detect_moves(deferred, vanished)
+            kept = {t[0] for t in remaining}
+            checkpoint.mark_done(t[0] for t in deferred if t[0] not in kept)
+            release(remaining)
+        checkpoint.walk_finished(progress["planned"] - progress["processed"])
+        stats.phase = "extracting"
+        if ready: yield ready
+
+    def _scan_files(self, actualize: bool, base_dirs: Optional[List[str]], stats: ScanStats) -> Dict[str, any]:
+        scan_dirs = [b for b in base_dirs if b] if base_dirs else list(self.base_dirs)
+        logging.info(f"Starte Dateiscan (actualize={actualize}, {len(scan_dirs)} Basisverzeichnis(se)) mit Multiprocessing...")
+        if not self._index_load_started: self.load_index() # ohne Controller: einmalig synchron laden
+        # Ein laufender Ladevorgang muss fertig sein, sonst gälten noch nicht geladene Einträge als neu
+        while not self.index_ready.wait(1.0): stats.check_cancelled()
+        self._requeue_lost_contents(scan_dirs)
+
+        self._current_scan_seen_paths = set() 
+        checkpoint = self.scan_checkpoint
+        resumed = checkpoint.begin(scan_dirs, actualize)
+
+        # Durchlauf und Extraktion laufen verschränkt: der Pool holt sich den nächsten Block erst, wenn er Platz hat,
+        # der Durchlauf läuft ihm höchstens SCAN_PENDING_TASKS Aufgaben voraus. Ergebnisse werden stapelweise
+        # übernommen (eine Transaktion pro Stapel), der Checkpoint wird erst nach dem Commit fortgeschrieben
+        progress = {"planned": 0, "processed": 0}
+        logging.info(f"Scan: Verarbeite Dateien mit {self.worker_pool.max_workers} Prozess(en), während der Durchlauf läuft.")
+        for batch, results, timings in self._iter_file_results(self._walk_tasks(scan_dirs, actualize, stats, progress)):
+            with self.store.batch(): cache_hits, timeouts = self._put_results(batch, results)
+            checkpoint.mark_done(task[0] for task in batch)
+            progress["processed"] += len(batch)
+            stats.extracted(len(batch), sum(task[-1][0] for task in batch if task[-1]), len(batch) - len(results) + timeouts,
+                            timings, cache_hits, timeouts)
+            if stats.cancel_event.is_set(): checkpoint.save(); stats.check_cancelled()
+        stats.phase = "finishing"
+
+        with self.store.batch():
+            if actualize:
+                paths_in_index_before_cleanup = [p for p in self.index.keys() if any(path_is_under(p, b) for b in scan_dirs)]
+                for path_in_idx in paths_in_index_before_cleanup:
+                    if path_in_idx not in self._current_scan_seen_paths:
+                        if not os.path.exists(path_in_idx): 
+                            self._drop_entry(path_in_idx)
+                            logging.info(f"Actualize: '{path_in_idx}' aus Index entfernt (nicht mehr existent).")
+        self._rehash_entries(scan_dirs) # z.B. nach einem Wechsel des Hash-Algorithmus
+        checkpoint.discard()
+        self._schedule_pdf_backfill()
         logging.info(f"Scan abgeschlossen. Index enthält {len(self.index)} Einträge.")
-        return {"message": f"{len(self.index)} Dateien/Ordner indiziert.", "data": dict(self.index)}
+        return {"message": f"{len(self.index)} Dateien/Ordner indiziert.", "data": self.index, "resumed": resumed}
 
-    def actualize_index(self) -> Dict[str, any]:
-        return self.scan_files(actualize=True)
+    def scan_progress(self) -> Dict[str, Any]:
+        """Fortschritt des laufenden oder zuletzt unterbrochenen Scans (inkl. verbleibender Dateien)."""
+        return self.scan_checkpoint.progress()
+
+    def extraction_quarantine(self) -> List[Dict[str, Any]]:
+        """Dateien mit abgebrochenen Extraktionen; `quarantined` heißt, ihr Inhalt wird nicht mehr extrahiert."""
+        return self.quarantine.list()
+
+    def release_quarantine(self, path: Optional[str] = None) -> Dict[str, Any]:
+        """Gibt eine bzw. alle Dateien aus der Quarantäne frei; ihr Inhalt wird beim nächsten Scan wieder extrahiert."""
+        paths = [path] if path else [item["path"] for item in self.quarantine.list()]
+        released = self.quarantine.release(path)
+        with self.store.batch():
+            for p in paths:
+                entry = self.index.get(p)
+                if entry is not None and entry.get("type") == "file" and entry.get("content_hash") is None and self.index_content:
+                    data = entry.to_dict()
+                    data["content_pending"] = True # plant die Datei beim nächsten Scan wieder ein
+                    self._put_entry(p, data)
+        return {"message": f"{released} Datei(en) aus der Quarantäne freigegeben.", "released": released}
+
+    def actualize_index(self, base_dirs: Optional[List[str]] = None, stats: Optional[ScanStats] = None) -> Dict[str, any]:
+        return self.scan_files(actualize=True, base_dirs=base_dirs, stats=stats)
+
+    def apply_changes(self, changes: Dict[str, str]) -> Dict[str, int]:
+        """
+        Wendet Dateiereignisse (Pfad -> added/modified/deleted) des Watchers einzeln auf den Index an, ohne die
+        Basisverzeichnisse neu zu durchlaufen. Maßgeblich ist der Zustand beim Anwenden, nicht die Ereignisart.
+        """
+        self.index_ready.wait()
+        with self._scan_activity(): return self._apply_changes(changes)
+
+    def _apply_changes(self, changes: Dict[str, str]) -> Dict[str, int]:
+        tasks: Dict[str, tuple] = {}
+        gone: List[str] = []
+        with self.store.batch():
+            for path in sorted(changes):
+                if not any(path_is_under(path, b) for b in self.base_dirs): continue
+                try: st = os.stat(path)
+                except OSError: gone.append(path); continue
+                name = os.path.basename(path)
+                if not stat.S_ISDIR(st.st_mode):
+                    if self._wants_file(name):
+                        task = self._plan_file_task(path, name, file_stat_info(st), actualize=True)
+                        if task: tasks[path] = task
+                    continue
+                if self._skip_dir(name): continue
+                folder_path = os.path.normpath(path)
+                self._put_entry(folder_path, {"type": "folder", "name": name, "path": folder_path})
+                if changes[path] != CHANGE_ADDED: continue
+                # Neu angelegte oder hineinverschobene Ordner bringen ihren Inhalt ohne eigene Ereignisse mit
+                for listing in ParallelWalker(self.walker_threads, skip_dir=self._skip_dir).walk([path]):
+                    for sub_name, sub_path in listing.dirs + listing.links:
+                        sub_path = os.path.normpath(sub_path)
+                        self._put_entry(sub_path, {"type": "folder", "name": sub_name, "path": sub_path})
+                    for file_name, file_path, stat_info in listing.files:
+                        if not self._wants_file(file_name): continue
+                        task = self._plan_file_task(file_path, file_name, stat_info, actualize=True)
+                        if task: tasks[file_path] = task
+
+            # Verschwundene Einträge (bei Ordnern samt Inhalt) sind Kandidaten für Verschiebungen
+            vanished = [g for g in gone if g in self.index]
+            gone_dirs = [g for g in vanished if self.index[g].get("type") == "folder"]
+            if gone_dirs:
+                vanished += [p for p in self.index.keys() if any(p != d and path_is_under(p, d) for d in gone_dirs)]
+        remaining = self._detect_moves(list(tasks.values()), vanished) # hasht außerhalb der Transaktion
+        moved = len(tasks) - len(remaining)
+        self._put_pending_entries(remaining)
+
+        updated = removed = 0
+        for batch, results, _ in self._iter_file_results([remaining]):
+            with self.store.batch(): self._put_results(batch, results)
+            updated += len(results)
+        with self.store.batch():
+            for path in vanished:
+                if path in self.index and not os.path.exists(path):
+                    self._drop_entry(path); removed += 1
+        self._schedule_pdf_backfill()
+        logging.info(f"Watcher: {updated} aktualisiert, {moved} verschoben, {removed} entfernt.")
+        return {"updated": updated, "moved": moved, "removed": removed}
+
+    def start_watching(self, debounce_ms: int = 1500, poll_interval: float = 10.0, force_polling: bool = False):
+        """Startet (bzw. startet neu) die Dateibeobachtung; Änderungen landen entprellt in apply_changes."""
+        self.stop_watching()
+        self._watch_options = {"debounce_ms": debounce_ms, "poll_interval": poll_interval, "force_polling": force_polling}
+        own_files = [os.path.splitext(f)[0] for f in (self.index_db_file, self.index_file, self.dupe_file)]
+        self.watcher = FileWatcher(self.base_dirs, self.apply_changes, skip_dir=self._skip_dir, ignore_prefixes=own_files,
+                                   **self._watch_options)
+        self.watcher.start()
+
+    def stop_watching(self):
+        if getattr(self, "watcher", None) is not None:
+            self.watcher.stop()
+            self.watcher = None
+
+    def _candidate_paths(self, grams: TrigramIndex, needle_groups: List[List[str]]) -> Optional[set]:
+        """Vereinigung der Trigramm-Kandidaten je Gruppe (innerhalb einer Gruppe UND). None = alles prüfen."""
+        result = set()
+        for needles in needle_groups:
+            doc_ids = grams.candidates(needles)
+            if doc_ids is None: return None
+            result.update(p for p in map(grams.path_of, doc_ids) if p is not None)
+        return result
+
+    def _file_entries(self, paths: Optional[set] = None):
+        items = self.index.items() if paths is None else ((p, self.index.get(p)) for p in paths)
+        for path, entry in items:
+            if entry and entry.get("type") == "file": yield path, entry
+
+    def search(self, query_input: str, search_limit: Optional[int] = None, mode: Optional[str] = None) -> Dict[str, any]:
+        mode = (mode or SEARCH_MODES[0]).lower()
+        if mode not in SEARCH_MODES: raise ValueError(f"Unbekannter Suchmodus '{mode}'. Erlaubt: {', '.join(SEARCH_MODES)}.")
+
+        if mode == "regex":
+            pattern = query_input.strip()
+            if not pattern: return {"message": "Keine Suchbegriffe.", "data": []}
+            try: regex = re.compile(pattern, re.IGNORECASE)
+            except re.error as e: raise ValueError(f"Ungültiger regulärer Ausdruck: {e}")
+            literals = [lit.lower() for lit in regex_required_literals(pattern, re.IGNORECASE)]
+            name_groups, content_groups = [literals], [[clean_content_static(lit) for lit in literals]]
+            # Leere Treffer (z.B. von '.*' oder 'a*' an jeder Position) zählen nicht, sonst passte jedes Muster überall
+            count_in = lambda text: sum(1 for m in regex.finditer(text) if m.end() > m.start())
+            is_exact = lambda name: regex.fullmatch(name) is not None
+            is_partial = lambda name: count_in(name) > 0
+        else:
+            queries = [q.strip().lower() for q in query_input.split(",") if q.strip()]
+            if not queries: return {"message": "Keine Suchbegriffe.", "data": []}
+            name_groups, content_groups = [[q] for q in queries], [[clean_content_static(q)] for q in queries]
+            is_exact = lambda name: any(q == name for q in queries)
+            is_partial = lambda name: any(q in name for q in queries)
+            def count_in(text: str) -> int:
+                text_lower = text.lower()
+                return sum(text_lower.count(q) for q in queries)
 
-    def search(self, query_input: str, search_limit: Optional[int] = None) -> Dict[str, any]:
-        queries = [q.strip().lower() for q in query_input.split(",") if q.strip()]
-        if not queries: return {"message": "Keine Suchbegriffe.", "data": []}
-        
         eff_limit = search_limit if search_limit is not None else self.search_limit
+        scores: Dict[str, int] = defaultdict(int)
+        unsearchable: List[str] = [] # Begriffe, für die die Inhaltssuche mangels Trigramm entfällt
+
+        # Filename matching: Trigramm-Vorauswahl, danach exakte Prüfung nur der Kandidaten
+        for path, entry in self._file_entries(self._candidate_paths(self.name_grams, name_groups)):
+            name_lower = (entry.get("name") or "").lower()
+            if is_exact(name_lower): scores[path] += self.filename_exact_match_score
+            elif is_partial(name_lower): scores[path] += self.filename_partial_match_score
+
+        if self.index_content and mode == "word":
+            # Content matching über den invertierten Index: nur Kandidaten-Dokumente werden bewertet
+            occurrences: Dict[int, int] = defaultdict(int)
+            for q_t in queries:
+                for doc_id, count in self.search_index.match_counts(q_t).items():
+                    occurrences[doc_id] += count
+            for doc_id, count in occurrences.items():
+                path = self.search_index.path_of(doc_id)
+                if path is not None: scores[path] += count * self.content_match_score
+        elif self.index_content:
+            # Teilstring/Regex: Trigramm-Vorauswahl über den bereinigten Inhalt, dann exakte Prüfung. Begriffe ohne
+            # Trigramm (kürzer als 3 Zeichen, Regex ohne festen Text) würden jeden Text laden und bleiben außen vor.
+            has_grams = lambda needles: any(trigrams(needle) for needle in needles)
+            if mode == "substring":
+                searchable = [q for q, needles in zip(queries, content_groups) if has_grams(needles)]
+                unsearchable = [q for q in queries if q not in searchable]
+                count_in = lambda text: sum(text.lower().count(q) for q in searchable)
+            elif not has_grams(content_groups[0]): unsearchable = [pattern]
+            content_groups = [needles for needles in content_groups if has_grams(needles)]
+            for path, entry in self._file_entries(self._candidate_paths(self.content_grams, content_groups)):
+                content = self.get_content(entry, "content") or ""
+                occurrences_in_file = count_in(content) if content else 0
+                if occurrences_in_file > 0: scores[path] += occurrences_in_file * self.content_match_score
+
         results = []
-        for path, entry in self.index.items():
-            if entry.get("type") != "file": continue
-            
-            current_score = 0 # Renamed from 'score' to avoid conflict with old 'match_score' usage
-            name_lower = entry.get("name","").lower()
-            content_lower = (entry.get("content","") or "").lower() 
-
-            # Filename matching
-            filename_already_scored = False
-            for q_term in queries:
-                if q_term == name_lower: 
-                    current_score += self.filename_exact_match_score
-                    filename_already_scored = True; break 
-            if not filename_already_scored:
-                for q_term in queries:
-                    if q_term in name_lower: 
-                        current_score += self.filename_partial_match_score
-                        filename_already_scored = True; break
-            
-            # Content matching
-            if self.index_content and content_lower:
-                occurrences = 0
-                for q_t in queries:
-                    occurrences += content_lower.count(q_t)
-                
-                if occurrences > 0: 
-                    current_score += self.content_match_score # Base score for any content match
-                    if occurrences > 1 : # Add more for multiple occurrences
-                         current_score += (occurrences -1) * self.content_match_score 
-            
-            if current_score > 0:
+        for path, current_score in scores.items():
+            entry = self.index.get(path) # kann der Watcher inzwischen entfernt haben
+            if entry is not None and current_score > 0:
                 results.append({
                     "file": {
                         "name": entry.get("name"), 
                         "path": entry.get("path"), # path is the key, but also stored in entry
                         "size_bytes": entry.get("size_bytes"), 
                         "modified_at": entry.get("modified_at"), 
-                        "type": entry.get("type")
+                        "type": entry.get("type"),
+                        "content_pending": bool(entry.get("content_pending")), # Inhalt noch nicht indiziert
                     },
                     "match_count": current_score # CHANGED from match_score to match_count
                 })
@@ -458,8 +1380,14 @@ class FileScanner:
         results.sort(key=lambda x: (-x["match_count"], (x["file"].get("name") or "").lower()))
         if eff_limit and eff_limit > 0: results = results[:eff_limit]
         
-        logging.info(f"Suche für '{query_input}' ergab {len(results)} Treffer.")
-        return {"message": f"{len(results)} Treffer.", "data": results}
+        pending = self.index.count_flagged("content_pending")
+        message = f"{len(results)} Treffer."
+        if unsearchable:
+            message += (f" Inhaltssuche übersprungen für {', '.join(repr(q) for q in unsearchable)}: "
+                        "mindestens 3 zusammenhängende Zeichen nötig (nur Dateinamen durchsucht).")
+        if pending and self.index_content: message += f" {pending} Datei(en) sind noch nicht inhaltlich indiziert."
+        logging.info(f"Suche ({mode}) für '{query_input}' ergab {len(results)} Treffer.")
+        return {"message": message, "data": results, "content_pending": pending}
 
     def search_in_file(self, path: str, query_input: str) -> Dict[str, any]:
         entry = self.index.get(path)
@@ -467,10 +1395,14 @@ class FileScanner:
         if not entry or entry.get("type") != "file":
             return default_resp(f"Datei '{path}' nicht im Index oder kein Dateityp.")
 
+        if entry.get("pdf_pages"): # nur die ersten Seiten indiziert: Rest jetzt extrahieren und im Index ablegen
+            self._complete_pdf_pages(path)
+            entry = self.index.get(path)
+            if not entry: return default_resp(f"Datei '{path}' nicht im Index oder kein Dateityp.")
         file_info_out = {k:v for k,v in entry.items() if k not in ['content_full', 'cleaned_content', 'content_hash', 'file_hash', 'content']}
-        file_info_out['content_preview'] = entry.get('content') 
-
-        raw_content = entry.get("content_full") or entry.get("content") 
+        raw_content = self.get_content(entry)
+        file_info_out['content_preview'] = self._preview_of(raw_content)
+        if entry.get("content_pending"): return default_resp(f"Inhalt von '{path}' wird noch indiziert.", file_info_out)
         if not raw_content: return default_resp(f"Kein Inhalt für '{path}'.", file_info_out)
         
         # Normalisiere die Zeilenumbrüche, BEVOR wir suchen und Offsets berechnen.
@@ -489,7 +1421,9 @@ class FileScanner:
                 if idx == -1: break
                 raw_matches.append((idx, idx + len(q_term)))
         
-        if not raw_matches: return default_resp(f"Keine Treffer für '{query_input}' in '{path}'.", file_info_out)
+        if not raw_matches:
+            note = f" (nur die ersten {len(raw_content)} Zeichen sind indiziert)" if entry.get("content_truncated") else ""
+            return default_resp(f"Keine Treffer für '{query_input}' in '{path}'{note}.", file_info_out)
 
         merged_hits = merge_intervals(sorted(raw_matches, key=lambda x: x[0]))
         hit_count = len(merged_hits)
@@ -517,17 +1451,12 @@ class FileScanner:
 
         if not (isinstance(eff_age, (int, float)) and eff_age > 0): return []
         now_utc = datetime.datetime.now(datetime.timezone.utc)
-        cutoff = now_utc - datetime.timedelta(days=eff_age)
+        cutoff_ts = (now_utc - datetime.timedelta(days=eff_age)).timestamp()
         old = []
-        for data in self.index.values(): # Iterate over values (dictionaries)
-            if data.get("type") == "file" and "modified_at" in data:
-                try:
-                    mod_dt = datetime.datetime.fromisoformat(data["modified_at"])
-                    # Ensure timezone awareness for comparison
-                    mod_utc = mod_dt.astimezone(datetime.timezone.utc) if mod_dt.tzinfo else mod_dt.replace(tzinfo=datetime.timezone.utc)
-                    if mod_utc <= cutoff:
-                        d_copy = data.copy(); d_copy['_internal_sort_age_dt_'] = mod_utc; old.append(d_copy)
-                except Exception: pass 
+        for data in self.index.values(): # Numerische mtime-Spalte, kein ISO-Parsing pro Eintrag
+            mtime = data.mtime
+            if data.get("type") == "file" and mtime is not None and mtime <= cutoff_ts:
+                d_copy = data.to_dict(); d_copy['_internal_sort_age_dt_'] = mtime; old.append(d_copy)
         
         rev = (eff_sort_order == 'inverted')
         sort_key_func = lambda x: x['_internal_sort_age_dt_'] # Default to age
@@ -555,43 +1484,40 @@ class FileScanner:
             return {}
 
         content_groups: Dict[int, List[Tuple[str, str, Dict[str,Any]]]] = defaultdict(list)
+        cleaned_by_hash: Dict[str, str] = {} # identische Inhalte nur einmal laden
         for path, entry in self.index.items():
-            if entry.get("type") == "file" and entry.get("cleaned_content") and \
+            if entry.get("type") == "file" and entry.get("content_hash") and \
                 entry.get("cleaned_content_length", 0) >= self.snippet_length:
+                c_hash = entry["content_hash"]
+                if c_hash not in cleaned_by_hash: cleaned_by_hash[c_hash] = self.get_content(entry, "cleaned_content") or ""
+                if not cleaned_by_hash[c_hash]: continue
                 length = entry["cleaned_content_length"]
                 key = (length // self.length_range_step) * self.length_range_step
-                content_groups[key].append((path, entry["cleaned_content"], entry))
+                content_groups[key].append((path, cleaned_by_hash[c_hash], entry))
         
         potential_groups = {k:v for k,v in content_groups.items() if len(v) >= self.min_category_length}
         if not potential_groups: logging.info("Keine potenziellen Duplikatgruppen nach Längenfilter."); return {}
         
-        tasks = [] 
+        # Identische Inhalte (gleicher content_hash, z.B. Kopien) brauchen nur eine Signatur
+        members_by_hash: Dict[str, List[Tuple[str, Dict[str, Any], int]]] = defaultdict(list)
         for length_key, items_in_group in potential_groups.items():
             for path, cleaned_c, f_info in items_in_group:
-                tasks.append((cleaned_c, self.snippet_length, self.snippet_step, self.signature_size, 
-                            coeffs_to_use, _PRIME_NUMBER, path, f_info, length_key))
+                members_by_hash[f_info["content_hash"]].append((path, f_info, length_key))
 
-        num_workers: int
-        try:
-            cpu_c = os.cpu_count()
-            if cpu_c is None: num_workers = max(1, self.num_processes)
-            elif not self.num_processes: num_workers = cpu_c -1 if cpu_c > 1 else 1
-            elif cpu_c > 1: num_workers = min(max(self.num_processes, 1), cpu_c -1)
-            else: num_workers = 1
-        except (NotImplementedError, Exception): num_workers = max(1, self.num_processes)
-        if num_workers < 1: num_workers = 1
-        logging.info(f"Dedupe: Erstelle {len(tasks)} Signaturen mit {num_workers} Prozess(en).")
+        file_count = sum(len(members) for members in members_by_hash.values())
+        logging.info(f"Dedupe: Erstelle {len(members_by_hash)} Signaturen für {file_count} Dateien mit {self.worker_pool.max_workers} Prozess(en).")
 
         files_with_sigs: List[Dict[str, Any]] = [] 
-        if tasks:
-            with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
-                future_map = {executor.submit(generate_simple_shingle_signature, t[0],t[1],t[2],t[3],t[4],t[5]): (t[6],t[7],t[8]) for t in tasks}
-                for future in concurrent.futures.as_completed(future_map):
-                    path, f_info, l_key = future_map[future]
-                    try:
-                        sig = future.result()
-                        if sig: files_with_sigs.append({"path":path, "signature":sig, "file_info":f_info, "length_key":l_key})
-                    except Exception as e: logging.error(f"Signaturfehler für {path}: {e}")
+        sig_args = ((cleaned_by_hash[c_hash], self.snippet_length, self.snippet_step, self.signature_size,
+                     coeffs_to_use, _PRIME_NUMBER, c_hash) for c_hash in members_by_hash)
+        for args, future in self.worker_pool.map_unordered(_signature_task, sig_args):
+            members = members_by_hash[args[-1]]
+            try: sig = future.result()
+            except Exception as e:
+                logging.error(f"Signaturfehler für {members[0][0]}: {e}"); continue
+            if not sig: continue
+            for path, f_info, l_key in members:
+                files_with_sigs.append({"path":path, "signature":sig, "file_info":f_info, "length_key":l_key})
         
         logging.info(f"Dedupe: Vergleiche {len(files_with_sigs)} Signaturen...")
         sigs_by_len_key = defaultdict(list)
@@ -687,14 +1613,62 @@ class FileScanner:
         return {item.pop('id'):item for item in filtered}
 
     def save_index(self):
+        # Jede Änderung liegt bereits fsync'd im Journal; hier wird es nur vollständig in den Snapshot gefaltet.
         if not self.index: return {"message":"Index leer, nichts zu speichern."}
         try:
-            i_dir = os.path.dirname(self.index_file)
-            if i_dir: os.makedirs(i_dir, exist_ok=True)
-            with open(self.index_file, "w", encoding="utf-8") as f: json.dump(dict(self.index), f, indent=4, ensure_ascii=False)
-            return {"message":f"Index gespeichert in {self.index_file}."}
+            self.collect_garbage()
+            self.store.checkpoint(truncate=True)
+            return {"message":f"Index gespeichert in {self.index_db_file}."}
         except Exception as e: return {"message":f"Speicherfehler Index: {e}"}
 
+    @contextmanager
+    def _scan_activity(self) -> Iterator[None]:
+        """Markiert einen laufenden Scan; Worker können dann Cache-Treffer auf Blobs liefern, die noch kein Eintrag hält."""
+        with self._scan_guard: self._scans_active += 1 # wartet ggf. auf eine laufende Bereinigung
+        try: yield
+        finally:
+            with self._scan_guard: self._scans_active -= 1
+
+    def collect_garbage(self) -> int:
+        """
+        Entfernt Inhalte, auf die kein Eintrag mehr verweist (nach Scans und beim Speichern, nie im Kompaktierer).
+        Während eines Scans unterbleibt sie, und solange sie läuft, beginnt kein Scan.
+        """
+        with self._scan_guard:
+            if self._scans_active:
+                logging.info("Blob-Bereinigung übersprungen: ein Scan läuft.")
+                return 0
+            try: return self.store.collect_garbage()
+            except Exception as e:
+                logging.error(f"Blob-Bereinigung fehlgeschlagen: {e}")
+                return 0
+
+    def _requeue_lost_contents(self, scan_dirs: List[str]):
+        """Einträge, deren Text im Blob-Speicher fehlt, werden zur Neuextraktion vorgemerkt (repariert ältere Verluste)."""
+        hashes = {entry.get("content_hash") for path, entry in self.index.items() if entry.get("type") == "file"
+                  and entry.get("content_hash") and any(path_is_under(path, b) for b in scan_dirs)}
+        missing = self.store.missing_blobs(hashes)
+        if not missing: return
+        requeued = 0
+        with self.store.batch():
+            for path, entry in self.index.items():
+                if entry.get("type") != "file" or entry.get("content_hash") not in missing: continue
+                data = entry.to_dict()
+                data.update(content_hash=None, cleaned_content_length=0, content_pending=True)
+                self._put_entry(path, data) # nimmt auch die Suchdokumente des verlorenen Textes heraus
+                requeued += 1
+        logging.warning(f"{requeued} Einträge ohne Text im Blob-Speicher, werden neu extrahiert.")
+
+    def start_compactor(self): self.store.start_compactor()
+
+    def close(self):
+        self.stop_watching()
+        self.stop_pdf_backfill()
+        self.save_index()
+        self.save_snapshot()
+        self.store.close()
+        if self._owns_pool: self.worker_pool.shutdown()
+
     def update_file(self, update_data: Dict[str, Any]): 
         path = update_data.get('path')
         if not path or not isinstance(path,str) or path not in self.index:
@@ -728,16 +1702,26 @@ class FileScanner:
 
 
         if not changed: return {"message":f"Keine unterstützten Änderungen für '{path}'.", "updated":False}
+        if 'name' in changed: self.name_grams.update(path, (entry.get('name') or '').lower())
+        self._persist_entry(path)
         logging.info(f"Datei '{path}' aktualisiert (Felder: {', '.join(changed)}).")
         return {"message":f"'{path}' aktualisiert.", "updated":True, "updated_fields":changed}
     
     def delete_index(self):
+        self.stop_pdf_backfill()
         msg_parts = []
         if os.path.exists(self.index_file):
             try: os.remove(self.index_file); msg_parts.append(f"Indexdatei {self.index_file} gelöscht.")
             except Exception as e: msg_parts.append(f"Fehler Löschen Indexdatei: {e}.")
         else: msg_parts.append(f"Indexdatei {self.index_file} nicht gefunden.")
-        self.index = defaultdict(dict)
+        try: self.store.clear(); msg_parts.append(f"Indexdatenbank {self.index_db_file} geleert.")
+        except Exception as e: msg_parts.append(f"Fehler Leeren Indexdatenbank: {e}.")
+        self._snapshot_generation = None
+        if os.path.exists(self.snapshot_file):
+            try: os.remove(self.snapshot_file)
+            except Exception as e: msg_parts.append(f"Fehler Löschen Snapshot: {e}.")
+        self.scan_checkpoint.discard()
+        self._reset_in_memory()
         self._current_scan_seen_paths = set() 
         self.duplicate_groups = {}
         msg_parts.append("In-Memory Daten zurückgesetzt.")
@@ -747,10 +1731,7 @@ class FileScanner:
 
     def remove_from_index(self, path_to_remove: str):
         if not isinstance(path_to_remove, str) or not path_to_remove: return {"message":"Ungültiger Pfad.", "removed":False}
-        removed = False
-        if path_to_remove in self.index:
-            try: del self.index[path_to_remove]; removed=True
-            except Exception: pass 
+        removed = self._drop_entry(path_to_remove)
         if path_to_remove in self._current_scan_seen_paths: # Also remove from temporary seen set if it exists
              self._current_scan_seen_paths.discard(path_to_remove)
 
@@ -770,6 +1751,7 @@ class FileScanner:
         for pdf_path in pdf_paths_to_ocr:
             entry = self.index.get(pdf_path) # Get fresh entry in case it was modified
             if not entry: continue 
+            entry = entry.to_dict()
             try:
                 ocr_text = self.processor.get_ocr_text_from_pdf(pdf_path) 
                 if ocr_text and ocr_text.strip():
@@ -777,14 +1759,10 @@ class FileScanner:
                     if entry.get('content_hash') == new_content_hash and not overwrite:
                         processed_count+=1; continue 
                     
-                    entry['content_full'] = ocr_text
-                    entry['content'] = ocr_text[:self.max_content_size_let] if self.max_content_size_let else ocr_text
-                    entry['content_hash'] = new_content_hash
-                    cleaned = clean_content_static(ocr_text) 
-                    entry['cleaned_content'] = cleaned
-                    entry['cleaned_content_length'] = len(cleaned)
+                    if overwrite: entry['file_hash'], entry['quick_hash'] = self._current_hashes(pdf_path, entry)
+                    self._set_text(entry, ocr_text)
                     entry['modified_at'] = datetime.datetime.now().isoformat()
-                    if overwrite: entry['file_hash'] = _compute_hash_static(pdf_path) 
+                    self._put_entry(pdf_path, entry)
                     processed_count += 1
                 else: error_count +=1 
             except Exception as e: error_count+=1; logging.error(f"OCR Fehler für {pdf_path} in process_index: {e}")
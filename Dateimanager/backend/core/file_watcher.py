@@ -0,0 +1,146 @@
+import os
+import time
+import logging
+import threading
+from typing import List, Dict, Optional, Callable, Iterable, Tuple
+
+from backend.core.parallel_walker import ParallelWalker
+
+try: import watchfiles # inotify (Linux), FSEvents (macOS), ReadDirectoryChangesW (Windows)
+except ImportError: watchfiles = None
+
+CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_DELETED = "added", "modified", "deleted"
+
+class ChangeQueue:
+    """
+    Entprellte Sammelstelle für Dateiereignisse: pro Pfad zählt nur das letzte Ereignis. Ausgeliefert wird,
+    sobald `debounce` Sekunden Ruhe herrscht, spätestens aber nach `max_delay` Sekunden Dauerfeuer.
+    """
+
+    def __init__(self, debounce: float = 1.5, max_delay: float = 10.0):
+        self.debounce, self.max_delay = debounce, max_delay
+        self._pending: Dict[str, str] = {}
+        self._first = self._last = 0.0
+        self._cond = threading.Condition()
+
+    def put(self, path: str, kind: str):
+        with self._cond:
+            now = time.monotonic()
+            if not self._pending: self._first = now
+            self._pending[path] = kind
+            self._last = now
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def take(self, stop: threading.Event, timeout: float = 0.5) -> Dict[str, str]:
+        """Wartet höchstens `timeout` Sekunden auf einen fälligen Stapel; leer, falls (noch) nichts fällig ist."""
+        with self._cond:
+            if not self._pending: self._cond.wait(timeout)
+            if not self._pending or stop.is_set(): return {}
+            now = time.monotonic()
+            due = min(self._last + self.debounce, self._first + self.max_delay)
+            if now < due:
+                self._cond.wait(min(timeout, due - now))
+                return {}
+            batch, self._pending = self._pending, {}
+            return batch
+
+class FileWatcher:
+    """
+    Beobachtet die Basisverzeichnisse und liefert entprellte Änderungen (Pfad -> added/modified/deleted)
+    an `on_changes`. Nutzt watchfiles (inotify unter Linux), sonst einen Polling-Fallback, der die
+    Verzeichnisse im Intervall mit dem ParallelWalker abgleicht.
+    """
+
+    def __init__(self, base_dirs: Iterable[str], on_changes: Callable[[Dict[str, str]], None],
+                 skip_dir: Optional[Callable[[str], bool]] = None, ignore_prefixes: Iterable[str] = (),
+                 debounce_ms: int = 1500, poll_interval: float = 10.0, force_polling: bool = False):
+        self.base_dirs = [os.path.normpath(b) for b in base_dirs if b]
+        self.on_changes = on_changes
+        self.skip_dir = skip_dir or (lambda name: False)
+        self.ignore_prefixes = [os.path.normcase(os.path.normpath(p)) for p in ignore_prefixes if p] # z.B. eigene Indexdateien
+        self.poll_interval = poll_interval
+        self.use_polling = force_polling or watchfiles is None
+        self.queue = ChangeQueue(debounce=debounce_ms / 1000.0)
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def running(self) -> bool:
+        return any(t.is_alive() for t in self._threads)
+
+    def is_ignored(self, path: str) -> bool:
+        """Wendet die Ignorierregeln des Scanners (Ordnernamen, eigene Indexdateien) auf einen Pfad an."""
+        norm = os.path.normcase(os.path.normpath(path))
+        if any(norm.startswith(p) for p in self.ignore_prefixes): return True
+        for base in self.base_dirs:
+            try: rel = os.path.relpath(path, base)
+            except ValueError: continue # anderes Laufwerk
+            if rel.startswith(os.pardir): continue
+            return any(self.skip_dir(part) for part in rel.split(os.sep)[:-1] if part != os.curdir)
+        return True
+
+    def start(self):
+        if self.running: return
+        watched = [b for b in self.base_dirs if os.path.isdir(b)]
+        if not watched:
+            logging.warning("Watcher: keine existierenden Basisverzeichnisse, nicht gestartet.")
+            return
+        self._stop.clear()
+        source = self._poll_loop if self.use_polling else self._watch_loop
+        self._threads = [threading.Thread(target=source, args=(watched,), daemon=True, name="file-watcher"),
+                         threading.Thread(target=self._dispatch_loop, daemon=True, name="file-watcher-dispatch")]
+        for t in self._threads: t.start()
+        logging.info(f"Watcher gestartet ({'Polling' if self.use_polling else 'watchfiles'}) für {len(watched)} Verzeichnis(se).")
+
+    def stop(self):
+        self._stop.set()
+        for t in self._threads: t.join(timeout=5)
+        self._threads = []
+
+    # --- Quellen ---
+    def _watch_loop(self, watched: List[str]):
+        kinds = {watchfiles.Change.added: CHANGE_ADDED, watchfiles.Change.modified: CHANGE_MODIFIED,
+                 watchfiles.Change.deleted: CHANGE_DELETED}
+        try:
+            # watchfiles bündelt selbst nur kurz; das eigentliche Entprellen übernimmt die ChangeQueue
+            for changes in watchfiles.watch(*watched, watch_filter=lambda _c, p: not self.is_ignored(p),
+                                            debounce=200, stop_event=self._stop, raise_interrupt=False):
+                for change, path in changes: self.queue.put(path, kinds.get(change, CHANGE_MODIFIED))
+        except Exception as e:
+            if self._stop.is_set(): return
+            logging.error(f"Watcher: watchfiles fehlgeschlagen ({e}), wechsle auf Polling.")
+            self.use_polling = True
+            self._poll_loop(watched)
+
+    def _snapshot(self, watched: List[str]) -> Dict[str, Tuple]:
+        walker = ParallelWalker(skip_dir=self.skip_dir)
+        snapshot = {}
+        for listing in walker.walk(watched):
+            if self._stop.is_set(): break
+            for _, path in listing.dirs + listing.links: snapshot[path] = ()
+            for _, path, info in listing.files:
+                if not self.is_ignored(path): snapshot[path] = info[:2]
+        return snapshot
+
+    def _poll_loop(self, watched: List[str]):
+        previous = self._snapshot(watched)
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot(watched)
+            if self._stop.is_set(): return
+            for path, state in current.items():
+                old = previous.get(path)
+                if old is None: self.queue.put(path, CHANGE_ADDED)
+                elif old != state: self.queue.put(path, CHANGE_MODIFIED)
+            for path in previous.keys() - current.keys(): self.queue.put(path, CHANGE_DELETED)
+            previous = current
+
+    # --- Auslieferung ---
+    def _dispatch_loop(self):
+        while not self._stop.is_set():
+            batch = self.queue.take(self._stop)
+            if not batch: continue
+            try: self.on_changes(batch)
+            except Exception as e: logging.error(f"Watcher: Fehler beim Anwenden von {len(batch)} Änderung(en): {e}", exc_info=True)
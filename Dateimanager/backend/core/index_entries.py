@@ -0,0 +1,275 @@
+import math
+import datetime
+from array import array
+from collections.abc import MutableMapping
+from typing import Dict, List, Optional, Any, Iterator, Tuple
+
+# Typ-Codes der Spalte `_type`; 0 = freie Zeile, 3 = unbekannter Typ (steht dann in den Extras)
+_TYPE_CODES = {"file": 1, "folder": 2}
+_TYPE_NAMES = {1: "file", 2: "folder"}
+_OTHER_TYPE = 3
+
+_FILE_KEYS = ("type", "name", "path", "size_bytes", "modified_at", "file_hash", "quick_hash", "content_hash",
+              "cleaned_content_length", "device", "inode")
+_FOLDER_KEYS = ("type", "name", "path")
+_NO_VALUE = object()
+
+def split_path(path: str) -> Tuple[str, str]:
+    """Trennt in Elternpfad (inkl. Trenner) und Basisnamen; prefix + name ergibt immer wieder den Pfad."""
+    i = max(path.rfind("/"), path.rfind("\\"))
+    return path[:i + 1], path[i + 1:]
+
+def _pack_hash(value: Any) -> Any:
+    # Hex-Digests als Bytes halbieren den Speicher; alles andere bleibt unverändert
+    if isinstance(value, str) and value == value.lower() and len(value) % 2 == 0:
+        try: return bytes.fromhex(value)
+        except ValueError: pass
+    return value
+
+def _unpack_hash(value: Any) -> Any:
+    return value.hex() if isinstance(value, bytes) else value
+
+def _to_timestamp(value: Any) -> Optional[float]:
+    if not isinstance(value, str): return None
+    try: return datetime.datetime.fromisoformat(value).timestamp()
+    except ValueError: return None
+
+class IndexEntry:
+    """
+    Leichte Sicht auf eine Zeile der EntryTable mit dict-artiger Schnittstelle (get, [], items ...).
+    Schreibzugriffe gehen direkt in die Spalten; `to_dict()` liefert eine echte Kopie.
+    """
+    __slots__ = ("_table", "_row")
+
+    def __init__(self, table: "EntryTable", row: int):
+        self._table = table
+        self._row = row
+
+    def keys(self) -> List[str]: return self._table._keys(self._row)
+    def __iter__(self) -> Iterator[str]: return iter(self.keys())
+    def __len__(self) -> int: return len(self.keys())
+    def __contains__(self, key: str) -> bool: return key in self.keys()
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._table._get(self._row, key)
+        if value is _NO_VALUE: raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._table._get(self._row, key)
+        return default if value is _NO_VALUE else value
+
+    def __setitem__(self, key: str, value: Any): self._table._set(self._row, key, value)
+    def items(self) -> List[Tuple[str, Any]]: return [(k, self[k]) for k in self.keys()]
+    def values(self) -> List[Any]: return [self[k] for k in self.keys()]
+    def to_dict(self) -> Dict[str, Any]: return dict(self.items())
+    def copy(self) -> Dict[str, Any]: return self.to_dict()
+
+    @property
+    def mtime(self) -> Optional[float]:
+        """Änderungszeit als Unix-Zeitstempel (None, falls unbekannt)."""
+        ts = self._table._mtime[self._row]
+        return None if math.isnan(ts) else ts
+
+    def __repr__(self) -> str: return f"IndexEntry({self.to_dict()!r})"
+
+class EntryTable(MutableMapping):
+    """
+    Kompakte, spaltenweise Ablage des Dateiindex (Pfad -> Eintrag).
+    Pfade werden als internierte Elternverzeichnis-ID + Basisname gespeichert, Größe, Änderungszeit,
+    Typ und bereinigte Länge in typisierten Arrays, Hashes als Bytes. Seltene oder abweichende Felder
+    landen in einem kleinen Extra-Dict pro Zeile. Nach außen verhält sich die Tabelle wie ein dict,
+    dessen Werte IndexEntry-Sichten sind.
+    """
+
+    def __init__(self):
+        self._dirs: List[str] = []
+        self._dir_ids: Dict[str, int] = {}
+        self._children: List[Dict[str, int]] = [] # je Elternverzeichnis: Basisname -> Zeile
+        self._parent = array("l")
+        self._base: List[Optional[str]] = []
+        self._type = bytearray()
+        self._size = array("q")
+        self._mtime = array("d")
+        self._clean_len = array("q")
+        self._dev = array("Q") # st_dev/st_ino zur Erkennung verschobener Dateien, 0 = unbekannt
+        self._ino = array("Q")
+        self._file_hash: List[Any] = []
+        self._quick_hash: List[Any] = []
+        self._content_hash: List[Any] = []
+        self._extra: Dict[int, Dict[str, Any]] = {}
+        self._free_rows: List[int] = []
+        self._count = 0
+
+    # -- Zeilenverwaltung --
+    def _find(self, path: str) -> Optional[int]:
+        if not isinstance(path, str): return None
+        prefix, name = split_path(path)
+        dir_id = self._dir_ids.get(prefix)
+        return None if dir_id is None else self._children[dir_id].get(name)
+
+    def _allocate(self, path: str) -> int:
+        prefix, name = split_path(path)
+        dir_id = self._dir_ids.get(prefix)
+        if dir_id is None:
+            dir_id = len(self._dirs)
+            self._dirs.append(prefix); self._dir_ids[prefix] = dir_id; self._children.append({})
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._parent[row], self._base[row] = dir_id, name
+        else:
+            row = len(self._base)
+            self._parent.append(dir_id); self._base.append(name); self._type.append(0)
+            self._size.append(-1); self._mtime.append(math.nan); self._clean_len.append(0)
+            self._dev.append(0); self._ino.append(0)
+            self._file_hash.append(None); self._quick_hash.append(None); self._content_hash.append(None)
+        self._children[dir_id][name] = row
+        self._count += 1
+        return row
+
+    def _reset_row(self, row: int):
+        self._type[row] = 0
+        self._size[row], self._mtime[row], self._clean_len[row] = -1, math.nan, 0
+        self._dev[row] = self._ino[row] = 0
+        self._file_hash[row] = self._quick_hash[row] = self._content_hash[row] = None
+        self._extra.pop(row, None)
+
+    def path_of_row(self, row: int) -> str:
+        return self._dirs[self._parent[row]] + self._base[row]
+
+    # -- Zeilennummern als Dokument-IDs der Suchindizes --
+    def row_of(self, path: str) -> Optional[int]:
+        return self._find(path)
+
+    def path_at(self, row: int) -> Optional[str]:
+        """Pfad einer belegten Zeile, None für freie oder unbekannte Zeilen (auch wenn sie gerade frei wird)."""
+        if not 0 <= row < len(self._base): return None
+        base = self._base[row] # einmal lesen: ein paralleles Entfernen setzt es auf None
+        return None if base is None else self._dirs[self._parent[row]] + base
+
+    # -- Feldzugriff --
+    def _keys(self, row: int) -> List[str]:
+        base = _FILE_KEYS if self._type[row] == 1 else _FOLDER_KEYS
+        extra = self._extra.get(row)
+        return list(base) + [k for k in extra if k not in base] if extra else list(base)
+
+    def _get(self, row: int, key: str) -> Any:
+        extra = self._extra.get(row)
+        if extra and key in extra: return extra[key]
+        code = self._type[row]
+        if key == "type": return _TYPE_NAMES.get(code)
+        if key == "name": return self._base[row]
+        if key == "path": return self.path_of_row(row)
+        if code != 1: return _NO_VALUE
+        if key == "size_bytes": return None if self._size[row] < 0 else self._size[row]
+        if key == "modified_at":
+            ts = self._mtime[row]
+            return None if math.isnan(ts) else datetime.datetime.fromtimestamp(ts).isoformat()
+        if key == "file_hash": return _unpack_hash(self._file_hash[row])
+        if key == "quick_hash": return _unpack_hash(self._quick_hash[row])
+        if key == "content_hash": return _unpack_hash(self._content_hash[row])
+        if key == "cleaned_content_length": return self._clean_len[row]
+        if key == "device": return self._dev[row] or None
+        if key == "inode": return self._ino[row] or None
+        return _NO_VALUE
+
+    def _set(self, row: int, key: str, value: Any):
+        stored = True # False: Wert passt in keine Spalte und kommt in die Extras
+        if self._type[row] != 1 and key not in _FOLDER_KEYS: stored = False
+        elif key == "type":
+            code = _TYPE_CODES.get(value)
+            self._type[row] = code or _OTHER_TYPE
+            stored = code is not None
+        elif key == "name": stored = value == self._base[row]
+        elif key == "path": stored = value == self.path_of_row(row)
+        elif key == "size_bytes":
+            if value is None: self._size[row] = -1
+            elif isinstance(value, int) and not isinstance(value, bool) and value >= 0: self._size[row] = value
+            else: stored = False
+        elif key == "modified_at":
+            ts = _to_timestamp(value)
+            self._mtime[row] = math.nan if ts is None else ts
+            stored = value is None or (ts is not None and datetime.datetime.fromtimestamp(ts).isoformat() == value)
+        elif key == "file_hash": self._file_hash[row] = _pack_hash(value)
+        elif key == "quick_hash": self._quick_hash[row] = _pack_hash(value)
+        elif key == "content_hash": self._content_hash[row] = _pack_hash(value)
+        elif key == "cleaned_content_length":
+            if isinstance(value, int) and not isinstance(value, bool): self._clean_len[row] = value
+            else: stored = False
+        elif key in ("device", "inode"):
+            column = self._dev if key == "device" else self._ino
+            if value is None: column[row] = 0
+            elif isinstance(value, int) and not isinstance(value, bool) and 0 <= value < 2 ** 64: column[row] = value
+            else: stored = False
+        else: stored = False
+
+        extra = self._extra.get(row)
+        if stored:
+            if extra and key in extra:
+                del extra[key]
+                if not extra: del self._extra[row]
+        else:
+            self._extra.setdefault(row, {})[key] = value
+
+    # -- Mapping-Schnittstelle --
+    def __getitem__(self, path: str) -> IndexEntry:
+        row = self._find(path)
+        if row is None: raise KeyError(path)
+        return IndexEntry(self, row)
+
+    def get(self, path: str, default: Any = None) -> Optional[IndexEntry]:
+        row = self._find(path)
+        return default if row is None else IndexEntry(self, row)
+
+    def __contains__(self, path: object) -> bool:
+        return self._find(path) is not None
+
+    def __setitem__(self, path: str, data: Any):
+        row = self._find(path)
+        if row is None: row = self._allocate(path)
+        else: self._reset_row(row)
+        data = dict(data)
+        self._set(row, "type", data.pop("type", None))
+        for key, value in data.items(): self._set(row, key, value)
+
+    def __delitem__(self, path: str):
+        row = self._find(path)
+        if row is None: raise KeyError(path)
+        del self._children[self._parent[row]][self._base[row]]
+        self._reset_row(row)
+        self._base[row] = None
+        self._free_rows.append(row)
+        self._count -= 1
+
+    def __len__(self) -> int:
+        return self._count
+
+    # Die Iteratoren vertragen parallele Änderungen (Watcher, Scan-Jobs): inzwischen freie Zeilen werden übersprungen
+    def __iter__(self) -> Iterator[str]:
+        for row, code in enumerate(self._type):
+            path = self.path_at(row) if code else None
+            if path is not None: yield path
+
+    def items(self) -> Iterator[Tuple[str, IndexEntry]]:
+        for row, code in enumerate(self._type):
+            path = self.path_at(row) if code else None
+            if path is not None: yield path, IndexEntry(self, row)
+
+    def values(self) -> Iterator[IndexEntry]:
+        for row, code in enumerate(self._type):
+            if code: yield IndexEntry(self, row)
+
+    def count_flagged(self, key: str) -> int:
+        """Zahl der Einträge, bei denen das Extra-Feld `key` gesetzt ist (z.B. content_pending)."""
+        return sum(1 for extra in list(self._extra.values()) if extra.get(key))
+
+    def paths_flagged(self, key: str) -> List[str]:
+        """Pfade der Einträge, bei denen das Extra-Feld `key` gesetzt ist."""
+        paths = (self.path_at(row) for row, extra in list(self._extra.items()) if extra.get(key))
+        return [path for path in paths if path is not None]
+
+    def clear(self):
+        self.__init__()
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        return {path: entry.to_dict() for path, entry in self.items()}
@@ -0,0 +1,645 @@
+import os
+import re
+import sys
+import glob
+import json
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, ExitStack
+from typing import Dict, Any, Optional, Iterable, Iterator, Tuple, Callable, List, Set
+
+# Textfelder, die nicht im Eintrag gespeichert werden: der Volltext liegt einmal pro content_hash im
+# Blob-Speicher, 'content' und 'cleaned_content' werden bei Bedarf daraus abgeleitet.
+CONTENT_FIELDS = ("content", "content_full", "cleaned_content")
+
+def pack_text(text: str) -> bytes:
+    return zlib.compress(text.encode("utf-8", "surrogatepass"), 6)
+
+def unpack_text(data: bytes) -> str:
+    return zlib.decompress(data).decode("utf-8", "surrogatepass")
+
+_EXTRACTION_READERS: Dict[str, sqlite3.Connection] = {} # je Worker-Prozess eine Lese-Verbindung pro Blob-Datenbank
+
+def lookup_extraction(db_file: str, cache_key: str) -> Optional[Tuple[str, int]]:
+    """
+    (content_hash, bereinigte Länge) einer früheren Extraktion aus dem Blob-Speicher `db_file`, sofern der Text
+    dort noch liegt. Für Worker-Prozesse gedacht: nur lesend, ohne den Speicher des Hauptprozesses.
+    """
+    try:
+        conn = _EXTRACTION_READERS.get(db_file)
+        if conn is None:
+            if not os.path.exists(db_file): return None
+            conn = sqlite3.connect(db_file, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA query_only=1")
+            _EXTRACTION_READERS[db_file] = conn
+        row = conn.execute("""
+            SELECT x.content_hash, x.cleaned_length FROM extractions x JOIN blobs b ON b.content_hash = x.content_hash
+            WHERE x.cache_key = ?""", (cache_key,)).fetchone()
+        return (row[0], row[1]) if row else None
+    except sqlite3.Error as e:
+        logging.debug(f"Extraktions-Cache {db_file} nicht lesbar: {e}")
+        return None
+
+def path_is_under(path: str, base: str) -> bool:
+    """True, wenn `path` gleich `base` ist oder darunter liegt (Groß-/Kleinschreibung je nach OS)."""
+    path, base = os.path.normcase(path), os.path.normcase(base).rstrip("/\\")
+    if not path.startswith(base): return False
+    return len(path) == len(base) or path[len(base)] in "/\\"
+
+class BlobCache:
+    """LRU-Cache für entpackte Texte (content_hash -> Text) mit einem Speicherbudget in Bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max(0, max_bytes)
+        self.used_bytes = 0
+        self.hits = self.misses = 0
+        self._items: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._items.get(key)
+            if text is None: self.misses += 1; return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return text
+
+    def put(self, key: str, text: str):
+        size = sys.getsizeof(text)
+        if size > self.max_bytes: return # größer als das ganze Budget: nicht cachen
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None: self.used_bytes -= sys.getsizeof(old)
+            self._items[key] = text
+            self.used_bytes += size
+            while self.used_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.used_bytes -= sys.getsizeof(evicted)
+
+    def resize(self, max_bytes: int):
+        with self._lock:
+            self.max_bytes = max(0, max_bytes)
+            while self._items and self.used_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.used_bytes -= sys.getsizeof(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.used_bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._items), "used_bytes": self.used_bytes, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+class _SqliteStore(ABC):
+    """
+    Gemeinsame Basis der Index-Datenbanken (SQLite im WAL-Modus).
+
+    Die Datenbankdatei ist der Snapshot, das WAL das Append-only-Journal: jede Transaktion hängt ihre
+    Seiten an und wird per fsync abgeschlossen. Das automatische Checkpointing ist abgeschaltet; das
+    Zurückfalten übernimmt der Kompaktierer von ShardedIndexStore. Beim Öffnen spielt SQLite
+    Snapshot + Journal wieder ein.
+    """
+
+    def __init__(self, db_file: str):
+        self.db_file = db_file
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._reader: Optional[sqlite3.Connection] = None # eigene Lese-Verbindung, blockiert nicht während Scans
+        self._read_lock = threading.Lock()
+        self._batch_depth = 0
+        self._batch_owner: Optional[int] = None
+        self._dirty = False # in der offenen Transaktion wurde etwas geändert (siehe _before_commit)
+
+    @abstractmethod
+    def _create_schema(self, conn: sqlite3.Connection): ...
+
+    def _before_commit(self, conn: sqlite3.Connection):
+        pass
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            d_dir = os.path.dirname(self.db_file)
+            if d_dir: os.makedirs(d_dir, exist_ok=True)
+            conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL") # fsync je Commit: ein Löschvorgang = ein kleiner Journal-Append
+            conn.execute("PRAGMA wal_autocheckpoint=0") # Kompaktierung übernimmt der Hintergrund-Thread
+            self._create_schema(conn)
+            self._conn = conn
+        return self._conn
+
+    def _read_connection(self) -> sqlite3.Connection:
+        if self._reader is None:
+            self._connection() # Schema sicherstellen
+            self._reader = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        return self._reader
+
+    def _query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Lesen ohne auf Schreiber zu warten; die eigene offene Transaktion wird dabei mitgesehen."""
+        if self._batch_owner == threading.get_ident():
+            with self._lock: return self._conn.execute(sql, params).fetchall()
+        with self._read_lock: return self._read_connection().execute(sql, params).fetchall()
+
+    def close(self):
+        with self._read_lock:
+            if self._reader is not None: self._reader.close(); self._reader = None
+        with self._lock:
+            if self._conn is not None:
+                if self._batch_depth: self._conn.execute("COMMIT")
+                self._batch_depth = 0
+                self._batch_owner = None
+                self._conn.close()
+                self._conn = None
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Fasst alle Schreibzugriffe im Block zu einer Transaktion zusammen (verschachtelbar)."""
+        with self._lock:
+            conn = self._connection()
+            if self._batch_depth == 0: conn.execute("BEGIN"); self._batch_owner = threading.get_ident()
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0: conn.execute("ROLLBACK"); self._batch_owner = None; self._dirty = False
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                if self._dirty: self._before_commit(conn)
+                conn.execute("COMMIT"); self._batch_owner = None; self._dirty = False
+
+    def checkpoint(self, truncate: bool = False) -> bool:
+        """Faltet das Journal (WAL) in den Snapshot. Während einer offenen Transaktion wird nichts getan."""
+        with self._lock:
+            if self._batch_depth: return False
+            mode = "TRUNCATE" if truncate else "PASSIVE"
+            busy, _, _ = self._connection().execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+            return not busy
+
+    def journal_size(self) -> int:
+        try: return os.path.getsize(self.db_file + "-wal")
+        except OSError: return 0
+
+class IndexStore(_SqliteStore):
+    """
+    Ein Shard des Dateiindex: eine Zeile pro Eintrag (Metadaten als JSON plus Suchdokumente).
+    Änderungen einzelner Dateien sind Zeilen-Updates statt eines kompletten Neuschreibens.
+    """
+
+    LEGACY_HASH_ALGORITHM = "md5" # Shards ohne Angabe stammen aus der Zeit vor wählbaren Hash-Algorithmen
+
+    def __init__(self, db_file: str, shard_key: Optional[str] = None, hash_algorithm: Optional[str] = None):
+        super().__init__(db_file)
+        self._shard_key = shard_key
+        self._hash_algorithm = hash_algorithm # nur für neu angelegte Shards
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                terms TEXT,
+                name_grams TEXT,
+                content_grams TEXT,
+                content_hash TEXT
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value NOT NULL
+            );
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', 0);
+        """)
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('store_id', ?)", (int.from_bytes(os.urandom(6), "big"),))
+        if self._shard_key is not None: conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('shard_key', ?)", (self._shard_key,))
+        if self._hash_algorithm is not None: conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('hash_algorithm', ?)", (self._hash_algorithm,))
+
+    def _before_commit(self, conn: sqlite3.Connection):
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'generation'")
+
+    def _meta(self) -> Dict[str, Any]:
+        with self._lock: return dict(self._connection().execute("SELECT key, value FROM meta").fetchall())
+
+    @property
+    def shard_key(self) -> Optional[str]:
+        if self._shard_key is None: self._shard_key = self._meta().get("shard_key")
+        return self._shard_key
+
+    @property
+    def hash_algorithm(self) -> str:
+        """Algorithmus, mit dem file_hash und quick_hash der Einträge dieses Shards berechnet wurden."""
+        return self._meta().get("hash_algorithm") or self.LEGACY_HASH_ALGORITHM
+
+    def set_hash_algorithm(self, algorithm: str):
+        with self._lock, self.batch():
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('hash_algorithm', ?)", (algorithm,))
+
+    def generation(self) -> Tuple[int, int]:
+        """
+        (store_id, Zähler): der Zähler steigt mit jeder Transaktion, die Einträge verändert, die store_id
+        unterscheidet neu angelegte Datenbanken. Dient zur Gültigkeitsprüfung von Warmstart-Snapshots.
+        """
+        meta = self._meta()
+        return meta.get("store_id", 0), meta.get("generation", 0)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def fetch_rows(self) -> List[Tuple]:
+        return self._query("SELECT path, data, terms, name_grams, content_grams FROM entries")
+
+    def content_hashes(self) -> Set[str]:
+        return {row[0] for row in self._query("SELECT DISTINCT content_hash FROM entries WHERE content_hash IS NOT NULL")}
+
+    def upsert(self, path: str, entry: Dict[str, Any], search_docs: Optional[Dict[str, Any]] = None):
+        meta_part = {k: v for k, v in entry.items() if k not in CONTENT_FIELDS}
+        terms = json.dumps(search_docs["terms"], ensure_ascii=False) if search_docs else None
+        name_grams = search_docs.get("name_grams") if search_docs else None
+        content_grams = search_docs.get("content_grams") if search_docs else None
+        self.insert_rows([(path, json.dumps(meta_part, ensure_ascii=False), terms, name_grams, content_grams, entry.get("content_hash"))])
+
+    def insert_rows(self, rows: Iterable[Tuple], replace: bool = True):
+        """Rohzeilen (path, data, terms, name_grams, content_grams, content_hash) schreiben, z.B. beim Umzug zwischen Shards."""
+        with self._lock, self.batch():
+            self._dirty = True
+            self._conn.executemany(
+                f"INSERT OR {'REPLACE' if replace else 'IGNORE'} INTO entries (path, data, terms, name_grams, content_grams, content_hash) VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def get_rows(self, paths: Iterable[str]) -> List[Tuple]:
+        with self._lock:
+            conn = self._connection()
+            return [row for p in paths for row in conn.execute(
+                "SELECT path, data, terms, name_grams, content_grams, content_hash FROM entries WHERE path = ?", (p,))]
+
+    def delete(self, path: str) -> int:
+        with self._lock, self.batch():
+            self._dirty = True
+            return self._conn.execute("DELETE FROM entries WHERE path = ?", (path,)).rowcount
+
+    def clear(self):
+        with self._lock, self.batch():
+            self._dirty = True
+            self._conn.execute("DELETE FROM entries")
+
+class BlobStore(_SqliteStore):
+    """
+    Gemeinsamer Speicher für extrahierte Texte: zlib-komprimiert, ein Blob pro content_hash (identische
+    Dateien teilen ihn), mit LRU-Cache für gelesene Texte. Die Tabelle `extractions` merkt sich, welcher
+    Text aus welcher Datei (Hash + Extraktorversion) entstand; Kopien und nur berührte Dateien werden so
+    nicht erneut geparst. Ihre Zeilen verschwinden mit dem zugehörigen Blob.
+    """
+
+    def __init__(self, db_file: str, cache_bytes: int = 64 * 1024 * 1024):
+        super().__init__(db_file)
+        self.cache = BlobCache(cache_bytes)
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        conn.execute("CREATE TABLE IF NOT EXISTS blobs (content_hash TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS extractions (cache_key TEXT PRIMARY KEY, content_hash TEXT NOT NULL, cleaned_length INTEGER NOT NULL)")
+        if self._has_table(conn, "contents"): self._migrate_contents(conn)
+
+    @staticmethod
+    def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone() is not None
+
+    def _migrate_contents(self, conn: sqlite3.Connection):
+        """Überführt das ältere Schema (Inhalte pro Pfad in 'contents') in den Blob-Speicher."""
+        conn.execute("BEGIN")
+        rows = conn.execute("""
+            SELECT json_extract(e.data, '$.content_hash'), c.content_full, c.content FROM contents c JOIN entries e ON e.path = c.path
+            WHERE json_extract(e.data, '$.content_hash') IS NOT NULL
+        """).fetchall()
+        for content_hash, content_full, content in rows:
+            text = content_full if content_full is not None else content
+            if text is not None: conn.execute("INSERT OR IGNORE INTO blobs (content_hash, data) VALUES (?, ?)", (content_hash, pack_text(text)))
+        conn.execute("DROP TABLE contents")
+        conn.execute("COMMIT")
+        logging.info(f"Indexdatenbank migriert: {len(rows)} Inhalte in den Blob-Speicher übernommen.")
+
+    def legacy_rows(self) -> List[Tuple]:
+        """Einträge aus der früheren Ein-Datei-Datenbank (vor den Shards); entfernt wird erst mit drop_legacy_tables."""
+        with self._lock:
+            conn = self._connection()
+            if not self._has_table(conn, "entries"): return []
+            return conn.execute("SELECT path, data, terms, name_grams, content_grams, json_extract(data, '$.content_hash') FROM entries").fetchall()
+
+    def drop_legacy_tables(self):
+        with self._lock, self.batch():
+            self._conn.execute("DROP TABLE IF EXISTS entries")
+            self._conn.execute("DROP TABLE IF EXISTS meta")
+
+    def has_blob(self, content_hash: str) -> bool:
+        return bool(self._query("SELECT 1 FROM blobs WHERE content_hash = ?", (content_hash,)))
+
+    def missing_blobs(self, hashes: Set[str]) -> Set[str]:
+        if not hashes: return set()
+        return hashes - {row[0] for row in self._query("SELECT content_hash FROM blobs")}
+
+    def put_blob(self, content_hash: str, text: str):
+        """Legt den Text einmalig ab; bereits vorhandene Hashes (Kopien) kosten nichts."""
+        if not content_hash or text is None or self.has_blob(content_hash): return
+        with self._lock, self.batch():
+            self._conn.execute("INSERT OR IGNORE INTO blobs (content_hash, data) VALUES (?, ?)", (content_hash, pack_text(text)))
+
+    def put_extraction(self, cache_key: str, content_hash: str, cleaned_length: int):
+        with self._lock, self.batch():
+            self._conn.execute("INSERT OR REPLACE INTO extractions (cache_key, content_hash, cleaned_length) VALUES (?, ?, ?)",
+                               (cache_key, content_hash, cleaned_length))
+
+    def get_blob(self, content_hash: Optional[str]) -> Optional[str]:
+        if not content_hash: return None
+        text = self.cache.get(content_hash)
+        if text is not None: return text
+        rows = self._query("SELECT data FROM blobs WHERE content_hash = ?", (content_hash,))
+        if not rows: return None
+        text = unpack_text(rows[0][0])
+        self.cache.put(content_hash, text)
+        return text
+
+    def retain(self, referenced: Set[str]) -> int:
+        """Entfernt alle Blobs, deren Hash nicht in `referenced` vorkommt."""
+        with self._lock, self.batch():
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (content_hash TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM keep")
+            self._conn.executemany("INSERT OR IGNORE INTO keep (content_hash) VALUES (?)", ((h,) for h in referenced))
+            removed = self._conn.execute("DELETE FROM blobs WHERE content_hash NOT IN (SELECT content_hash FROM keep)").rowcount
+            if removed: self._conn.execute("DELETE FROM extractions WHERE content_hash NOT IN (SELECT content_hash FROM keep)")
+            self._conn.execute("DELETE FROM keep")
+        return removed
+
+    def clear(self):
+        with self._lock, self.batch():
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.execute("DELETE FROM extractions")
+        self.cache.clear()
+
+class ShardedIndexStore:
+    """
+    Dateiindex, aufgeteilt auf eine SQLite-Datei pro Basisverzeichnis (ist das Basisverzeichnis '/',
+    pro Teilbaum der obersten Ebene). Shards werden unabhängig geschrieben und parallel geladen bzw.
+    gesichert; ein Rescan eines Laufwerks schreibt nur dessen Shard. Die Texte liegen gemeinsam im
+    Blob-Speicher unter `db_file`.
+
+    Alle Schreiber laufen über eine Sperre; eine Transaktion (batch) öffnet die Transaktionen der
+    tatsächlich berührten Shards erst bei Bedarf und schließt sie gemeinsam.
+    """
+
+    OTHER_SHARD = "*" # Pfade außerhalb aller Basisverzeichnisse
+
+    def __init__(self, db_file: str, base_dirs: Iterable[str], compact_interval: int = 10,
+                 compact_wal_bytes: int = 4 * 1024 * 1024, cache_bytes: int = 64 * 1024 * 1024, max_workers: Optional[int] = None,
+                 hash_algorithm: str = IndexStore.LEGACY_HASH_ALGORITHM):
+        self.db_file = db_file
+        self.base_dirs = list(base_dirs or [])
+        self.hash_algorithm = hash_algorithm # für neu angelegte Shards, siehe shards_hashed_otherwise
+        self.blobs = BlobStore(db_file, cache_bytes)
+        self.cache = self.blobs.cache
+        self.compact_interval = compact_interval
+        self.compact_wal_bytes = compact_wal_bytes
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.on_idle: Optional[Callable[[], None]] = None # nach jedem Durchlauf des Kompaktierers (z.B. Warmstart-Snapshot)
+        self._last_write = time.monotonic()
+        self.shards: Dict[str, IndexStore] = {}
+        self._shards_opened = False
+        self._lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_stack: Optional[ExitStack] = None
+        self._batch_members: Set[int] = set()
+        self._compactor: Optional[threading.Thread] = None
+        self._compactor_stop = threading.Event()
+
+    # -- Shards --
+    def shard_key(self, path: str) -> str:
+        owner = max((b for b in self.base_dirs if path_is_under(path, b)), key=len, default=None)
+        if owner is None: return self.OTHER_SHARD
+        root = owner.rstrip("/\\")
+        if root: return owner
+        # Basis '/': nach Teilbaum der obersten Ebene aufteilen, direkte Kinder bleiben im Wurzel-Shard
+        parts = re.split(r"[/\\]", path[len(owner):], maxsplit=1)
+        return owner + parts[0] if len(parts) == 2 and parts[0] else owner
+
+    def _shard_file(self, key: str) -> str:
+        slug = re.sub(r"\W+", "_", key).strip("_")[:40] or ("other" if key == self.OTHER_SHARD else "root")
+        return f"{os.path.splitext(self.db_file)[0]}.shard-{slug}-{hashlib.md5(key.encode('utf-8')).hexdigest()[:8]}.sqlite3"
+
+    def _open_shards(self):
+        if self._shards_opened: return
+        with self._lock:
+            if self._shards_opened: return
+            for shard_file in sorted(glob.glob(glob.escape(os.path.splitext(self.db_file)[0]) + ".shard-*.sqlite3")):
+                shard = IndexStore(shard_file)
+                if shard.shard_key is not None: self.shards[shard.shard_key] = shard
+            self._shards_opened = True
+            legacy_rows = self.blobs.legacy_rows()
+            if legacy_rows:
+                # Erst kopieren (ohne neuere Zeilen zu überschreiben, falls ein früherer Versuch abbrach), nach dem Commit löschen
+                with self.batch():
+                    for row in legacy_rows: self._writer(self._shard_for(row[0])).insert_rows([row], replace=False)
+                    self._mark_legacy_hashes(row[0] for row in legacy_rows)
+                self.blobs.drop_legacy_tables()
+                logging.info(f"Indexdatenbank in Shards aufgeteilt: {len(legacy_rows)} Einträge, {len(self.shards)} Shards.")
+
+    def _shard_for(self, path: str) -> IndexStore:
+        self._open_shards()
+        key = self.shard_key(path)
+        shard = self.shards.get(key)
+        if shard is None:
+            with self._lock:
+                shard = self.shards.get(key)
+                if shard is None: shard = self.shards[key] = IndexStore(self._shard_file(key), shard_key=key, hash_algorithm=self.hash_algorithm)
+        return shard
+
+    def _all_shards(self) -> List[IndexStore]:
+        self._open_shards()
+        return list(self.shards.values())
+
+    def _parallel(self, func: Callable, items: List[Any]) -> List[Any]:
+        if len(items) <= 1: return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as pool: return list(pool.map(func, items))
+
+    # -- Transaktionen --
+    def _writer(self, store: _SqliteStore) -> _SqliteStore:
+        """Nimmt `store` in die laufende Transaktion auf (muss unter self._lock aufgerufen werden)."""
+        self._last_write = time.monotonic()
+        if self._batch_stack is not None and id(store) not in self._batch_members:
+            self._batch_stack.enter_context(store.batch())
+            self._batch_members.add(id(store))
+        return store
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Fasst alle Schreibzugriffe im Block zu einer Transaktion je berührtem Shard zusammen (verschachtelbar)."""
+        with self._lock:
+            if self._batch_depth == 0: self._batch_stack, self._batch_members = ExitStack(), set()
+            self._batch_depth += 1
+            try:
+                yield
+            except BaseException:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    stack, self._batch_stack = self._batch_stack, None
+                    stack.__exit__(*sys.exc_info())
+                raise
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                stack, self._batch_stack = self._batch_stack, None
+                stack.close()
+                self._last_write = time.monotonic()
+
+    def in_transaction(self) -> bool:
+        return self._batch_depth > 0
+
+    def idle_seconds(self) -> float:
+        """Sekunden seit dem letzten Schreibzugriff bzw. (während einer Transaktion) 0."""
+        return 0.0 if self._batch_depth else time.monotonic() - self._last_write
+
+    def generation(self) -> Tuple[Tuple[str, Tuple[int, int]], ...]:
+        """Generationen aller Shards (siehe IndexStore.generation)."""
+        return tuple(sorted((shard.shard_key, shard.generation()) for shard in self._all_shards()))
+
+    # -- Einträge --
+    def count(self) -> int:
+        return sum(shard.count() for shard in self._all_shards())
+
+    def load_all(self) -> Iterator[Tuple[str, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Liefert (path, entry, search_docs) für alle Einträge (ohne Texte, siehe get_blob). Die Shards
+        werden parallel gelesen; Zeilen, die nach geänderten Basisverzeichnissen in einen anderen
+        Shard gehören, werden dabei umgezogen.
+        """
+        shards = self._all_shards()
+        misplaced: List[Tuple[IndexStore, str]] = []
+        for shard, rows in zip(shards, self._parallel(lambda s: s.fetch_rows(), shards)):
+            for path, data, terms, name_grams, content_grams in rows:
+                if self.shard_key(path) != shard.shard_key: misplaced.append((shard, path))
+                search_docs = None
+                if terms is not None:
+                    search_docs = {"terms": json.loads(terms), "name_grams": name_grams or "", "content_grams": content_grams or ""}
+                yield path, json.loads(data), search_docs
+        if misplaced:
+            with self.batch():
+                for shard, path in misplaced: # neuere Zeile im Ziel-Shard gewinnt
+                    self._writer(self._shard_for(path)).insert_rows(self._writer(shard).get_rows([path]), replace=False)
+                    shard.delete(path)
+            logging.info(f"{len(misplaced)} Indexeinträge in passende Shards umgezogen.")
+
+    def shards_hashed_otherwise(self, algorithm: str) -> Set[str]:
+        """Shard-Schlüssel, deren Datei-Hashes mit einem anderen Algorithmus als `algorithm` berechnet wurden."""
+        return {shard.shard_key for shard in self._all_shards() if shard.hash_algorithm != algorithm}
+
+    def set_hash_algorithm(self, shard_keys: Iterable[str], algorithm: str):
+        with self._lock:
+            for key in shard_keys:
+                shard = self.shards.get(key)
+                if shard is not None: self._writer(shard).set_hash_algorithm(algorithm)
+
+    def _mark_legacy_hashes(self, paths: Iterable[str]):
+        # Übernommene Altbestände tragen MD5-Hashes, auch wenn ihr Shard gerade erst angelegt wurde
+        self.set_hash_algorithm({self.shard_key(path) for path in paths}, IndexStore.LEGACY_HASH_ALGORITHM)
+
+    def upsert(self, path: str, entry: Dict[str, Any], search_docs: Optional[Dict[str, Any]] = None):
+        with self._lock: self._writer(self._shard_for(path)).upsert(path, entry, search_docs)
+
+    def delete(self, path: str):
+        with self._lock: self._writer(self._shard_for(path)).delete(path)
+
+    def delete_many(self, paths: Iterable[str]):
+        with self.batch():
+            for path in paths: self.delete(path)
+
+    def clear(self):
+        with self.batch():
+            for shard in self._all_shards(): self._writer(shard).clear()
+            self._writer(self.blobs).clear()
+
+    # -- Blob-Speicher --
+    def has_blob(self, content_hash: str) -> bool:
+        return self.blobs.has_blob(content_hash)
+
+    def missing_blobs(self, hashes: Set[str]) -> Set[str]:
+        """Die Hashes aus `hashes`, zu denen kein Text im Blob-Speicher liegt."""
+        return self.blobs.missing_blobs(hashes)
+
+    def put_blob(self, content_hash: str, text: str):
+        with self._lock: self._writer(self.blobs).put_blob(content_hash, text)
+
+    def get_blob(self, content_hash: Optional[str]) -> Optional[str]:
+        return self.blobs.get_blob(content_hash)
+
+    def put_extraction(self, cache_key: str, content_hash: str, cleaned_length: int):
+        with self._lock: self._writer(self.blobs).put_extraction(cache_key, content_hash, cleaned_length)
+
+    def collect_garbage(self) -> int:
+        """Entfernt Blobs, auf die in keinem Shard mehr ein Eintrag verweist."""
+        with self._lock:
+            shards = self._all_shards()
+            referenced: Set[str] = set()
+            for hashes in self._parallel(lambda s: s.content_hashes(), shards): referenced |= hashes
+            removed = self._writer(self.blobs).retain(referenced)
+        if removed: logging.info(f"{removed} verwaiste Inhalte aus dem Blob-Speicher entfernt.")
+        return removed
+
+    # -- Persistenz --
+    def checkpoint(self, truncate: bool = False) -> bool:
+        """Faltet die Journale aller Shards und des Blob-Speichers parallel zurück."""
+        with self._lock:
+            if self._batch_depth: return False
+            return all(self._parallel(lambda s: s.checkpoint(truncate), self._all_shards() + [self.blobs]))
+
+    def journal_size(self) -> int:
+        return sum(s.journal_size() for s in self._all_shards() + [self.blobs])
+
+    def start_compactor(self):
+        if self._compactor and self._compactor.is_alive(): return
+        self._compactor_stop.clear()
+        self._compactor = threading.Thread(target=self._compact_loop, name="IndexStoreCompactor", daemon=True)
+        self._compactor.start()
+
+    def stop_compactor(self):
+        self._compactor_stop.set()
+        if self._compactor and self._compactor.is_alive() and self._compactor is not threading.current_thread():
+            self._compactor.join(timeout=5)
+        self._compactor = None
+
+    def _compact_loop(self):
+        while not self._compactor_stop.wait(self.compact_interval):
+            try: self._compact()
+            except Exception as e: logging.error(f"Fehler bei der Index-Kompaktierung: {e}")
+            if self.on_idle is None: continue
+            try: self.on_idle()
+            except Exception as e: logging.error(f"Fehler im Leerlauf-Rückruf des Index: {e}")
+
+    def _compact(self):
+        stores = [s for s in self._all_shards() + [self.blobs] if s.journal_size() >= self.compact_wal_bytes]
+        if not stores: return
+        with self._lock: # nur das Journal falten; verwaiste Blobs räumt collect_garbage nach Scans bzw. auf Anforderung
+            if self._batch_depth: return
+            if not all(self._parallel(lambda s: s.checkpoint(truncate=True), stores)): return
+        logging.debug(f"Index-Journal kompaktiert ({len(stores)} Datenbanken).")
+
+    def close(self):
+        self.stop_compactor()
+        with self._lock:
+            for store in self._all_shards() + [self.blobs]: store.close()
+
+    def import_legacy_json(self, json_file: str) -> int:
+        """Übernimmt eine alte index.json (monolithisches Format) in den Speicher."""
+        with open(json_file, "r", encoding="utf-8") as f: data = json.load(f)
+        with self.batch():
+            for path, entry in data.items():
+                if not isinstance(entry, dict): continue
+                self.upsert(path, entry)
+                text = entry.get("content_full") if entry.get("content_full") is not None else entry.get("content")
+                self.put_blob(entry.get("content_hash"), text)
+            self._mark_legacy_hashes(data)
+        logging.info(f"Legacy-Index {json_file} übernommen: {len(data)} Einträge.")
+        return len(data)
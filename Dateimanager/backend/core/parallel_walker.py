@@ -0,0 +1,147 @@
+import os
+import threading
+from collections import deque
+from typing import List, Dict, Optional, Callable, Iterable, Iterator, NamedTuple, Tuple
+
+def file_stat_info(st: os.stat_result, inode: Optional[int] = None) -> Tuple[int, float, Optional[int], Optional[int]]:
+    """(Größe, mtime, Gerät, Inode) aus einem stat-Ergebnis; 0 steht für unbekannt (z.B. DirEntry.stat() unter Windows)."""
+    return st.st_size, st.st_mtime, st.st_dev or None, (inode if inode is not None else st.st_ino) or None
+
+class DirListing(NamedTuple):
+    """Inhalt eines Verzeichnisses, wie ihn der Walker liefert (Einträge nach Namen sortiert)."""
+    path: str
+    depth: int
+    dirs: List[Tuple[str, str]] # (name, pfad) echter Unterordner; werden durchlaufen, solange max_depth es erlaubt
+    links: List[Tuple[str, str]] # (name, pfad) symbolischer Ordner-Links; werden nicht verfolgt
+    files: List[Tuple[str, str, Optional[tuple]]] # (name, pfad, stat_info oder None)
+    error: Optional[Exception]
+
+class _Task(NamedTuple):
+    task_id: int
+    path: str
+    depth: int
+
+class ParallelWalker:
+    """
+    Verzeichnis-Durchlauf mit mehreren Threads (Work-Stealing): jeder Thread arbeitet seine eigene Deque
+    von hinten ab und stiehlt bei Leerlauf von vorne aus fremden Deques. Die Auflistungen werden trotzdem
+    deterministisch in Top-down-Reihenfolge (wie os.walk, Einträge sortiert) ausgegeben.
+    Da der Durchlauf I/O-gebunden ist (scandir/stat, v.a. auf NFS/SMB), lohnen sich mehr Threads als Kerne.
+    Höchstens `max_buffered` fertige Auflistungen warten auf den Verbraucher; ist der Puffer voll, bearbeiten die
+    Threads nur noch das Verzeichnis, das er als Nächstes braucht. Ein langsamer Verbraucher bremst so den Durchlauf.
+    """
+
+    def __init__(self, num_threads: Optional[int] = None, skip_dir: Optional[Callable[[str], bool]] = None,
+                 max_depth: Optional[int] = None, include_files: bool = True, stat_files: bool = True,
+                 max_buffered: int = 1024):
+        self.num_threads = max(1, num_threads or min(32, (os.cpu_count() or 1) * 4))
+        self.max_buffered = max(1, max_buffered)
+        self.skip_dir = skip_dir or (lambda name: False)
+        self.max_depth = max_depth
+        self.include_files = include_files
+        self.stat_files = stat_files and include_files
+
+    def _list_dir(self, task: _Task) -> DirListing:
+        dirs, links, files = [], [], []
+        try:
+            with os.scandir(task.path) as it: entries = sorted(it, key=lambda e: e.name)
+        except OSError as e:
+            return DirListing(task.path, task.depth, dirs, links, files, e)
+        for entry in entries:
+            try: is_dir = entry.is_dir()
+            except OSError: is_dir = False
+            if is_dir:
+                if self.skip_dir(entry.name): continue
+                try: is_link = entry.is_symlink()
+                except OSError: is_link = True
+                (links if is_link else dirs).append((entry.name, entry.path))
+            elif self.include_files:
+                info = None
+                if self.stat_files:
+                    try: info = file_stat_info(entry.stat(), entry.inode())
+                    except OSError: continue # z.B. defekter Symlink oder zwischenzeitlich gelöscht
+                files.append((entry.name, entry.path, info))
+        return DirListing(task.path, task.depth, dirs, links, files, None)
+
+    def descends(self, listing: DirListing) -> bool:
+        return self.max_depth is None or listing.depth < self.max_depth
+
+    def walk(self, roots: Iterable[str]) -> Iterator[DirListing]:
+        """Liefert für jedes erreichte Verzeichnis (inkl. der Wurzeln) eine DirListing, Top-down in fester Reihenfolge."""
+        roots = list(roots)
+        if self.num_threads == 1: yield from self._walk_serial(roots); return
+
+        cond = threading.Condition()
+        deques = [deque() for _ in range(self.num_threads)]
+        results: Dict[int, Tuple[DirListing, List[int]]] = {}
+        state = {"next_id": 0, "open": 0, "stop": False, "wanted": None} # wanted: Aufgabe, auf die der Verbraucher wartet
+
+        def new_ids(n: int) -> List[int]:
+            start = state["next_id"]; state["next_id"] += n
+            return list(range(start, start + n))
+
+        def take(worker: int) -> Optional[_Task]: # unter cond
+            if len(results) >= self.max_buffered: # Puffer voll: nur die Aufgabe, auf die der Verbraucher wartet
+                for d in deques:
+                    task = next((t for t in d if t.task_id == state["wanted"]), None)
+                    if task is not None: d.remove(task); return task
+                return None
+            try: return deques[worker].pop() # eigene Arbeit: zuletzt eingestellte zuerst (Tiefe zuerst)
+            except IndexError: pass
+            for offset in range(1, self.num_threads):
+                try: return deques[(worker + offset) % self.num_threads].popleft() # stehlen: älteste, meist große Teilbäume
+                except IndexError: continue
+            return None
+
+        def run(worker: int):
+            while True:
+                with cond:
+                    task = take(worker)
+                    while task is None:
+                        if state["stop"] or not state["open"]: return
+                        cond.wait(0.05)
+                        task = take(worker)
+                try: listing = self._list_dir(task)
+                except Exception as e: listing = DirListing(task.path, task.depth, [], [], [], e)
+                children = listing.dirs if self.descends(listing) else []
+                with cond:
+                    child_ids = new_ids(len(children))
+                    for child_id, (_, child_path) in reversed(list(zip(child_ids, children))):
+                        deques[worker].append(_Task(child_id, child_path, task.depth + 1))
+                    state["open"] += len(children) - 1
+                    results[task.task_id] = (listing, child_ids)
+                    cond.notify_all()
+
+        with cond:
+            root_ids = new_ids(len(roots))
+            state["open"] = len(roots)
+        for i, (root_id, root) in enumerate(zip(root_ids, roots)):
+            deques[i % self.num_threads].append(_Task(root_id, root, 0))
+        threads = [threading.Thread(target=run, args=(i,), daemon=True, name=f"walker-{i}") for i in range(self.num_threads)]
+        for t in threads: t.start()
+
+        try:
+            stack = list(reversed(root_ids))
+            while stack:
+                task_id = stack.pop()
+                with cond:
+                    state["wanted"] = task_id
+                    cond.notify_all()
+                    while task_id not in results: cond.wait()
+                    listing, child_ids = results.pop(task_id)
+                stack.extend(reversed(child_ids))
+                yield listing
+        finally:
+            with cond:
+                state["stop"] = True
+                cond.notify_all()
+            for t in threads: t.join()
+
+    def _walk_serial(self, roots: List[str]) -> Iterator[DirListing]:
+        stack = [_Task(0, root, 0) for root in reversed(roots)]
+        while stack:
+            task = stack.pop()
+            listing = self._list_dir(task)
+            if self.descends(listing):
+                stack.extend(_Task(0, path, task.depth + 1) for _, path in reversed(listing.dirs))
+            yield listing
@@ -0,0 +1,104 @@
+import io
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+import PyPDF2 # Fallback, immer vorhanden
+
+try: import pypdfium2 as pdfium # PDFium (C++): um ein Vielfaches schneller als PyPDF2
+except ImportError: pdfium = None
+try:
+    from pdfminer.pdfparser import PDFParser
+    from pdfminer.pdfdocument import PDFDocument
+    from pdfminer.pdfpage import PDFPage
+    from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
+    from pdfminer.converter import TextConverter
+    from pdfminer.layout import LAParams
+    from pdfminer.pdftypes import resolve1
+    pdfminer_available = True
+except ImportError: pdfminer_available = False
+
+# Ein Backend liefert für (Pfad, erste Seite, Ende exklusiv oder None) die Seitenzahl und den Text je Seite
+PageExtractor = Callable[[str, int, Optional[int]], Tuple[int, List[str]]]
+
+def _pages_pdfium(file_path: str, start: int, end: Optional[int]) -> Tuple[int, List[str]]:
+    pdf = pdfium.PdfDocument(file_path)
+    try:
+        page_count = len(pdf)
+        texts = []
+        for number in range(start, page_count if end is None else min(end, page_count)):
+            page = pdf[number]
+            textpage = page.get_textpage()
+            try: texts.append(textpage.get_text_range().replace("\r\n", "\n"))
+            finally: textpage.close(); page.close()
+        return page_count, texts
+    finally: pdf.close()
+
+def _pages_pdfminer(file_path: str, start: int, end: Optional[int]) -> Tuple[int, List[str]]:
+    with open(file_path, "rb") as f:
+        document = PDFDocument(PDFParser(f), password="")
+        page_count = int(resolve1(document.catalog["Pages"]).get("Count", 0))
+        resources = PDFResourceManager(caching=True)
+        texts = []
+        for number, page in enumerate(PDFPage.create_pages(document)):
+            if number < start: continue
+            if end is not None and number >= end: break
+            out = io.StringIO()
+            device = TextConverter(resources, out, laparams=LAParams())
+            try: PDFPageInterpreter(resources, device).process_page(page)
+            finally: device.close()
+            texts.append(out.getvalue())
+        return max(page_count, start + len(texts)), texts
+
+def _pages_pypdf2(file_path: str, start: int, end: Optional[int]) -> Tuple[int, List[str]]:
+    with open(file_path, "rb") as f:
+        reader = PyPDF2.PdfReader(f, strict=False)
+        if reader.is_encrypted:
+            try:
+                # In PyPDF2 v3+, decrypt returns an Enum member EncryptionType
+                decrypt_result = reader.decrypt('')
+                if decrypt_result != PyPDF2.generic.EncryptionType.DECRYPTED_BY_EMPTY_PASSWORD and \
+                   decrypt_result != PyPDF2.generic.EncryptionType.DECRYPTED_BY_USER_PASSWORD : # Check against known success types
+                    # Fallback for older PyPDF2 versions or other non-enum success values
+                    if not (isinstance(decrypt_result, int) and decrypt_result in [1, 2]): # Older success int codes
+                         logging.warning(f"PDF {file_path} verschlüsselt, Entschlüsselung fehlgeschlagen oder Status unklar: {decrypt_result}")
+                         return 0, []
+            except Exception as decrypt_err:
+                logging.warning(f"PDF {file_path} Entschlüsselung fehlgeschlagen (evtl. Crypto fehlt oder falsches PW): {decrypt_err}")
+                return 0, []
+        pages = reader.pages
+        page_count = len(pages)
+        return page_count, [pages[n].extract_text() or "" for n in range(start, page_count if end is None else min(end, page_count))]
+
+def _available_backends() -> Dict[str, PageExtractor]:
+    backends: Dict[str, PageExtractor] = {}
+    if pdfium is not None: backends["pypdfium2"] = _pages_pdfium
+    if pdfminer_available: backends["pdfminer"] = _pages_pdfminer
+    backends["pypdf2"] = _pages_pypdf2
+    return backends
+
+PDF_BACKENDS = _available_backends()
+
+def default_pdf_backend() -> str:
+    """pypdfium2, sonst PyPDF2. pdfminer liefert die bessere Leseordnung, ist mit Layout-Analyse aber langsamer und nur auf Wunsch aktiv."""
+    return "pypdfium2" if "pypdfium2" in PDF_BACKENDS else "pypdf2"
+
+def resolve_pdf_backend(name: Optional[str]) -> str:
+    """Prüft ein konfiguriertes Backend; None/'auto' oder nicht installierte Backends ergeben den Standard."""
+    if not name or name.lower() == "auto": return default_pdf_backend()
+    if name.lower() in PDF_BACKENDS: return name.lower()
+    fallback = default_pdf_backend()
+    logging.warning(f"PDF-Backend '{name}' nicht verfügbar, verwende {fallback}.")
+    return fallback
+
+def extract_pdf_pages(file_path: str, backend: str = "pypdf2", start: int = 0, end: Optional[int] = None) -> Tuple[int, List[str]]:
+    """Seitenzahl und Text der Seiten [start, end) – jede Seite wird genau einmal extrahiert."""
+    return PDF_BACKENDS.get(backend, _pages_pypdf2)(file_path, start, end)
+
+def join_pdf_pages(texts: List[str]) -> str:
+    """Seiten einzeln getrimmt und zeilenweise verbunden; so ergibt Text(Anfang) + "\\n" + Text(Rest) den Text des ganzen Dokuments."""
+    return "\n".join(page for page in (text.strip() for text in texts if text) if page)
+
+def extract_pdf_text(file_path: str, backend: str = "pypdf2") -> str:
+    try: return join_pdf_pages(extract_pdf_pages(file_path, backend)[1])
+    except Exception as e: logging.error(f"PDF-Lesefehler für {file_path} ({backend}): {e}")
+    return ""
@@ -24,7 +24,8 @@ class PDFOCRProcessor:
     Verarbeitet rekursiv PDF-Dateien in einem Verzeichnis mit OCRmyPDF.
     """
 
-    def __init__(self, tools_dir: str, exclude_dirs: Optional[str] = None, ocr_settings: Optional[Dict[str, Any]] = None):
+    def __init__(self, tools_dir: str, exclude_dirs: Optional[str] = None, ocr_settings: Optional[Dict[str, Any]] = None,
+                 worker_pool: Optional[Any] = None):
         """
         Initialisiert den PDFOCRProcessor.
 
@@ -33,7 +34,9 @@ class PDFOCRProcessor:
                              Tesseract, Ghostscript und pngquant enthält.
             exclude_dirs (Optional[List[str]]): Liste von Verzeichnissen, die ausgeschlossen werden sollen.
             ocr_settings (Optional[Dict[str, Any]]): Dictionary mit OCR-spezifischen Einstellungen.
+            worker_pool (Optional[WorkerPool]): Geteilter Prozesspool; ohne wird pro Lauf ein eigener gestartet.
         """
+        self.worker_pool = worker_pool
         self.tools_dir = tools_dir
         if not os.path.isdir(self.tools_dir):
              raise FileNotFoundError(f"Das übergebene Tools-Verzeichnis existiert nicht: {self.tools_dir}")
@@ -252,11 +255,18 @@ class PDFOCRProcessor:
         error_count = 0
 
         try:
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
-                results = list(tqdm(executor.map(self._process_pdf_wrapper, pdf_tasks),
+            if self.worker_pool is not None:
+                # max_workers begrenzt hier nur die gleichzeitig eingereichten Aufgaben im geteilten Pool
+                results = list(tqdm(self.worker_pool.map(self._process_pdf_wrapper, ((task,) for task in pdf_tasks), window=max_workers),
                                     total=len(pdf_tasks),
                                     desc="Verarbeite PDFs",
                                     unit="Datei"))
+            else:
+                with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                    results = list(tqdm(executor.map(self._process_pdf_wrapper, pdf_tasks),
+                                        total=len(pdf_tasks),
+                                        desc="Verarbeite PDFs",
+                                        unit="Datei"))
             for _, status in results:
                 processed_count += 1
                 if status == "Success":
@@ -336,6 +346,12 @@ class PDFOCRProcessor:
 
         return pdf_tasks
 
+    def __getstate__(self):
+        # Wird für die Worker-Prozesse gepickelt; der Pool selbst bleibt im Hauptprozess
+        state = self.__dict__.copy()
+        state["worker_pool"] = None
+        return state
+
     def _process_pdf_wrapper(self, args):
         """
         Hilfsfunktion für ProcessPoolExecutor.map, entpackt Argumente.
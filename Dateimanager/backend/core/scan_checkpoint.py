@@ -0,0 +1,117 @@
+import os
+import json
+import time
+import logging
+import datetime
+from collections import defaultdict
+from typing import List, Dict, Optional, Any, Iterable
+
+def _dir_key(path: str) -> str:
+    return os.path.normcase(os.path.normpath(path))
+
+class ScanCheckpoint:
+    """
+    Fortschritt eines laufenden Scans als JSON-Datei neben dem Index: welche Verzeichnisse vollständig übernommen
+    sind und wie viele Dateien noch ausstehen. Ein abgebrochener Scan derselben Basisverzeichnisse setzt dort
+    wieder an; Dateien erledigter Verzeichnisse werden dann nicht erneut verarbeitet.
+    """
+
+    def __init__(self, file_path: str, interval: float = 30.0):
+        self.file_path = file_path
+        self.interval = interval # Sekunden zwischen zwei Sicherungen
+        self.state: Optional[Dict[str, Any]] = None
+        self._completed: set = set()
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._last_save = 0.0
+
+    # --- Datei ---
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.file_path, "r", encoding="utf-8") as f: return json.load(f)
+        except FileNotFoundError: return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Scan-Checkpoint {self.file_path} unlesbar, wird ignoriert: {e}")
+            return None
+
+    def save(self):
+        if self.state is None: return
+        self.state["updated_at"] = datetime.datetime.now().isoformat()
+        self.state["completed_dirs"] = sorted(self._completed)
+        tmp_file = self.file_path + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as f: json.dump(self.state, f)
+            os.replace(tmp_file, self.file_path)
+            self._last_save = time.monotonic()
+        except OSError as e: logging.error(f"Scan-Checkpoint konnte nicht gespeichert werden: {e}")
+
+    def maybe_save(self):
+        if time.monotonic() - self._last_save >= self.interval: self.save()
+
+    def discard(self):
+        self.state = None
+        self._completed, self._pending = set(), defaultdict(int)
+        try: os.remove(self.file_path)
+        except FileNotFoundError: pass
+        except OSError as e: logging.warning(f"Scan-Checkpoint {self.file_path} nicht löschbar: {e}")
+
+    # --- Ablauf ---
+    def begin(self, scan_dirs: List[str], actualize: bool) -> bool:
+        """Beginnt einen Scan; True, wenn ein passender unterbrochener Scan fortgesetzt wird."""
+        dirs = sorted(_dir_key(d) for d in scan_dirs)
+        previous = self.load()
+        resumed = bool(previous and previous.get("scan_dirs") == dirs and previous.get("actualize") == actualize)
+        self._pending = defaultdict(int)
+        if resumed:
+            self.state = previous
+            self._completed = set(previous.get("completed_dirs") or [])
+            self.state["resumed_at"] = datetime.datetime.now().isoformat()
+            logging.info(f"Setze unterbrochenen Scan fort ({len(self._completed)} Verzeichnisse bereits erledigt).")
+        else:
+            self.state = {"scan_dirs": dirs, "actualize": actualize, "started_at": datetime.datetime.now().isoformat(),
+                          "walk_complete": False, "total_files": 0, "done_files": 0}
+            self._completed = set()
+        self.save()
+        return resumed
+
+    def is_dir_complete(self, path: str) -> bool:
+        return _dir_key(path) in self._completed
+
+    # Nach discard() (Index gelöscht) ist state None; ein noch laufender Scan schreibt dann keinen Checkpoint mehr
+    def add_dir(self, path: str, task_count: int):
+        """Meldet ein durchlaufenes Verzeichnis mit der Zahl seiner noch zu verarbeitenden Dateien an."""
+        if self.state is None: return
+        key = _dir_key(path)
+        if task_count: self._pending[key] += task_count
+        elif key not in self._pending: self._completed.add(key)
+
+    def walk_finished(self, task_count: int):
+        if self.state is None: return
+        self.state["walk_complete"] = True
+        self.state["total_files"] = self.state.get("done_files", 0) + task_count
+        self.save()
+
+    def mark_done(self, file_paths: Iterable[str]):
+        """Vermerkt verarbeitete (oder endgültig fehlgeschlagene) Dateien; leere Verzeichnisse gelten als erledigt."""
+        if self.state is None: return
+        count = 0
+        for file_path in file_paths:
+            count += 1
+            key = _dir_key(os.path.dirname(file_path))
+            if key not in self._pending: continue
+            self._pending[key] -= 1
+            if self._pending[key] <= 0:
+                del self._pending[key]
+                self._completed.add(key)
+        self.state["done_files"] = self.state.get("done_files", 0) + count
+        self.maybe_save()
+
+    def progress(self) -> Dict[str, Any]:
+        """Stand des laufenden bzw. (aus der Datei) des zuletzt unterbrochenen Scans."""
+        state = self.state if self.state is not None else self.load()
+        if not state: return {"resumable": False}
+        total, done = state.get("total_files", 0), state.get("done_files", 0)
+        return {"resumable": True, "scan_dirs": state.get("scan_dirs"), "actualize": state.get("actualize"),
+                "started_at": state.get("started_at"), "updated_at": state.get("updated_at"),
+                "walk_complete": state.get("walk_complete", False), "total_files": total, "done_files": done,
+                "remaining_files": max(0, total - done) if state.get("walk_complete") else None,
+                "completed_dirs": len(self._completed) if self.state is not None else len(state.get("completed_dirs") or [])}
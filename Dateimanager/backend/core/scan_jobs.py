@@ -0,0 +1,170 @@
+import time
+import uuid
+import logging
+import datetime
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict, defaultdict
+from typing import List, Dict, Optional, Any, Callable, Iterator
+
+JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED = "queued", "running", "completed", "failed", "cancelled"
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+class ScanCancelled(Exception):
+    """Wird im Scan ausgelöst, wenn der zugehörige Job abgebrochen wurde (der Checkpoint bleibt erhalten)."""
+
+class ScanBusy(Exception):
+    """Ein laufender Scan-Job hat sich nicht rechtzeitig beenden lassen; die Index-Operation wurde nicht ausgeführt."""
+
+class ScanStats:
+    """Laufende Kennzahlen eines Scans; wird vom Scanner fortgeschrieben und von der API gelesen."""
+
+    def __init__(self, cancel_event: Optional[threading.Event] = None):
+        self.cancel_event = cancel_event or threading.Event()
+        self.phase = "walking" # walking (Extraktion läuft schon mit) -> extracting -> finishing
+        self.files_walked = 0
+        self.dirs_walked = 0
+        self.files_to_extract: Optional[int] = None # wächst während des Durchlaufs
+        self.files_extracted = 0
+        self.bytes_extracted = 0
+        self.errors = 0
+        self.cache_hits = 0 # Inhalte aus dem Extraktions-Cache statt neu geparst
+        self.timeouts = 0 # Extraktionen nach Zeitüberschreitung aufgegeben (zählen auch als Fehler)
+        self.ext_timings: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0]) # Endung -> [Anzahl, Sekunden]
+        self.started = time.monotonic()
+        self._extract_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def check_cancelled(self):
+        if self.cancel_event.is_set(): raise ScanCancelled()
+
+    def walked(self, dirs: int, files: int):
+        with self._lock: self.dirs_walked += dirs; self.files_walked += files
+
+    def planned(self, files: int):
+        """Weitere Dateien zur Extraktion eingeplant; der Scan plant sie nach und nach während des Durchlaufs ein."""
+        with self._lock:
+            self.files_to_extract = (self.files_to_extract or 0) + files
+            if self._extract_started is None: self._extract_started = time.monotonic()
+
+    def extracted(self, files: int, size_bytes: int, errors: int, timings: Dict[str, List[float]], cache_hits: int = 0,
+                  timeouts: int = 0):
+        with self._lock:
+            self.files_extracted += files
+            self.bytes_extracted += size_bytes
+            self.errors += errors
+            self.cache_hits += cache_hits
+            self.timeouts += timeouts
+            for ext, (count, seconds) in timings.items():
+                entry = self.ext_timings[ext]
+                entry[0] += count; entry[1] += seconds
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.started
+            extract_elapsed = now - self._extract_started if self._extract_started else 0.0
+            files_per_sec = self.files_extracted / extract_elapsed if extract_elapsed > 0 else 0.0
+            remaining = None if self.files_to_extract is None else max(0, self.files_to_extract - self.files_extracted)
+            eta = remaining / files_per_sec if remaining is not None and files_per_sec > 0 else None
+            return {
+                "phase": self.phase, "elapsed_seconds": round(elapsed, 1),
+                "dirs_walked": self.dirs_walked, "files_walked": self.files_walked,
+                "files_to_extract": self.files_to_extract, "files_extracted": self.files_extracted,
+                "files_remaining": remaining, "errors": self.errors, "cache_hits": self.cache_hits,
+                "timeouts": self.timeouts,
+                "bytes_per_sec": round(self.bytes_extracted / extract_elapsed) if extract_elapsed > 0 else 0,
+                "files_per_sec": round(files_per_sec, 2), "eta_seconds": round(eta, 1) if eta is not None else None,
+                "extension_timings": {ext: {"files": int(c), "seconds": round(s, 3), "avg_ms": round(s * 1000 / c, 2) if c else 0.0}
+                                      for ext, (c, s) in sorted(self.ext_timings.items())},
+            }
+
+class ScanJob:
+    def __init__(self, kind: str, base_dirs: Optional[List[str]]):
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind # "scan" oder "actualize"
+        self.base_dirs = base_dirs
+        self.status = JOB_QUEUED
+        self.stats = ScanStats()
+        self.message: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.datetime.now().isoformat()
+        self.finished_at: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"job_id": self.id, "kind": self.kind, "base_dirs": self.base_dirs, "status": self.status,
+                "message": self.message, "error": self.error, "created_at": self.created_at,
+                "finished_at": self.finished_at, "progress": self.stats.to_dict()}
+
+class ScanJobManager:
+    """
+    Führt Scans als Hintergrund-Jobs aus, einer nach dem anderen (sie teilen Index und Worker-Pool).
+    `runner(kind, base_dirs, stats)` führt den eigentlichen Scan aus; die letzten `keep` Jobs bleiben abfragbar.
+    """
+
+    def __init__(self, runner: Callable[[str, Optional[List[str]], ScanStats], Dict[str, Any]], keep: int = 20):
+        self.runner = runner
+        self.keep = keep
+        self.jobs: "OrderedDict[str, ScanJob]" = OrderedDict()
+        self._run_lock = threading.Lock() # serialisiert die Scans
+        self._lock = threading.Lock()
+
+    def start(self, kind: str, base_dirs: Optional[List[str]] = None) -> ScanJob:
+        job = ScanJob(kind, base_dirs)
+        with self._lock:
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished]
+            for old in finished[:max(0, len(self.jobs) - self.keep)]: del self.jobs[old.id]
+        threading.Thread(target=self._run, args=(job,), name=f"ScanJob-{job.id}", daemon=True).start()
+        return job
+
+    def _run(self, job: ScanJob):
+        with self._run_lock:
+            if job.stats.cancel_event.is_set():
+                job.status, job.message = JOB_CANCELLED, "Vor dem Start abgebrochen."
+            else:
+                job.status = JOB_RUNNING
+                job.stats.started = time.monotonic()
+                try:
+                    result = self.runner(job.kind, job.base_dirs, job.stats)
+                    job.status, job.message = JOB_COMPLETED, result.get("message")
+                except ScanCancelled:
+                    job.status, job.message = JOB_CANCELLED, "Scan abgebrochen; ein neuer Scan setzt am Checkpoint fort."
+                except Exception as e:
+                    logging.error(f"Scan-Job {job.id} fehlgeschlagen: {e}", exc_info=True)
+                    job.status, job.error = JOB_FAILED, str(e)
+            job.stats.phase = "done"
+            job.finished_at = datetime.datetime.now().isoformat()
+        logging.info(f"Scan-Job {job.id} ({job.kind}): {job.status}.")
+
+    def get(self, job_id: str) -> Optional[ScanJob]:
+        return self.jobs.get(job_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [job.to_dict() for job in reversed(list(self.jobs.values()))]
+
+    def cancel(self, job_id: str) -> bool:
+        job = self.jobs.get(job_id)
+        if job is None or job.finished: return False
+        job.stats.cancel_event.set()
+        return True
+
+    def cancel_all(self):
+        for job in list(self.jobs.values()):
+            if not job.finished: job.stats.cancel_event.set()
+
+    @contextmanager
+    def exclusive(self, timeout: float = 30.0) -> Iterator[None]:
+        """
+        Für Operationen, die den ganzen Index ersetzen (Laden, Löschen, Import): bricht laufende und wartende Jobs ab
+        und wartet bis zu `timeout` Sekunden auf deren Ende; danach ScanBusy. Neue Jobs warten bis zum Blockende.
+        """
+        self.cancel_all()
+        if not self._run_lock.acquire(timeout=timeout):
+            raise ScanBusy("Ein Scan läuft noch und ließ sich nicht rechtzeitig abbrechen. Bitte später erneut versuchen.")
+        try: yield
+        finally: self._run_lock.release()
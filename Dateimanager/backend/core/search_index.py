@@ -0,0 +1,178 @@
+import re
+from collections import Counter
+from typing import Dict, List, Optional, Iterable, Tuple, Set, Any, Protocol
+
+try: from re import _parser as _sre_parse # Python >= 3.11
+except ImportError: import sre_parse as _sre_parse
+
+_TOKEN_RE = re.compile(r'\w+')
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text: return []
+    return _TOKEN_RE.findall(text.lower())
+
+def term_frequencies(text: Optional[str]) -> Dict[str, int]:
+    return dict(Counter(tokenize(text)))
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    if not text or len(text) < 3: return set()
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def regex_required_literals(pattern: str, flags: int = 0) -> List[str]:
+    """
+    Liefert die Literal-Folgen, die in jedem Treffer des Musters vorkommen müssen (nur oberste Ebene).
+    Alles, was kein einfaches Literal ist (Klassen, Wiederholungen, Alternativen ...), trennt die Folgen.
+    """
+    runs, current = [], []
+    for op, av in _sre_parse.parse(pattern, flags):
+        if op is _sre_parse.LITERAL:
+            current.append(chr(av))
+            continue
+        if current: runs.append("".join(current)); current = []
+    if current: runs.append("".join(current))
+    return runs
+
+class DocRows(Protocol):
+    """Vergibt die Dokument-IDs: die EntryTable mit ihren Zeilennummern."""
+    def row_of(self, path: str) -> Optional[int]: ...
+    def path_at(self, row: int) -> Optional[str]: ...
+
+class _DocIdIndex:
+    """
+    Gemeinsame Basis: Dokument-IDs sind die Zeilennummern der EntryTable (`rows`), damit die Posting-Listen
+    klein bleiben und kein Index die Pfade ein weiteres Mal speichert. Ein Pfad muss daher in der Tabelle
+    stehen, bevor er indiziert wird, und wird vor dem Entfernen aus der Tabelle aus dem Index genommen.
+    """
+
+    def __init__(self, rows: DocRows):
+        self.rows = rows
+        self.postings: Dict[str, Any] = {}
+
+    def clear(self):
+        self.__init__(self.rows)
+
+    def path_of(self, doc_id: int) -> Optional[str]:
+        return self.rows.path_at(doc_id)
+
+    def _doc_id(self, path: str) -> int:
+        doc_id = self.rows.row_of(path)
+        if doc_id is None: raise KeyError(f"{path} steht nicht in der Eintragstabelle")
+        return doc_id
+
+class InvertedIndex(_DocIdIndex):
+    """Invertierter Token-Index für die Suche: token -> {doc_id: Termfrequenz}."""
+
+    def __init__(self, rows: DocRows):
+        super().__init__(rows)
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {} # Vorwärts-Index, nötig für Updates/Löschungen
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def __contains__(self, path: str) -> bool:
+        doc_id = self.rows.row_of(path)
+        return doc_id is not None and doc_id in self._doc_terms
+
+    def update(self, path: str, terms: Dict[str, int]):
+        """Ersetzt die Postings eines Dokuments. Leere `terms` entfernen das Dokument."""
+        self.remove(path)
+        if not terms: return
+        doc_id = self._doc_id(path)
+        for token, tf in terms.items():
+            self.postings.setdefault(token, {})[doc_id] = tf
+        self._doc_terms[doc_id] = tuple(terms.keys())
+
+    def update_text(self, path: str, text: Optional[str]):
+        self.update(path, term_frequencies(text))
+
+    def remove(self, path: str):
+        doc_id = self.rows.row_of(path)
+        if doc_id is None: return
+        for token in self._doc_terms.pop(doc_id, ()):
+            plist = self.postings.get(token)
+            if plist is None: continue
+            plist.pop(doc_id, None)
+            if not plist: del self.postings[token]
+
+    def terms_of(self, path: str) -> Dict[str, int]:
+        doc_id = self.rows.row_of(path)
+        if doc_id is None: return {}
+        return {t: self.postings[t][doc_id] for t in self._doc_terms.get(doc_id, ()) if t in self.postings}
+
+    def match_counts(self, query: str) -> Dict[int, int]:
+        """
+        Liefert {doc_id: Trefferanzahl} für einen Suchbegriff. Mehrwort-Begriffe müssen mit allen
+        Tokens vorkommen; als Trefferanzahl gilt dann die kleinste Termfrequenz.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens: return {}
+        plists = [self.postings.get(t) for t in tokens]
+        if any(p is None for p in plists): return {}
+        plists.sort(key=len)
+        result = dict(plists[0]) # Kopie; die Postings können sich währenddessen ändern
+        for plist in plists[1:]:
+            result = {d: min(tf, other) for d, tf in result.items() if (other := plist.get(d)) is not None}
+            if not result: break
+        return result
+
+class TrigramIndex(_DocIdIndex):
+    """
+    Trigramm-Index (gram -> {doc_id}) zur Vorauswahl von Kandidaten für Teilstring- und Regex-Suchen.
+    Er liefert nur eine Obermenge der Treffer; die exakte Prüfung erfolgt danach auf dem Text.
+    """
+
+    def __init__(self, rows: DocRows):
+        super().__init__(rows)
+        self.postings: Dict[str, Set[int]] = {}
+        self._doc_grams: Dict[int, str] = {} # Trigramme konkateniert (je 3 Zeichen), spart Speicher
+
+    def __len__(self) -> int:
+        return len(self._doc_grams)
+
+    def update(self, path: str, text: Optional[str]):
+        self.update_grams(path, trigrams(text))
+
+    def update_grams(self, path: str, grams: Iterable[str]):
+        self.remove(path)
+        grams = sorted(set(grams))
+        if not grams: return
+        doc_id = self._doc_id(path)
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(doc_id)
+        self._doc_grams[doc_id] = "".join(grams)
+
+    def remove(self, path: str):
+        doc_id = self.rows.row_of(path)
+        if doc_id is None: return
+        packed = self._doc_grams.pop(doc_id, "")
+        for i in range(0, len(packed), 3):
+            gram = packed[i:i + 3]
+            plist = self.postings.get(gram)
+            if plist is None: continue
+            plist.discard(doc_id)
+            if not plist: del self.postings[gram]
+
+    def grams_of(self, path: str) -> str:
+        doc_id = self.rows.row_of(path)
+        return self._doc_grams.get(doc_id, "") if doc_id is not None else ""
+
+    def candidates(self, needles: Iterable[str]) -> Optional[Set[int]]:
+        """
+        Dokumente, die alle Trigramme aller `needles` enthalten. None bedeutet: keine Einschränkung
+        möglich (alle Needles kürzer als 3 Zeichen), der Aufrufer muss dann alles prüfen.
+        """
+        grams: Set[str] = set()
+        for needle in needles: grams |= trigrams(needle)
+        if not grams: return None
+        plists = [self.postings.get(g) for g in grams]
+        if any(p is None for p in plists): return set()
+        plists.sort(key=len)
+        result = set(plists[0]) # Kopie; Schnittmengen laufen ohne Python-Schleife über die geteilten Sets
+        for plist in plists[1:]:
+            result &= plist
+            if not result: break
+        return result
+
+    def update_packed(self, path: str, packed: str):
+        self.update_grams(path, (packed[i:i + 3] for i in range(0, len(packed), 3)))
@@ -0,0 +1,229 @@
+import os
+import sys
+import logging
+import importlib
+import threading
+import concurrent.futures
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Callable, Iterable, Iterator, Tuple, Any
+
+try: import psutil
+except ImportError: psutil = None
+
+# Werden beim Start jedes Workers einmal importiert, damit die erste Aufgabe nicht den Import bezahlt
+DEFAULT_PRELOAD = ("chardet", "PyPDF2", "docx", "ocrmypdf", "backend.core.file_scanner")
+DEFAULT_MAX_TASKS_PER_WORKER = 200 # Dateien je Prozess, danach werden die Prozesse ersetzt (Speicherwachstum von PyPDF2 & Co.)
+DEFAULT_MAX_WORKER_RSS_MB = 1024
+
+_recycle_requested = False # im Worker gesetzt, wenn er ersetzt werden soll (z. B. hängender Extraktions-Thread)
+_task_units = 1 # Zahl der Dateien, die die laufende Aufgabe verarbeitet hat (siehe report_units)
+
+class _Retired:
+    """Ergebnis einer Aufgabe, die ein zum Ersetzen markierter Worker nicht mehr angenommen hat."""
+
+class ExtractionTimeout(Exception):
+    """Eine Aufgabe hat ihr Zeitlimit überschritten und wurde aufgegeben."""
+
+def _init_worker(modules: Tuple[str, ...]):
+    # Per fork geerbte Verwaltung der Executoren des Elternprozesses vergessen: räumt dort gerade ein ersetzter Executor
+    # auf, ist dessen Sperre im Abbild gehalten, und der Worker bliebe beim Beenden in _python_exit hängen
+    try: concurrent.futures.process._threads_wakeups.clear()
+    except AttributeError: pass
+    for name in modules:
+        try: importlib.import_module(name)
+        except Exception as e: logging.debug(f"Worker-Vorladen von {name} fehlgeschlagen: {e}")
+
+def _current_rss() -> Optional[int]:
+    """Belegter Arbeitsspeicher des Prozesses in Bytes (ohne psutil unter Linux aktuell, sonst der Spitzenwert)."""
+    if psutil is not None: return psutil.Process().memory_info().rss
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError): pass
+    try: import resource
+    except ImportError: return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+def _measured_call(fn: Callable, args: Tuple) -> Tuple[Any, Optional[int], bool, int]:
+    global _task_units
+    # Läuft hier noch ein aufgegebener Thread (PDFium & Co. sind nicht threadsicher), übernimmt ein frischer Prozess
+    if _recycle_requested: return _Retired, None, True, 0
+    _task_units = 1
+    result = fn(*args)
+    return result, _current_rss(), _recycle_requested, _task_units
+
+def request_recycle():
+    """Im Worker aufzurufen: der Prozess wird nach dieser Aufgabe ersetzt und nimmt keine weitere mehr an."""
+    global _recycle_requested
+    _recycle_requested = True
+
+def report_units(count: int):
+    """Im Worker aufzurufen: die laufende Aufgabe zählt für max_tasks_per_worker als `count` Dateien (z.B. ein Stapel)."""
+    global _task_units
+    _task_units = max(0, count)
+
+def run_with_deadline(fn: Callable, args: Tuple, timeout: Optional[float]) -> Any:
+    """
+    Führt fn(*args) mit Zeitlimit aus. Läuft die Aufgabe zu lange, wird ExtractionTimeout ausgelöst; der
+    hängende Thread läuft im Hintergrund weiter, bis der Worker-Prozess ersetzt wird (siehe request_recycle).
+    """
+    if not timeout: return fn(*args)
+    outcome = {}
+    def target():
+        try: outcome["result"] = fn(*args)
+        except BaseException as e: outcome["error"] = e
+    thread = threading.Thread(target=target, name="Deadline", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        request_recycle()
+        raise ExtractionTimeout(f"Zeitlimit von {timeout:g}s überschritten.")
+    if "error" in outcome: raise outcome["error"]
+    return outcome.get("result")
+
+def default_worker_count() -> int:
+    try: cpu_c = os.cpu_count() or 1
+    except NotImplementedError: cpu_c = 1
+    return max(1, cpu_c - 1)
+
+class WorkerPool:
+    """
+    Langlebiger Prozesspool für Extraktion, Signaturen und OCR. Der Executor wird beim ersten Bedarf gestartet
+    und bleibt bestehen; die Zahl offener Aufgaben ist begrenzt (`submit` blockiert, bis wieder Platz ist).
+    Nach einem abgestürzten Worker (BrokenProcessPool) wird der Executor beim nächsten Aufruf neu erzeugt.
+    Nach `max_tasks_per_worker` Dateien je Prozess (siehe report_units), oberhalb von `max_worker_rss_mb` oder auf Wunsch
+    eines Workers werden die Prozesse ersetzt: neue Aufgaben gehen an einen frischen Executor, der alte arbeitet seine noch ab.
+    Aufgaben, die ein Worker mit hängendem Thread noch ziehen würde, laufen stattdessen im frischen Executor.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_pending: Optional[int] = None,
+                 preload: Tuple[str, ...] = DEFAULT_PRELOAD, max_tasks_per_worker: Optional[int] = DEFAULT_MAX_TASKS_PER_WORKER,
+                 max_worker_rss_mb: Optional[int] = DEFAULT_MAX_WORKER_RSS_MB):
+        self._max_workers = max(1, max_workers or default_worker_count())
+        self.max_pending = max_pending or self._max_workers * 4
+        self.preload = tuple(preload)
+        self.max_tasks_per_worker = max_tasks_per_worker # None/0 = nie ersetzen
+        self.max_worker_rss_mb = max_worker_rss_mb
+        self.recycle_count = 0
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._tasks_done = 0 # verarbeitete Dateien des aktuellen Executors
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def resize(self, max_workers: Optional[int]):
+        """Ändert die Prozesszahl; laufende Aufgaben des alten Executors laufen noch zu Ende."""
+        max_workers = max(1, max_workers or default_worker_count())
+        with self._lock:
+            if max_workers == self._max_workers: return
+            self._max_workers = max_workers
+            old, self._executor = self._executor, None
+        if old is not None: old.shutdown(wait=False)
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._closed: raise RuntimeError("WorkerPool ist bereits beendet.")
+            if self._executor is None:
+                self._executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self._max_workers, initializer=_init_worker, initargs=(self.preload,))
+                self._tasks_done = 0
+                logging.info(f"WorkerPool: {self._max_workers} Prozess(e) gestartet.")
+            return self._executor
+
+    def _discard(self, executor: concurrent.futures.ProcessPoolExecutor):
+        with self._lock:
+            if self._executor is executor: self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, fn: Callable, *args: Any) -> concurrent.futures.Future:
+        """Reicht eine Aufgabe ein; blockiert, solange bereits `max_pending` Aufgaben offen sind."""
+        self._slots.acquire()
+        # Der Aufrufer bekommt nur das Ergebnis; Speicherstand und Ersetzungswunsch des Workers bleiben hier
+        future = concurrent.futures.Future()
+        try: self._dispatch(fn, args, future)
+        except BaseException:
+            self._slots.release(); raise
+        return future
+
+    def _dispatch(self, fn: Callable, args: Tuple, future: concurrent.futures.Future):
+        """Übergibt die Aufgabe dem aktuellen Executor (der Platz in _slots ist bereits belegt)."""
+        for attempt in range(2):
+            executor = self._get_executor()
+            try: inner = executor.submit(_measured_call, fn, args); break
+            except BrokenProcessPool:
+                logging.warning("WorkerPool: Prozesspool defekt, starte neu.")
+                self._discard(executor)
+                if attempt: raise
+            except RuntimeError: # Executor wurde gerade ersetzt und nimmt nichts mehr an
+                if attempt or self._executor is executor: raise
+        inner.add_done_callback(lambda f: self._on_done(f, future, executor, fn, args))
+
+    def _on_done(self, inner: concurrent.futures.Future, future: concurrent.futures.Future,
+                 executor: concurrent.futures.ProcessPoolExecutor, fn: Callable, args: Tuple):
+        if inner.cancelled():
+            self._slots.release(); future.cancel(); return
+        error = inner.exception()
+        if error is None and inner.result()[0] is _Retired: # Worker mit hängendem Thread: im frischen Executor wiederholen
+            self._maybe_recycle(executor, None, True, 0)
+            try: self._dispatch(fn, args, future); return # der Platz bleibt belegt
+            except BaseException as e: error = e
+        self._slots.release()
+        if error is not None:
+            if isinstance(error, BrokenProcessPool): self._discard(executor)
+            else: self._maybe_recycle(executor, None, isinstance(error, ExtractionTimeout))
+            future.set_exception(error); return
+        result, rss, recycle, units = inner.result()
+        self._maybe_recycle(executor, rss, recycle, units) # vorher, damit die nächste Aufgabe schon den neuen Executor bekommt
+        future.set_result(result)
+
+    def _maybe_recycle(self, executor: concurrent.futures.ProcessPoolExecutor, rss: Optional[int], recycle: bool, units: int = 1):
+        with self._lock:
+            if self._executor is not executor: return # bereits ersetzt
+            self._tasks_done += units
+            if recycle: reason = "Aufgabe abgebrochen"
+            elif self.max_worker_rss_mb and rss and rss > self.max_worker_rss_mb * 1024 * 1024: reason = f"{rss // (1024 * 1024)} MB belegt"
+            elif self.max_tasks_per_worker and self._tasks_done >= self.max_tasks_per_worker * self._max_workers:
+                reason = f"{self._tasks_done} Dateien verarbeitet"
+            else: return
+            self._executor = None
+            self.recycle_count += 1
+        logging.info(f"WorkerPool: ersetze Prozesse ({reason}).")
+        executor.shutdown(wait=False)
+
+    def map_unordered(self, fn: Callable, items: Iterable[Tuple], window: Optional[int] = None
+                      ) -> Iterator[Tuple[Tuple, concurrent.futures.Future]]:
+        """
+        Führt fn(*args) für alle Argument-Tupel aus und liefert (args, future) in Fertigstellungsreihenfolge.
+        Höchstens `window` Aufgaben sind gleichzeitig eingereicht, die Eingabe wird also gestreamt.
+        """
+        window = max(1, min(window or self.max_pending, self.max_pending))
+        in_flight = {}
+        for args in items:
+            if len(in_flight) >= window:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done: yield in_flight.pop(future), future
+            in_flight[self.submit(fn, *args)] = args
+        for future in concurrent.futures.as_completed(list(in_flight)):
+            yield in_flight.pop(future), future
+
+    def map(self, fn: Callable, items: Iterable[Tuple], window: Optional[int] = None) -> Iterator[Any]:
+        """Wie map_unordered, aber Ergebnisse in Eingabereihenfolge (Fehler werden beim Abholen geworfen)."""
+        window = max(1, min(window or self.max_pending, self.max_pending))
+        in_flight = deque()
+        for args in items:
+            if len(in_flight) >= window: yield in_flight.popleft().result()
+            in_flight.append(self.submit(fn, *args))
+        while in_flight: yield in_flight.popleft().result()
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+            logging.info("WorkerPool beendet.")
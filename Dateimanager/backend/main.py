@@ -6,6 +6,7 @@ from typing import Dict, List, Optional
 from fastapi.security import OAuth2PasswordBearer  # Für Security
 from datetime import timedelta
 from backend.controller.datei_controller import DateiController
+from backend.core.scan_jobs import ScanBusy
 from backend.api.models import (
     FileInfo, FileUpdate, SearchRequest, SearchResult,
     FileScanResponse, ScannerConfig, FileWriteRequest,
@@ -15,15 +16,20 @@ from backend.api.models import (
 
     OldFileInfo, OldFilesQueryParams, ChangePasswordRequest,
     DataWrapper, DuplicateGroupsResponse, SearchDuplicatesRequest,
+    ScanRequest,
+    ScanProgress,
+    ScanJobInfo,
+    QuarantineEntry, QuarantineReleaseRequest,
 )
 import datetime
+import json
 from jose import jwt as jose_jwt
 from jose.exceptions import JWTError
 import os
 import sys
 import signal
 from starlette.background import BackgroundTask
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, StreamingResponse
 import asyncio
 import platform, string
 import uvicorn
@@ -171,6 +177,17 @@ INDEX_CONTENT = True
 MAX_SIZE_KB = 0
 MAX_CONTENT_SIZE_LET = None
 SEARCH_LIMIT = 30
+CONTENT_CACHE_MB = 64 # Speicherbudget für zwischengespeicherte Dateiinhalte
+WALKER_THREADS = None # Threads für den Verzeichnis-Durchlauf (None = automatisch)
+WATCH_FILES = True # Dateiänderungen live in den Index übernehmen (inotify bzw. Polling)
+WATCH_DEBOUNCE_MS = 1500
+WORKER_PROCESSES = None # Geteilter Prozesspool für Extraktion/Dedupe/OCR (None = Kerne - 1)
+HASH_ALGORITHM = "auto" # Datei-Hashes: xxh3 bzw. blake3, falls installiert, sonst md5
+PDF_BACKEND = "auto" # PDF-Text: pypdfium2, falls installiert, sonst PyPDF2 ('pdfminer' auf Wunsch)
+EXTRACTION_TIMEOUT = 120 # Sekunden je Datei; wiederholt hängende Dateien kommen in Quarantäne
+WORKER_MAX_TASKS = 200 # Worker nach so vielen Aufgaben je Prozess ersetzen
+WORKER_MAX_RSS_MB = 1024 # ... oder sobald ein Worker mehr Speicher belegt
+PDF_INITIAL_PAGES = 100 # längere PDFs: erste Seiten beim Scan, den Rest im Hintergrund (None = alle Seiten sofort)
 STRUCTURE_FILE = os.path.join(DATA_DIR, "structure.json")
 USER_FILE = os.path.join(DATA_DIR, "users.json")
 AUTO_LOGIN_TIME = 24
@@ -228,13 +245,25 @@ controller = DateiController(
     snippet_step=SNIPPET_STEP_DEDUPE, # Use renamed parameter
     signature_size=SIGNATURE_SIZE,
     similarity_threshold=SIMILARITY_THRESHOLD,
+    content_cache_mb=CONTENT_CACHE_MB,
+    walker_threads=WALKER_THREADS,
+    watch_files=WATCH_FILES,
+    watch_debounce_ms=WATCH_DEBOUNCE_MS,
+    worker_processes=WORKER_PROCESSES,
+    hash_algorithm=HASH_ALGORITHM,
+    pdf_backend=PDF_BACKEND,
+    extraction_timeout=EXTRACTION_TIMEOUT,
+    worker_max_tasks=WORKER_MAX_TASKS,
+    worker_max_rss_mb=WORKER_MAX_RSS_MB,
+    pdf_initial_pages=PDF_INITIAL_PAGES,
 )
 
 # --- FastAPI-Setup ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("Serverstart: Lade Index...")
-    controller.load_index()
+    print("Serverstart: Lade Index im Hintergrund...")
+    controller.load_index_async()
+    controller.start_watcher() # Änderungen werden gesammelt und nach dem Laden angewendet
     print("Serverstart: Starte Event Manager...")
     controller.start_event_monitoring()
     os.makedirs("data", exist_ok=True)
@@ -242,8 +271,8 @@ async def lifespan(app: FastAPI):
 
     yield
 
-    print("Serverende: Speichere Index...")
-    controller.save_index()
+    print("Serverende: Speichere Index und beende Worker-Pool...")
+    controller.close_index()
     shutdown_task.cancel()
 
 
@@ -290,6 +319,10 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 async def read_root():
     return {"message": "Hallo, Welt!"}
 
+@app.get("/health/")
+async def health():
+    return controller.get_health()
+
 @app.post("/shutdown/")
 async def shutdown_request(
     data: ShutdownRequest,
@@ -441,27 +474,75 @@ async def search_duplicates(request: SearchDuplicatesRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.exception_handler(ScanBusy)
+async def scan_busy_handler(request, exc: ScanBusy):
+    return JSONResponse(status_code=409, content={"detail": str(exc)})
+
+# Laden, Löschen und Import warten ggf. auf das Ende eines Scan-Jobs: synchron, damit FastAPI sie im Threadpool ausführt
 @app.post("/load_index/", response_model=FileScanResponse)
-async def load_index():
+def load_index():
     controller.load_index()
     return {"message": "Index erfolgreich geladen."}
 
 @app.post("/delete_index/", response_model=FileScanResponse)
-async def delete_index():
-    controller.file_scanner.delete_index()
-    controller.save_index()
+def delete_index():
+    controller.delete_index()
     controller.save_duplicates()
     return {"message": "Index gelöscht und neu geladen."}
 
 @app.post("/scan_files/", response_model=FileScanResponse)
-async def scan_files():
-    result = controller.scan_files()
-    return {"message": result["message"]}
+async def scan_files(request: Optional[ScanRequest] = None):
+    job = controller.start_scan_job("scan", base_dirs=request.base_dirs if request else None)
+    return {"message": "Scan gestartet.", "job_id": job.id}
 
 @app.post("/actualize_index/", response_model=FileScanResponse)
-async def actualize_index():
-    result = controller.actualize_index()
-    return {"message": result["message"]}
+async def actualize_index(request: Optional[ScanRequest] = None):
+    job = controller.start_scan_job("actualize", base_dirs=request.base_dirs if request else None)
+    return {"message": "Aktualisierung gestartet.", "job_id": job.id}
+
+@app.get("/scan_jobs/", response_model=List[ScanJobInfo])
+async def list_scan_jobs():
+    return controller.list_scan_jobs()
+
+@app.get("/scan_jobs/{job_id}", response_model=ScanJobInfo)
+async def get_scan_job(job_id: str):
+    job = controller.get_scan_job(job_id)
+    if job is None: raise HTTPException(status_code=404, detail="Scan-Job nicht gefunden.")
+    return job.to_dict()
+
+@app.post("/scan_jobs/{job_id}/cancel")
+async def cancel_scan_job(job_id: str):
+    job = controller.get_scan_job(job_id)
+    if job is None: raise HTTPException(status_code=404, detail="Scan-Job nicht gefunden.")
+    if not controller.cancel_scan_job(job_id): return {"message": f"Scan-Job ist bereits beendet ({job.status})."}
+    return {"message": "Abbruch angefordert."}
+
+@app.get("/scan_jobs/{job_id}/events")
+async def scan_job_events(job_id: str, interval: float = 1.0):
+    """Server-Sent Events: sendet den Job-Stand im Intervall, zuletzt ein `end`-Ereignis mit dem Endstand."""
+    job = controller.get_scan_job(job_id)
+    if job is None: raise HTTPException(status_code=404, detail="Scan-Job nicht gefunden.")
+    interval = min(max(interval, 0.2), 10.0)
+
+    async def stream():
+        while not job.finished:
+            yield f"event: progress\ndata: {json.dumps(job.to_dict())}\n\n"
+            await asyncio.sleep(interval)
+        yield f"event: end\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.get("/scan_progress/", response_model=ScanProgress)
+async def scan_progress():
+    return controller.get_scan_progress()
+
+@app.get("/extraction_quarantine/", response_model=List[QuarantineEntry])
+async def get_extraction_quarantine():
+    return controller.get_extraction_quarantine()
+
+@app.post("/extraction_quarantine/release")
+async def release_extraction_quarantine(request: Optional[QuarantineReleaseRequest] = None):
+    return controller.release_extraction_quarantine(request.path if request else None)
 
 @app.post("/search/", response_model=SearchResult)
 def unified_search(request: SearchRequest):
@@ -477,7 +558,8 @@ def unified_search(request: SearchRequest):
             )
         else:
             result = controller.search_files(
-                query=request.query_input
+                query=request.query_input,
+                mode=request.mode
             )
             return SearchResult(**result)
     except ValueError as ve:
@@ -739,13 +821,13 @@ async def read_database(database_name: str, current_user: dict = Depends(get_cur
     if not database_path:
         raise HTTPException(status_code=400, detail="Ungültiger Datenbankname.")
     try:
-        content = controller.read_json_file(database_path)
+        content = controller.backup_database(database_name)
         return {"content": content}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Fehler beim Lesen der Datenbank: {e}")
 
 @app.post("/database/{database_name}")
-async def write_database(database_name: str, body: DataWrapper, current_user: dict = Depends(get_current_user)):
+def write_database(database_name: str, body: DataWrapper, current_user: dict = Depends(get_current_user)):
     if not current_user["isAdmin"]:
         raise HTTPException(status_code=403, detail="Nur für Administratoren zugänglich.")
 
@@ -754,14 +836,17 @@ async def write_database(database_name: str, body: DataWrapper, current_user: di
         raise HTTPException(status_code=400, detail="Ungültiger Datenbankname.")
 
     try:
-        controller.save_json_file(database_path, body.data)
-        return {"message": f"Datenbank '{database_name}' erfolgreich aktualisiert."}
+        result = controller.overwrite_database(database_name, body.data)
+    except ScanBusy: raise
     except Exception as e:
         print(f"Interner Serverfehler beim Schreiben der Datenbank '{database_name}': {e}")
         raise HTTPException(status_code=500, detail=f"Fehler beim Schreiben der Datenbank: {e}")
+    if isinstance(result, dict) and result.get("error"):
+        raise HTTPException(status_code=400, detail=result["error"])
+    return {"message": f"Datenbank '{database_name}' erfolgreich aktualisiert."}
 
 @app.post("/database/{database_name}/reload/")
-async def reload_database(database_name: str):
+def reload_database(database_name: str):
     controller.reload_database(database_name)
     return {"message": f"Datenbank '{database_name}' erfolgreich neu geladen."}
 
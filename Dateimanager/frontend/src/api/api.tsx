@@ -109,16 +109,56 @@ export const deleteIndex = async () => {
     return response.data;
 };
 
+// Scans laufen im Backend als Job; Status und Fortschritt über /scan_jobs/{job_id}
+export interface ScanJobInfo {
+    job_id: string;
+    kind: "scan" | "actualize";
+    base_dirs?: string[] | null;
+    status: "queued" | "running" | "completed" | "failed" | "cancelled";
+    message?: string | null;
+    error?: string | null;
+    created_at: string;
+    finished_at?: string | null;
+    progress: Record<string, any>;
+}
+
+export const getScanJob = async (jobId: string): Promise<ScanJobInfo> => {
+    const response = await api.get(`/scan_jobs/${jobId}`);
+    return response.data;
+};
+
+export const cancelScanJob = async (jobId: string) => {
+    const response = await api.post(`/scan_jobs/${jobId}/cancel`);
+    return response.data;
+};
+
+// Wartet, bis der Job beendet ist; wirft bei Fehler oder Abbruch
+export const waitForScanJob = async (
+    jobId: string,
+    onProgress?: (job: ScanJobInfo) => void,
+    intervalMs: number = 1000
+): Promise<ScanJobInfo> => {
+    while (true) {
+        const job = await getScanJob(jobId);
+        onProgress?.(job);
+        if (job.status === "completed") return job;
+        if (job.status === "failed" || job.status === "cancelled") {
+            throw new Error(job.error || job.message || `Scan-Job ${job.status}`);
+        }
+        await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+};
+
 // API-Aufruf für das Scannen der Dateien
-export const scanFiles = async () => {
+export const scanFiles = async (onProgress?: (job: ScanJobInfo) => void) => {
     const response = await api.post(`/scan_files/`);
-    return response.data;
+    return waitForScanJob(response.data.job_id, onProgress);
 };
 
 // API-Aufruf für das Aktualisieren des Indexes
-export const actualizeIndex = async () => {
+export const actualizeIndex = async (onProgress?: (job: ScanJobInfo) => void) => {
     const response = await api.post(`/actualize_index/`);
-    return response.data;
+    return waitForScanJob(response.data.job_id, onProgress);
 };
 
 // --- DEDUPLICATION API Calls ---
@@ -0,0 +1,23 @@
+import os
+import sys
+
+# Dateimanager/ in den Suchpfad, damit die Tests wie die App über `backend.core...` importieren
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+@pytest.fixture
+def make_scanner(tmp_path):
+    """Baut FileScanner über tmp_path/docs mit einem Worker-Prozess; alle werden am Testende geschlossen."""
+    from backend.core.file_scanner import FileScanner
+    scanners = []
+    def make(**kwargs):
+        docs = tmp_path / "docs"
+        docs.mkdir(exist_ok=True)
+        options = dict(index_content=True, index_file=str(tmp_path / "data" / "index.json"), num_processes=1)
+        options.update(kwargs)
+        scanner = FileScanner([str(docs)], **options)
+        scanners.append(scanner)
+        return scanner
+    yield make
+    for scanner in scanners: scanner.close()
@@ -0,0 +1,27 @@
+import pytest
+
+from backend.core.index_store import BlobStore, _SqliteStore
+
+def test_store_base_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        _SqliteStore(str(tmp_path / "x.sqlite3"))
+
+def test_blob_is_stored_once_and_read_back(tmp_path):
+    blobs = BlobStore(str(tmp_path / "index.sqlite3"))
+    blobs.put_blob("h1", "Text ä")
+    blobs.put_blob("h1", "anderer Text") # gleicher Hash: bleibt beim ersten
+    blobs.cache.clear()
+    assert blobs.get_blob("h1") == "Text ä"
+    assert blobs.get_blob("fehlt") is None
+    assert blobs.get_blob(None) is None
+    blobs.close()
+
+def test_retain_drops_unreferenced_blobs_and_their_extractions(tmp_path):
+    blobs = BlobStore(str(tmp_path / "index.sqlite3"))
+    for key in ("h1", "h2"):
+        blobs.put_blob(key, f"Text {key}")
+        blobs.put_extraction(f".txt:md5:{key}", key, 6)
+    assert blobs.retain({"h1"}) == 1
+    assert blobs.has_blob("h1") and not blobs.has_blob("h2")
+    assert blobs._query("SELECT cache_key FROM extractions") == [(".txt:md5:h1",)]
+    blobs.close()
@@ -0,0 +1,29 @@
+import codecs
+
+import pytest
+
+from backend.core import file_scanner
+from backend.core.file_scanner import detect_encoding
+
+@pytest.fixture(autouse=True)
+def no_encoding_hints(monkeypatch):
+    monkeypatch.setattr(file_scanner, "_ENCODING_HINTS", type(file_scanner._ENCODING_HINTS)())
+
+def test_detect_encoding_bom_and_utf8():
+    assert detect_encoding(codecs.BOM_UTF8 + "ä".encode("utf-8")) == "utf-8-sig"
+    assert detect_encoding("ä".encode("utf-16")) == "utf-16"
+    assert detect_encoding("Grüße".encode("utf-8")) == "utf-8"
+    # Stichprobe endet mitten in einem Mehrbytezeichen
+    assert detect_encoding("ü".encode("utf-8") + b"\xc3", final=False) == "utf-8"
+
+def test_detect_encoding_legacy_fallback():
+    text = "Grüße aus Köln, schöne Straße und Äpfel für die Brüder. " * 20
+    sample = text.encode("cp1252")
+    encoding = detect_encoding(sample)
+    assert encoding != "utf-8"
+    assert sample.decode(encoding) == text
+
+def test_detect_encoding_uses_hint_for_same_folder():
+    file_scanner._ENCODING_HINTS[("/d", ".txt")] = "latin-1"
+    assert detect_encoding("Köln".encode("latin-1"), hint_key=("/d", ".txt")) == "latin-1"
+    assert detect_encoding("Köln".encode("utf-8"), hint_key=("/d", ".txt")) == "utf-8"
@@ -0,0 +1,22 @@
+import hashlib
+
+from backend.core.file_scanner import clean_content_static, digest_content
+
+TEXT = "Erste Zeile, ÄÖÜ.\nZweite Zeile mit Text!\n"
+
+def test_digest_without_truncation_matches_full_text():
+    digest = digest_content([TEXT[:7], TEXT[7:20], "", TEXT[20:]])
+    assert digest["content_full"] == TEXT
+    assert digest["content_hash"] == hashlib.md5(TEXT.encode("utf-8")).hexdigest()
+    assert digest["cleaned_content"] == clean_content_static(TEXT)
+    assert digest["cleaned_content_length"] == len(clean_content_static(TEXT))
+    assert "content_truncated" not in digest
+    assert digest_content([TEXT], retain_chars=len(TEXT)) == digest
+
+def test_digest_truncated_keeps_prefix_and_marks_hash():
+    digest = digest_content([TEXT[:10], TEXT[10:]], retain_chars=15)
+    assert digest["content_full"] == TEXT[:15]
+    assert digest["cleaned_content"] == clean_content_static(TEXT[:15])
+    assert digest["content_hash"] == hashlib.md5(TEXT.encode("utf-8")).hexdigest() + ":15"
+    assert digest["content_truncated"] is True
+    assert digest["cleaned_content_length"] == len(clean_content_static(TEXT)) # über den ganzen Text
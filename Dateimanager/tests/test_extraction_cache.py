@@ -0,0 +1,80 @@
+import os
+import shutil
+
+from backend.core.scan_jobs import ScanStats
+
+TEXT = "Rechnungsnummer 4711 für Lieferung Nummer zwei\n" * 20
+
+def _write(path, text=TEXT):
+    with open(path, "w", encoding="utf-8") as f: f.write(text)
+    return str(path)
+
+def test_copy_is_served_from_the_extraction_cache(tmp_path, make_scanner):
+    scanner = make_scanner()
+    original = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    shutil.copy(original, tmp_path / "docs" / "b.txt")
+    stats = ScanStats()
+    scanner.actualize_index(stats=stats)
+    assert stats.cache_hits == 1
+    assert scanner.get_content(str(tmp_path / "docs" / "b.txt")) == TEXT
+
+def test_touched_file_keeps_its_blob_while_pending(tmp_path, make_scanner):
+    scanner = make_scanner()
+    path = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    content_hash = scanner.index[path]["content_hash"]
+    st = os.stat(path)
+    os.utime(path, (st.st_atime, st.st_mtime + 10))
+
+    task = scanner._plan_file_task(path, "a.txt", (st.st_size, st.st_mtime + 10, None, None), actualize=True)
+    scanner._put_pending_entries([task])
+    assert scanner.index[path]["content_pending"] and scanner.index[path]["content_hash"] == content_hash
+    scanner.collect_garbage() # z.B. zwischen zwei Scans: der Blob ist weiterhin referenziert
+    assert scanner.store.has_blob(content_hash)
+
+    stats = ScanStats()
+    scanner.actualize_index(stats=stats)
+    assert stats.cache_hits == 1
+    assert not scanner.index[path].get("content_pending")
+    assert scanner.get_content(path) == TEXT
+
+def test_gc_is_skipped_while_a_scan_runs(tmp_path, make_scanner):
+    scanner = make_scanner()
+    with scanner.store.batch(): scanner.store.put_blob("verwaist", "x")
+    with scanner._scan_activity():
+        assert scanner.collect_garbage() == 0
+    assert scanner.store.has_blob("verwaist")
+    assert scanner.collect_garbage() == 1
+
+def test_cache_hit_whose_blob_vanished_is_extracted_again(tmp_path, make_scanner):
+    scanner = make_scanner()
+    original = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    copy = str(tmp_path / "docs" / "b.txt")
+    shutil.copy(original, copy)
+
+    # Bereinigung zwischen der Cache-Abfrage im Worker und der Übernahme im Hauptprozess
+    map_unordered = scanner.worker_pool.map_unordered
+    def gc_after_lookup(fn, items, window=None):
+        for args, future in map_unordered(fn, items, window):
+            future.result()
+            scanner.store.blobs.retain(set())
+            yield args, future
+    scanner.worker_pool.map_unordered = gc_after_lookup
+    scanner.actualize_index()
+    scanner.worker_pool.map_unordered = map_unordered
+
+    assert scanner.get_content(copy) == TEXT
+    assert scanner.search_in_file(copy, "4711")["match_count"] > 0
+
+def test_actualize_repairs_entries_without_blob(tmp_path, make_scanner):
+    scanner = make_scanner()
+    path = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    scanner.store.blobs.retain(set()) # Verlust aus einer früheren Version
+    scanner.store.blobs.cache.clear()
+    assert scanner.get_content(path) is None
+
+    scanner.actualize_index()
+    assert scanner.get_content(path) == TEXT
@@ -0,0 +1,18 @@
+from backend.core.extraction_quarantine import ExtractionQuarantine
+
+def test_repeated_timeouts_quarantine_until_the_file_changes(tmp_path):
+    quarantine = ExtractionQuarantine(str(tmp_path / "quarantine.json"), max_strikes=2)
+    assert not quarantine.strike("/d/a.pdf", 100, "2024-01-01T00:00:00")
+    assert quarantine.strike("/d/a.pdf", 100, "2024-01-01T00:00:00")
+    assert quarantine.is_quarantined("/d/a.pdf", 100, "2024-01-01T00:00:00")
+    assert not quarantine.is_quarantined("/d/a.pdf", 120, "2024-01-02T00:00:00") # geändert: neue Chance
+
+    reloaded = ExtractionQuarantine(str(tmp_path / "quarantine.json"), max_strikes=2)
+    assert reloaded.is_quarantined("/d/a.pdf", 100, "2024-01-01T00:00:00")
+    assert reloaded.release() == 1 and reloaded.list() == []
+
+def test_success_forgets_earlier_timeouts(tmp_path):
+    quarantine = ExtractionQuarantine(str(tmp_path / "quarantine.json"), max_strikes=2)
+    quarantine.strike("/d/a.pdf", 100, "2024-01-01T00:00:00")
+    quarantine.forget("/d/a.pdf")
+    assert not quarantine.strike("/d/a.pdf", 100, "2024-01-01T00:00:00")
@@ -0,0 +1,56 @@
+import os
+import hashlib
+
+from backend.core import file_scanner as fs
+from backend.core.file_hashing import compute_file_hash, compute_quick_hash, resolve_hash_algorithm, default_hash_algorithm
+
+def test_full_hash_matches_hashlib_across_buffer_boundaries(tmp_path):
+    data = os.urandom(10_000)
+    (tmp_path / "a.bin").write_bytes(data)
+    assert compute_file_hash(str(tmp_path / "a.bin"), "md5", buffer_size=4096) == hashlib.md5(data).hexdigest()
+    assert compute_file_hash(str(tmp_path / "a.bin"), "sha1") == hashlib.sha1(data).hexdigest()
+
+def test_quick_hash_covers_size_head_and_tail(tmp_path):
+    base = b"a" * 1000 + b"b" * 1000 + b"c" * 1000
+    variants = {"gleich": base, "mitte": base[:1500] + b"x" + base[1501:], "ende": base[:-1] + b"x", "laenger": base + b"c"}
+    for name, data in variants.items(): (tmp_path / name).write_bytes(data)
+    (tmp_path / "original").write_bytes(base)
+    quick = {name: compute_quick_hash(str(tmp_path / name), sample=500) for name in list(variants) + ["original"]}
+    assert quick["gleich"] == quick["original"]
+    assert quick["mitte"] == quick["original"] # nur möglicherweise gleich: der volle Hash entscheidet
+    assert quick["ende"] != quick["original"] and quick["laenger"] != quick["original"]
+
+def test_unknown_algorithm_falls_back_to_the_default():
+    assert resolve_hash_algorithm("auto") == resolve_hash_algorithm(None) == default_hash_algorithm()
+    assert resolve_hash_algorithm("gibtsnicht") == default_hash_algorithm()
+    assert resolve_hash_algorithm("MD5") == "md5"
+
+def test_move_candidates_with_other_quick_hash_skip_the_full_hash(tmp_path, make_scanner, monkeypatch):
+    scanner = make_scanner()
+    docs = tmp_path / "docs"
+    (docs / "a.txt").write_text("Inhalt A", encoding="utf-8")
+    scanner.scan_files()
+    os.remove(docs / "a.txt")
+    (docs / "b.txt").write_text("Inhalt B", encoding="utf-8") # gleiche Größe, anderer Inhalt
+    full_hashes = []
+    compute = fs._compute_hash_static
+    monkeypatch.setattr(fs, "_compute_hash_static", lambda path, *args: full_hashes.append(path) or compute(path, *args))
+    scanner.actualize_index()
+    assert full_hashes == [] # im Hauptprozess nicht voll gehasht
+    assert str(docs / "a.txt") not in scanner.index and scanner.get_content(str(docs / "b.txt")) == "Inhalt B"
+
+def test_switching_the_algorithm_rehashes_without_extraction(tmp_path, make_scanner, monkeypatch):
+    (tmp_path / "docs").mkdir()
+    path = tmp_path / "docs" / "a.txt"
+    path.write_text("Kündigung", encoding="utf-8")
+    first = make_scanner(hash_algorithm="md5")
+    first.scan_files()
+    first.close()
+
+    scanner = make_scanner(hash_algorithm="sha1")
+    scanner.load_index()
+    assert scanner.index[str(path)]["file_hash"] is None # MD5-Hash verworfen
+    def put_results(batch, results): raise AssertionError(f"neu extrahiert: {batch}")
+    monkeypatch.setattr(scanner, "_put_results", put_results)
+    scanner.actualize_index()
+    assert scanner.index[str(path)]["file_hash"] == hashlib.sha1(path.read_bytes()).hexdigest()
@@ -0,0 +1,53 @@
+import os
+import time
+import threading
+
+from backend.core.file_watcher import ChangeQueue, FileWatcher, CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_DELETED
+
+def test_queue_keeps_the_last_event_and_waits_for_quiet():
+    queue, stop = ChangeQueue(debounce=0.2, max_delay=5), threading.Event()
+    queue.put("/d/a.txt", CHANGE_ADDED)
+    queue.put("/d/a.txt", CHANGE_MODIFIED)
+    queue.put("/d/b.txt", CHANGE_DELETED)
+    assert queue.take(stop, timeout=0.05) == {} # noch keine Ruhe
+    time.sleep(0.25)
+    assert queue.take(stop) == {"/d/a.txt": CHANGE_MODIFIED, "/d/b.txt": CHANGE_DELETED}
+    assert len(queue) == 0
+
+def test_polling_watcher_reports_changes(tmp_path):
+    (tmp_path / "alt.txt").write_text("alt", encoding="utf-8")
+    (tmp_path / ".git").mkdir()
+    received, lock = {}, threading.Lock()
+    def on_changes(batch):
+        with lock: received.update(batch)
+    watcher = FileWatcher([str(tmp_path)], on_changes, skip_dir=lambda name: name.startswith("."),
+                          debounce_ms=50, poll_interval=0.1, force_polling=True)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        (tmp_path / "neu.txt").write_text("neu", encoding="utf-8")
+        (tmp_path / ".git" / "HEAD").write_text("ref", encoding="utf-8")
+        os.remove(tmp_path / "alt.txt")
+        deadline = time.monotonic() + 5
+        while len(received) < 2 and time.monotonic() < deadline: time.sleep(0.05)
+    finally: watcher.stop()
+    assert received == {str(tmp_path / "neu.txt"): CHANGE_ADDED, str(tmp_path / "alt.txt"): CHANGE_DELETED}
+
+def test_apply_changes_updates_single_files(tmp_path, make_scanner):
+    scanner = make_scanner()
+    docs = tmp_path / "docs"
+    (docs / "ordner").mkdir()
+    (docs / "ordner" / "a.txt").write_text("Angebot Dachdecker", encoding="utf-8")
+    (docs / "b.txt").write_text("Mahnung", encoding="utf-8")
+    scanner.scan_files()
+
+    (docs / "c.txt").write_text("Lieferschein Fenster", encoding="utf-8")
+    (docs / "b.txt").write_text("Mahnung zweite Stufe", encoding="utf-8")
+    os.rename(docs / "ordner", docs / "verschoben")
+    result = scanner.apply_changes({str(docs / "c.txt"): CHANGE_ADDED, str(docs / "b.txt"): CHANGE_MODIFIED,
+                                    str(docs / "ordner"): CHANGE_DELETED, str(docs / "verschoben"): CHANGE_ADDED})
+    assert result == {"updated": 2, "moved": 1, "removed": 1} # entfernt: der alte Ordnereintrag
+    assert scanner.get_content(str(docs / "c.txt")) == "Lieferschein Fenster"
+    assert scanner.get_content(str(docs / "b.txt")) == "Mahnung zweite Stufe"
+    assert str(docs / "ordner" / "a.txt") not in scanner.index
+    assert scanner.get_content(str(docs / "verschoben" / "a.txt")) == "Angebot Dachdecker"
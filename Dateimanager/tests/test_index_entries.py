@@ -0,0 +1,52 @@
+from backend.core.index_entries import EntryTable
+from backend.core.search_index import InvertedIndex
+
+def _file(path, **extra):
+    return {"type": "file", "name": path.rsplit("/", 1)[-1], "path": path, "size_bytes": 10, **extra}
+
+def test_deleted_row_is_reused_without_stale_fields():
+    table = EntryTable()
+    table["/a/x.txt"] = _file("/a/x.txt", file_hash="d41d8cd98f00b204e9800998ecf8427e", custom="alt")
+    table["/a/y.txt"] = _file("/a/y.txt")
+    row = table.row_of("/a/x.txt")
+
+    del table["/a/x.txt"]
+    assert table.row_of("/a/x.txt") is None
+    assert table.path_at(row) is None
+    assert list(table) == ["/a/y.txt"]
+
+    table["/b/z.txt"] = _file("/b/z.txt")
+    assert table.row_of("/b/z.txt") == row
+    assert table.path_at(row) == "/b/z.txt"
+    assert table["/b/z.txt"].get("file_hash") is None
+    assert table["/b/z.txt"].get("custom") is None
+    assert len(table) == 2
+    assert sorted(table) == ["/a/y.txt", "/b/z.txt"]
+
+def test_overwrite_keeps_row_and_drops_old_fields():
+    table = EntryTable()
+    table["/a/x.txt"] = _file("/a/x.txt", custom=1)
+    row = table.row_of("/a/x.txt")
+    table["/a/x.txt"] = _file("/a/x.txt", size_bytes=42)
+    assert table.row_of("/a/x.txt") == row
+    entry = table["/a/x.txt"].to_dict()
+    assert entry["size_bytes"] == 42 and entry["path"] == "/a/x.txt"
+    assert "custom" not in entry
+
+def test_path_at_out_of_range():
+    table = EntryTable()
+    assert table.path_at(0) is None
+    assert table.path_at(-1) is None
+
+def test_search_index_follows_reused_rows():
+    table = EntryTable()
+    table["/d/a.txt"] = _file("/d/a.txt")
+    index = InvertedIndex(table)
+    index.update_text("/d/a.txt", "alt")
+    row = table.row_of("/d/a.txt")
+    index.remove("/d/a.txt"); del table["/d/a.txt"]
+    table["/e/c.txt"] = _file("/e/c.txt")
+    index.update_text("/e/c.txt", "neu")
+    assert index.match_counts("alt") == {}
+    assert index.match_counts("neu") == {row: 1}
+    assert index.path_of(row) == "/e/c.txt"
@@ -0,0 +1,50 @@
+import os
+import shutil
+
+import pytest
+
+@pytest.fixture
+def scanned(tmp_path, make_scanner, monkeypatch):
+    """Gescannter Index über docs/archiv mit zwei Dateien; `extracted` sammelt danach neu extrahierte Pfade."""
+    scanner = make_scanner()
+    archive = tmp_path / "docs" / "archiv"
+    archive.mkdir()
+    (archive / "a.txt").write_text("Rechnung März", encoding="utf-8")
+    (archive / "b.txt").write_text("Rechnung Juni", encoding="utf-8")
+    scanner.scan_files()
+    extracted = []
+    put_results = scanner._put_results
+    def record_results(batch, results):
+        extracted.extend(task[0] for task in batch)
+        return put_results(batch, results)
+    monkeypatch.setattr(scanner, "_put_results", record_results)
+    return scanner, tmp_path / "docs", extracted
+
+def test_renamed_folder_rekeys_entries(scanned):
+    scanner, docs, extracted = scanned
+    inode = scanner.index[str(docs / "archiv" / "a.txt")]["inode"]
+    os.rename(docs / "archiv", docs / "ablage")
+    scanner.actualize_index()
+    assert extracted == []
+    assert not any(p.startswith(str(docs / "archiv")) for p in scanner.index.keys())
+    moved = str(docs / "ablage" / "a.txt")
+    assert scanner.index[moved]["inode"] == inode and scanner.get_content(moved) == "Rechnung März"
+    assert [r["file"]["path"] for r in scanner.search("juni")["data"]] == [str(docs / "ablage" / "b.txt")]
+
+def test_copied_and_deleted_file_is_matched_by_hash(scanned):
+    scanner, docs, extracted = scanned
+    shutil.copy(docs / "archiv" / "a.txt", docs / "kopie.txt") # neuer Inode, andere mtime
+    os.remove(docs / "archiv" / "a.txt")
+    scanner.actualize_index()
+    assert extracted == []
+    assert str(docs / "archiv" / "a.txt") not in scanner.index
+    assert scanner.index[str(docs / "kopie.txt")]["inode"] == os.stat(docs / "kopie.txt").st_ino
+
+def test_same_size_with_other_content_is_extracted_again(scanned):
+    scanner, docs, extracted = scanned
+    (docs / "neu.txt").write_text("Rechnung Sept", encoding="utf-8") # gleiche Größe wie a.txt
+    os.remove(docs / "archiv" / "a.txt")
+    scanner.actualize_index()
+    assert extracted == [str(docs / "neu.txt")]
+    assert str(docs / "archiv" / "a.txt") not in scanner.index
+    assert scanner.get_content(str(docs / "neu.txt")) == "Rechnung Sept"
@@ -0,0 +1,47 @@
+import os
+import time
+
+from backend.core.parallel_walker import ParallelWalker
+
+def _make_tree(root):
+    for rel in ("b/x/1.txt", "b/x/2.txt", "a/3.txt", "a/c/d/4.txt", "top.txt", "b/5.txt", "e/.git/6.txt"):
+        path = os.path.join(root, *rel.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f: f.write(rel)
+
+def _listing(walker, root):
+    return [(l.path, l.depth, [n for n, _ in l.dirs], [n for n, _, _ in l.files]) for l in walker.walk([root])]
+
+def test_threaded_walk_matches_serial_topdown_order(tmp_path):
+    _make_tree(str(tmp_path))
+    serial = _listing(ParallelWalker(num_threads=1), str(tmp_path))
+    expected = []
+    for dirpath, dirnames, filenames in os.walk(str(tmp_path)):
+        dirnames.sort()
+        expected.append((dirpath, sorted(filenames)))
+    assert [(path, files) for path, _, _, files in serial] == expected
+    for threads in (2, 8):
+        assert _listing(ParallelWalker(num_threads=threads), str(tmp_path)) == serial
+
+def test_skip_dir_and_max_depth(tmp_path):
+    _make_tree(str(tmp_path))
+    walker = ParallelWalker(num_threads=4, skip_dir=lambda name: name == ".git", max_depth=1)
+    paths = [l.path for l in walker.walk([str(tmp_path)])]
+    assert os.path.join(str(tmp_path), "e", ".git") not in paths
+    assert os.path.join(str(tmp_path), "a", "c") not in paths
+    assert os.path.join(str(tmp_path), "a") in paths
+
+def test_full_buffer_throttles_the_walk(tmp_path):
+    for i in range(30): os.makedirs(tmp_path / f"d{i:02}" / "sub")
+    listed = []
+    class CountingWalker(ParallelWalker):
+        def _list_dir(self, task):
+            listed.append(task.path)
+            return super()._list_dir(task)
+    walker = CountingWalker(num_threads=4, max_buffered=1)
+    consumed = []
+    for listing in walker.walk([str(tmp_path)]):
+        consumed.append(listing.path)
+        time.sleep(0.01) # langsamer Verbraucher
+        assert len(listed) - len(consumed) <= walker.max_buffered + walker.num_threads
+    assert consumed == [l.path for l in ParallelWalker(num_threads=1).walk([str(tmp_path)])]
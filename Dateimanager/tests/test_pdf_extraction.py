@@ -0,0 +1,72 @@
+import PyPDF2
+from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
+
+from backend.core import file_scanner as fs
+from backend.core.pdf_extraction import extract_pdf_pages, join_pdf_pages, resolve_pdf_backend, default_pdf_backend
+
+def write_pdf(path, pages):
+    """Schreibt ein PDF mit einer Textzeile pro Seite."""
+    writer = PyPDF2.PdfWriter()
+    font = DictionaryObject({NameObject("/Type"): NameObject("/Font"), NameObject("/Subtype"): NameObject("/Type1"),
+                             NameObject("/BaseFont"): NameObject("/Helvetica")})
+    for text in pages:
+        page = PyPDF2.PageObject.create_blank_page(width=200, height=200)
+        stream = DecodedStreamObject()
+        stream.set_data(f"BT /F1 12 Tf 20 100 Td ({text}) Tj ET".encode())
+        page[NameObject("/Contents")] = stream
+        page[NameObject("/Resources")] = DictionaryObject({NameObject("/Font"): DictionaryObject({NameObject("/F1"): font})})
+        writer.add_page(page)
+    with open(path, "wb") as f: writer.write(f)
+    return str(path)
+
+def test_page_ranges_join_to_the_whole_document(tmp_path):
+    path = write_pdf(tmp_path / "a.pdf", [f"seite{i}" for i in range(5)])
+    page_count, head = extract_pdf_pages(path, "pypdf2", 0, 2)
+    _, tail = extract_pdf_pages(path, "pypdf2", 2, None)
+    assert page_count == 5 and head == ["seite0", "seite1"] and tail == ["seite2", "seite3", "seite4"]
+    assert join_pdf_pages(head) + "\n" + join_pdf_pages(tail) == join_pdf_pages(extract_pdf_pages(path, "pypdf2")[1])
+
+def test_pypdf2_extracts_each_page_once(tmp_path, monkeypatch):
+    path = write_pdf(tmp_path / "a.pdf", ["eins", "zwei", "drei"])
+    calls = []
+    extract_text = PyPDF2.PageObject.extract_text
+    monkeypatch.setattr(PyPDF2.PageObject, "extract_text", lambda page, *args, **kwargs: calls.append(1) or extract_text(page, *args, **kwargs))
+    extract_pdf_pages(path, "pypdf2")
+    assert len(calls) == 3
+
+def test_unknown_backend_falls_back_to_the_default():
+    assert resolve_pdf_backend("gibtsnicht") == resolve_pdf_backend(None) == default_pdf_backend()
+    assert resolve_pdf_backend("PyPDF2") == "pypdf2"
+
+def _record_page_tasks(scanner):
+    ranges = []
+    pool_map = scanner.worker_pool.map
+    def record(fn, args_iter, **kwargs):
+        args = list(args_iter)
+        ranges.extend((start, end) for _, _, start, end, _ in args)
+        return pool_map(fn, args, **kwargs)
+    scanner.worker_pool.map = record
+    return ranges
+
+def test_long_pdf_pages_are_split_across_tasks(tmp_path, make_scanner, monkeypatch):
+    monkeypatch.setattr(fs, "PDF_PAGES_PER_TASK", 2)
+    scanner = make_scanner(pdf_backend="pypdf2")
+    path = write_pdf(tmp_path / "docs" / "vertrag.pdf", [f"klausel{i}" for i in range(7)])
+    ranges = _record_page_tasks(scanner)
+    scanner.scan_files()
+    assert ranges == [(2, 4), (4, 6), (6, 7)] # Seiten 0-1 im Worker der Datei
+    assert scanner.get_content(path) == "\n".join(f"klausel{i}" for i in range(7))
+    assert not scanner.index[path].get("pdf_pages")
+
+def test_initial_pages_are_completed_on_demand(tmp_path, make_scanner, monkeypatch):
+    monkeypatch.setattr(fs, "PDF_PAGES_PER_TASK", 2)
+    scanner = make_scanner(pdf_backend="pypdf2", pdf_initial_pages=3)
+    scanner._schedule_pdf_backfill = lambda: None # kein Nachindizieren im Hintergrund
+    path = write_pdf(tmp_path / "docs" / "vertrag.pdf", [f"klausel{i}" for i in range(7)])
+    scanner.scan_files()
+    entry = scanner.index[path]
+    assert (entry["pdf_pages"], entry["pdf_pages_done"]) == (7, 3)
+    assert scanner.get_content(path) == "klausel0\nklausel1\nklausel2"
+    assert scanner.search_in_file(path, "klausel6")["match_count"] == 1
+    assert not scanner.index[path].get("pdf_pages")
+    assert [r["file"]["path"] for r in scanner.search("klausel5")["data"]] == [path]
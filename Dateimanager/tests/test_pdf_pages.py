@@ -0,0 +1,54 @@
+import pytest
+
+from backend.core.worker_pool import ExtractionTimeout
+
+TEXT = "Seite eins des Vertrags\n"
+
+@pytest.fixture
+def partial_pdf(tmp_path, make_scanner):
+    """Ein Eintrag, der wie ein nur bis Seite 50 indiziertes PDF aussieht (der Text stammt aus einer Textdatei)."""
+    scanner = make_scanner()
+    path = tmp_path / "docs" / "vertrag.pdf.txt"
+    path.write_text(TEXT, encoding="utf-8")
+    path = str(path)
+    scanner.scan_files()
+    data = scanner.index[path].to_dict()
+    data.update(pdf_pages=120, pdf_pages_done=50)
+    scanner.index[path] = data
+    scanner._persist_entry(path)
+    return scanner, path
+
+def _failing_map(error, calls):
+    def run(*args, **kwargs):
+        calls.append(args)
+        raise error
+        yield # Generator wie WorkerPool.map
+    return run
+
+def test_failed_page_extraction_keeps_the_entry_partial(partial_pdf):
+    scanner, path = partial_pdf
+    content_hash = scanner.index[path]["content_hash"]
+    calls = []
+    scanner.worker_pool.map = _failing_map(OSError("defekte Seite"), calls)
+    assert not scanner._complete_pdf_pages(path)
+    entry = scanner.index[path]
+    assert (entry["pdf_pages"], entry["pdf_pages_done"]) == (120, 50) # weiterhin als unvollständig markiert
+    assert entry["content_hash"] == content_hash and scanner.get_content(path) == TEXT
+    assert scanner.quarantine.list() == [] # nur Zeitüberschreitungen zählen
+
+def test_page_timeouts_end_in_quarantine(partial_pdf):
+    scanner, path = partial_pdf
+    calls = []
+    scanner.worker_pool.map = _failing_map(ExtractionTimeout("Zeitlimit"), calls)
+    for _ in range(scanner.quarantine.max_strikes): assert not scanner._complete_pdf_pages(path)
+    assert scanner.quarantine.list()[0]["quarantined"]
+    assert not scanner._complete_pdf_pages(path)
+    assert len(calls) == scanner.quarantine.max_strikes # in Quarantäne: kein weiterer Versuch
+    assert scanner.index[path]["pdf_pages"] == 120
+
+def test_backfill_gives_up_after_one_failed_pass(partial_pdf):
+    scanner, path = partial_pdf
+    calls = []
+    scanner.worker_pool.map = _failing_map(OSError("defekte Seite"), calls)
+    scanner._pdf_backfill_loop() # kehrt zurück statt endlos zu wiederholen
+    assert len(calls) == 1 and scanner.index[path]["pdf_pages"] == 120
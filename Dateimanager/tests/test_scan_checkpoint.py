@@ -0,0 +1,43 @@
+import os
+
+from backend.core.scan_checkpoint import ScanCheckpoint
+
+def test_interrupted_scan_resumes_completed_dirs(tmp_path):
+    file_path = str(tmp_path / "scan_checkpoint.json")
+    dirs = [str(tmp_path / "docs")]
+    done_dir, open_dir, empty_dir = (os.path.join(dirs[0], name) for name in ("fertig", "offen", "leer"))
+
+    checkpoint = ScanCheckpoint(file_path)
+    assert checkpoint.begin(dirs, actualize=False) is False
+    checkpoint.add_dir(done_dir, 2)
+    checkpoint.add_dir(open_dir, 1)
+    checkpoint.add_dir(empty_dir, 0)
+    checkpoint.mark_done([os.path.join(done_dir, "a.txt"), os.path.join(done_dir, "b.txt")])
+    checkpoint.save() # danach "Abbruch"
+
+    resumed = ScanCheckpoint(file_path)
+    assert resumed.begin(dirs, actualize=False) is True
+    assert resumed.is_dir_complete(done_dir)
+    assert resumed.is_dir_complete(empty_dir)
+    assert not resumed.is_dir_complete(open_dir)
+    progress = resumed.progress()
+    assert progress["resumable"] and progress["done_files"] == 2 and progress["completed_dirs"] == 2
+
+def test_other_scan_starts_fresh(tmp_path):
+    file_path = str(tmp_path / "scan_checkpoint.json")
+    checkpoint = ScanCheckpoint(file_path)
+    checkpoint.begin([str(tmp_path / "a")], actualize=False)
+    checkpoint.add_dir(str(tmp_path / "a" / "leer"), 0)
+    checkpoint.save()
+
+    assert ScanCheckpoint(file_path).begin([str(tmp_path / "a")], actualize=True) is False
+    fresh = ScanCheckpoint(file_path)
+    assert fresh.begin([str(tmp_path / "b")], actualize=False) is False
+    assert not fresh.is_dir_complete(str(tmp_path / "a" / "leer"))
+
+def test_discard_removes_file(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / "scan_checkpoint.json"))
+    checkpoint.begin([str(tmp_path)], actualize=False)
+    checkpoint.discard()
+    assert not os.path.exists(checkpoint.file_path)
+    assert checkpoint.progress() == {"resumable": False}
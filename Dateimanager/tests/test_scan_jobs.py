@@ -0,0 +1,60 @@
+import time
+import threading
+
+import pytest
+
+from backend.core.scan_checkpoint import ScanCheckpoint
+from backend.core.scan_jobs import ScanJobManager, ScanBusy, JOB_COMPLETED, JOB_CANCELLED
+
+def _wait_finished(job, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline: time.sleep(0.01)
+    return job.finished
+
+def test_job_reports_progress_and_result():
+    def runner(kind, base_dirs, stats):
+        stats.walked(2, 5)
+        stats.planned(5)
+        stats.extracted(5, 500, 0, {".txt": [5, 0.5]})
+        return {"message": f"{kind} fertig"}
+    jobs = ScanJobManager(runner)
+    job = jobs.start("scan", ["/docs"])
+    assert _wait_finished(job)
+    info = job.to_dict()
+    assert info["status"] == JOB_COMPLETED and info["message"] == "scan fertig"
+    assert info["progress"]["files_extracted"] == 5 and info["progress"]["files_remaining"] == 0
+    assert info["progress"]["extension_timings"][".txt"]["files"] == 5
+
+def test_exclusive_cancels_the_running_job_first():
+    started = threading.Event()
+    def runner(kind, base_dirs, stats):
+        started.set()
+        stats.cancel_event.wait(5)
+        stats.check_cancelled()
+    jobs = ScanJobManager(runner)
+    job = jobs.start("scan")
+    assert started.wait(5)
+    with jobs.exclusive(timeout=5):
+        assert job.finished and job.status == JOB_CANCELLED
+
+def test_exclusive_gives_up_on_a_job_that_keeps_running():
+    started, release = threading.Event(), threading.Event()
+    def runner(kind, base_dirs, stats):
+        started.set(); release.wait(5)
+        return {}
+    jobs = ScanJobManager(runner)
+    job = jobs.start("scan")
+    assert started.wait(5)
+    with pytest.raises(ScanBusy):
+        with jobs.exclusive(timeout=0.1): pass
+    release.set()
+    assert _wait_finished(job)
+
+def test_checkpoint_ignores_a_scan_after_discard(tmp_path):
+    checkpoint = ScanCheckpoint(str(tmp_path / "scan.json"))
+    checkpoint.begin([str(tmp_path)], actualize=False)
+    checkpoint.add_dir(str(tmp_path), 1)
+    checkpoint.discard() # Index gelöscht, während der Scan noch Ergebnisse meldet
+    checkpoint.mark_done([str(tmp_path / "a.txt")])
+    checkpoint.walk_finished(0)
+    assert checkpoint.progress() == {"resumable": False}
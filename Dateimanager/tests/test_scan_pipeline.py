@@ -0,0 +1,51 @@
+from backend.core import file_scanner as fs
+from backend.core.scan_jobs import ScanStats
+
+def _make_docs(docs, dirs=6, files=3):
+    for d in range(dirs):
+        (docs / f"d{d}").mkdir()
+        for f in range(files): (docs / f"d{d}" / f"{f}.txt").write_text(f"Datei {d}/{f}", encoding="utf-8")
+
+def test_extraction_runs_while_the_walk_continues(tmp_path, make_scanner, monkeypatch):
+    monkeypatch.setattr(fs, "SCAN_BATCH_SIZE", 2)
+    monkeypatch.setattr(fs, "WALK_BATCH_LISTINGS", 1)
+    monkeypatch.setattr(fs, "SCAN_PENDING_TASKS", 4)
+    scanner = make_scanner()
+    _make_docs(tmp_path / "docs")
+    events = []
+    planned, put_results = scanner._put_pending_entries, scanner._put_results
+    def record_planned(tasks):
+        events.append(("geplant", len(tasks)))
+        return planned(tasks)
+    def record_results(batch, results):
+        events.append(("extrahiert", len(batch)))
+        return put_results(batch, results)
+    monkeypatch.setattr(scanner, "_put_pending_entries", record_planned)
+    monkeypatch.setattr(scanner, "_put_results", record_results)
+    stats = ScanStats()
+    scanner.scan_files(stats=stats)
+
+    kinds = [kind for kind, _ in events]
+    assert kinds.index("extrahiert") < len(kinds) - 1 - kinds[::-1].index("geplant") # Extraktion vor Ende des Durchlaufs
+    backlog = 0
+    for kind, count in events:
+        backlog += count if kind == "geplant" else -count
+        assert backlog <= fs.SCAN_PENDING_TASKS + 3 + 2 * fs.SCAN_BATCH_SIZE # ein Verzeichnis plus Stapel im Pool
+    assert stats.files_to_extract == stats.files_extracted == 18
+    assert all(scanner.get_content(str(tmp_path / "docs" / f"d{d}" / "0.txt")) == f"Datei {d}/0" for d in range(6))
+
+def test_actualize_holds_back_new_paths_for_move_detection(tmp_path, make_scanner, monkeypatch):
+    scanner = make_scanner()
+    _make_docs(tmp_path / "docs", dirs=2, files=2)
+    scanner.scan_files()
+    old, new = tmp_path / "docs" / "d0" / "0.txt", tmp_path / "docs" / "d1" / "umbenannt.txt"
+    old.rename(new)
+    extracted = []
+    put_results = scanner._put_results
+    def record_results(batch, results):
+        extracted.extend(task[0] for task in batch)
+        return put_results(batch, results)
+    monkeypatch.setattr(scanner, "_put_results", record_results)
+    scanner.actualize_index()
+    assert str(old) not in scanner.index and scanner.get_content(str(new)) == "Datei 0/0"
+    assert extracted == [] # umgeschlüsselt statt neu extrahiert
@@ -0,0 +1,82 @@
+import pytest
+
+from backend.core.index_entries import EntryTable
+from backend.core.search_index import InvertedIndex, TrigramIndex, regex_required_literals
+
+@pytest.fixture
+def table():
+    table = EntryTable()
+    for path in ("/d/a.txt", "/d/b.txt"): table[path] = {"type": "file", "name": path[3:], "path": path}
+    return table
+
+def test_inverted_index_update_and_remove(table):
+    index = InvertedIndex(table)
+    a, b = table.row_of("/d/a.txt"), table.row_of("/d/b.txt")
+    index.update_text("/d/a.txt", "Hallo Welt hallo")
+    index.update_text("/d/b.txt", "Welt")
+    assert index.match_counts("hallo") == {a: 2}
+    assert index.match_counts("welt") == {a: 1, b: 1}
+    assert index.match_counts("hallo welt") == {a: 1}
+
+    index.update_text("/d/a.txt", "nur welt")
+    assert index.match_counts("hallo") == {}
+    assert "hallo" not in index.postings
+
+    index.remove("/d/b.txt")
+    assert "/d/b.txt" not in index
+    assert index.match_counts("welt") == {a: 1}
+    assert len(index) == 1
+
+def test_inverted_index_requires_table_row(table):
+    with pytest.raises(KeyError):
+        InvertedIndex(table).update_text("/d/fehlt.txt", "text")
+
+def test_trigram_index_update_remove_candidates(table):
+    index = TrigramIndex(table)
+    a, b = table.row_of("/d/a.txt"), table.row_of("/d/b.txt")
+    index.update("/d/a.txt", "abcdef")
+    index.update("/d/b.txt", "xabcx")
+    assert index.candidates(["abc"]) == {a, b}
+    assert index.candidates(["cde"]) == {a}
+    assert index.candidates(["zzz"]) == set()
+    assert index.candidates(["ab"]) is None # zu kurz, keine Einschränkung
+
+    index.update("/d/a.txt", "xyz")
+    assert index.candidates(["abc"]) == {b}
+    index.remove("/d/b.txt")
+    assert index.candidates(["abc"]) == set()
+    assert "abc" not in index.postings
+    assert len(index) == 1
+
+@pytest.mark.parametrize("pattern, expected", [
+    (r"Hello\s+wor(ld)?x", ["Hello", "wor", "x"]),
+    ("abc", ["abc"]),
+    ("a|b", []),
+    (r"\d+", []),
+    ("ab.cd", ["ab", "cd"]),
+])
+def test_regex_required_literals(pattern, expected):
+    assert regex_required_literals(pattern) == expected
+
+def _scanned(tmp_path, make_scanner):
+    scanner = make_scanner()
+    with open(tmp_path / "docs" / "a.txt", "w", encoding="utf-8") as f: f.write("Die Lieferantenrechnung liegt bei.\n")
+    scanner.scan_files()
+    return scanner
+
+def test_search_defaults_to_substring(tmp_path, make_scanner):
+    scanner = _scanned(tmp_path, make_scanner)
+    assert [r["file"]["name"] for r in scanner.search("lieferant")["data"]] == ["a.txt"]
+    assert scanner.search("lieferant", mode="word")["data"] == []
+
+@pytest.mark.parametrize("query, mode", [("ie", "substring"), ("l.e", "regex"), (r"\d+", "regex")])
+def test_content_search_without_trigram_skips_the_blobs(tmp_path, make_scanner, query, mode):
+    scanner = _scanned(tmp_path, make_scanner)
+    scanner.get_content = lambda *args: pytest.fail("Inhalt ohne Trigramm-Vorauswahl geladen")
+    result = scanner.search(query, mode=mode)
+    assert result["data"] == [] and "Inhaltssuche übersprungen" in result["message"]
+
+def test_short_terms_do_not_disable_the_other_terms(tmp_path, make_scanner):
+    scanner = _scanned(tmp_path, make_scanner)
+    result = scanner.search("ie, rechnung")
+    assert [r["file"]["name"] for r in result["data"]] == ["a.txt"] and "'ie'" in result["message"]
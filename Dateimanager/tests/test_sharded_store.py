@@ -0,0 +1,74 @@
+import os
+import threading
+
+from backend.core.index_store import ShardedIndexStore
+
+def _entry(path, content_hash=None):
+    return {"type": "file", "name": os.path.basename(path), "path": path, "content_hash": content_hash}
+
+def _store(tmp_path, **kwargs):
+    base_a, base_b = str(tmp_path / "a"), str(tmp_path / "b")
+    return ShardedIndexStore(str(tmp_path / "index.sqlite3"), [base_a, base_b], **kwargs), base_a, base_b
+
+def test_entries_go_to_their_base_dir_shard_and_load_back(tmp_path):
+    store, base_a, base_b = _store(tmp_path)
+    with store.batch():
+        store.upsert(os.path.join(base_a, "x.txt"), _entry(os.path.join(base_a, "x.txt")))
+        store.upsert(os.path.join(base_b, "y.txt"), _entry(os.path.join(base_b, "y.txt")))
+        store.upsert("/anderswo/z.txt", _entry("/anderswo/z.txt"))
+    assert set(store.shards) == {base_a, base_b, ShardedIndexStore.OTHER_SHARD}
+    store.close()
+
+    reopened, _, _ = _store(tmp_path)
+    assert sorted(path for path, _, _ in reopened.load_all()) == sorted(
+        [os.path.join(base_a, "x.txt"), os.path.join(base_b, "y.txt"), "/anderswo/z.txt"])
+    reopened.close()
+
+def test_compactor_only_folds_the_journal(tmp_path):
+    store, base_a, _ = _store(tmp_path, compact_interval=0.05, compact_wal_bytes=1)
+    path = os.path.join(base_a, "x.txt")
+    with store.batch():
+        store.upsert(path, _entry(path, "h1"))
+        store.put_blob("h1", "behalten")
+        store.put_blob("h2", "verwaist")
+    idle = threading.Event()
+    store.on_idle = idle.set # nach dem ersten Durchlauf des Kompaktierers
+    store.start_compactor()
+    assert idle.wait(5)
+    store.stop_compactor()
+    assert all(s.journal_size() == 0 for s in list(store.shards.values()) + [store.blobs])
+    assert store.has_blob("h2") # Bereinigung nur auf Anforderung, nie nebenbei beim Kompaktieren
+
+    assert store.collect_garbage() == 1
+    assert store.has_blob("h1") and not store.has_blob("h2")
+    store.close()
+
+def test_writes_touch_only_their_shard(tmp_path):
+    store, base_a, base_b = _store(tmp_path)
+    with store.batch():
+        store.upsert(os.path.join(base_a, "x.txt"), _entry(os.path.join(base_a, "x.txt")))
+        store.upsert(os.path.join(base_b, "y.txt"), _entry(os.path.join(base_b, "y.txt")))
+    before = dict(store.generation())
+    with store.batch(): store.upsert(os.path.join(base_a, "x.txt"), _entry(os.path.join(base_a, "x.txt"), "h1"))
+    after = dict(store.generation())
+    assert after[base_b] == before[base_b] and after[base_a] != before[base_a]
+    store.close()
+
+def test_root_base_is_split_by_top_level_dir(tmp_path):
+    store = ShardedIndexStore(str(tmp_path / "index.sqlite3"), ["/"])
+    assert store.shard_key("/home/user/a.txt") == "/home"
+    assert store.shard_key("/etc/hosts") == "/etc"
+    assert store.shard_key("/swapfile") == "/"
+    store.close()
+
+def test_rows_move_when_base_dirs_change(tmp_path):
+    store, base_a, _ = _store(tmp_path)
+    path = os.path.join(base_a, "sub", "x.txt")
+    with store.batch(): store.upsert(path, _entry(path))
+    store.close()
+
+    sub = os.path.join(base_a, "sub")
+    reopened = ShardedIndexStore(str(tmp_path / "index.sqlite3"), [base_a, sub])
+    assert [p for p, _, _ in reopened.load_all()] == [path]
+    assert reopened.shards[sub].count() == 1 and reopened.shards[base_a].count() == 0
+    reopened.close()
@@ -0,0 +1,70 @@
+import os
+import shutil
+
+from backend.core import file_scanner as fs
+
+def _write(path, text="Angebot für die Lieferung\n"):
+    with open(path, "w", encoding="utf-8") as f: f.write(text)
+    return str(path)
+
+def _no_shard_load():
+    raise AssertionError("Index wurde aus den Shards statt aus dem Snapshot geladen")
+
+def test_warm_start_uses_the_snapshot(tmp_path, make_scanner):
+    scanner = make_scanner()
+    path = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    assert scanner.save_snapshot()
+    scanner.close()
+
+    restarted = make_scanner()
+    restarted.store.load_all = _no_shard_load
+    restarted.load_index()
+    assert path in restarted.index
+    assert restarted.search("Lieferung")["data"]
+
+def test_stale_snapshot_is_ignored(tmp_path, make_scanner):
+    scanner = make_scanner()
+    _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    assert scanner.save_snapshot()
+    shutil.copy(scanner.snapshot_file, tmp_path / "alt.snapshot")
+    later = _write(tmp_path / "docs" / "b.txt")
+    scanner.actualize_index()
+    scanner.close()
+    shutil.copy(tmp_path / "alt.snapshot", scanner.snapshot_file)
+
+    restarted = make_scanner()
+    restarted.load_index()
+    assert later in restarted.index
+
+def test_snapshot_is_discarded_when_the_index_changes_meanwhile(tmp_path, make_scanner, monkeypatch):
+    scanner = make_scanner()
+    path = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    dump = fs.pickle.dump
+    def dump_while_writing(state, f, protocol):
+        dump(state, f, protocol=protocol)
+        entry = scanner.index[path].to_dict()
+        entry["size_bytes"] += 1
+        scanner._put_entry(path, entry) # ein Schreiber, der ohne Store-Sperre dazwischenkommt
+    monkeypatch.setattr(fs.pickle, "dump", dump_while_writing)
+    assert not scanner.save_snapshot()
+    assert not os.path.exists(scanner.snapshot_file) and not os.path.exists(scanner.snapshot_file + ".tmp")
+
+def test_idle_snapshot_is_rate_limited(tmp_path, make_scanner, monkeypatch):
+    monkeypatch.setattr(fs, "SNAPSHOT_IDLE_SECONDS", 0)
+    scanner = make_scanner()
+    path = _write(tmp_path / "docs" / "a.txt")
+    scanner.scan_files()
+    scanner._snapshot_if_idle()
+    assert os.path.exists(scanner.snapshot_file)
+    written = scanner._snapshot_generation
+
+    _write(path, "geändert\n")
+    scanner.actualize_index()
+    scanner._snapshot_if_idle() # innerhalb von SNAPSHOT_MIN_INTERVAL: kein neuer Snapshot
+    assert scanner._snapshot_generation == written
+    monkeypatch.setattr(fs, "SNAPSHOT_MIN_INTERVAL", 0)
+    scanner._snapshot_if_idle()
+    assert scanner._snapshot_generation == scanner.store.generation() != written
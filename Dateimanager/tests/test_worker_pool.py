@@ -0,0 +1,53 @@
+import os
+import time
+
+import pytest
+
+from backend.core import file_scanner as fs
+from backend.core.worker_pool import WorkerPool, ExtractionTimeout, run_with_deadline, report_units
+
+def _pid():
+    return os.getpid()
+
+def _hang(timeout):
+    return run_with_deadline(time.sleep, (30,), timeout)
+
+def _batch_of(count):
+    report_units(count)
+    return os.getpid()
+
+@pytest.fixture
+def pool():
+    pool = WorkerPool(max_workers=1, preload=())
+    yield pool
+    pool.shutdown(wait=False)
+
+def test_timeout_replaces_the_worker(pool):
+    first = pool.submit(_pid).result()
+    with pytest.raises(ExtractionTimeout): pool.submit(_hang, 0.2).result()
+    assert pool.recycle_count == 1
+    assert pool.submit(_pid).result() != first
+
+def test_tasks_queued_behind_a_hung_thread_move_to_a_fresh_worker(pool):
+    hung = pool.submit(_hang, 0.2)
+    queued = [pool.submit(_pid) for _ in range(3)] # stehen schon in der Warteschlange des betroffenen Prozesses
+    with pytest.raises(ExtractionTimeout): hung.result()
+    pids = {future.result(timeout=30) for future in queued}
+    assert pool.submit(_pid).result() in pids and len(pids) == 1 # alle im Ersatzprozess
+
+def test_recycling_counts_files_not_tasks():
+    pool = WorkerPool(max_workers=1, preload=(), max_tasks_per_worker=5)
+    try:
+        first = pool.submit(_batch_of, 3).result()
+        assert pool.recycle_count == 0
+        assert pool.submit(_batch_of, 3).result() == first # 6 Dateien: danach ersetzt
+        assert pool.recycle_count == 1 and pool.submit(_pid).result() != first
+    finally: pool.shutdown(wait=False)
+
+def test_batch_stops_after_a_timeout(monkeypatch):
+    def process(file_path, *args):
+        return file_path, {"extraction_timeout": file_path == "b"}
+    monkeypatch.setattr(fs, "_process_file_task", process)
+    tasks = [(name,) for name in "abcd"]
+    results, timings, rest = fs._process_file_batch(tasks)
+    assert [path for path, _ in results] == ["a", "b"] and rest == tasks[2:]